@@ -1,14 +1,23 @@
 from django.contrib import admin
-from .models import TeacherAvailability, Booking
+from core.pagination import EstimatedCountPaginator
+from .models import TeacherAvailability, Booking, BookingRequest, UtilisationRollup, WaitlistEntry, WaitlistOpening
 
 @admin.register(TeacherAvailability)
 class TeacherAvailabilityAdmin(admin.ModelAdmin):
-    list_display = ('teacher', 'date', 'start_time', 'end_time', 'is_available')
-    list_filter = ('date', 'is_available')
-    search_fields = ('teacher__user__first_name', 'teacher__user__last_name')
+    list_display = ('teacher', 'date', 'start_time', 'end_time', 'is_available', 'release_at')
+    list_filter = ('is_available',)
+    search_fields = ('teacher__first_name', 'teacher__last_name', 'teacher__email')
+    # Millions of rows: one query per page, drill down by date (availability_date_start_idx),
+    # estimated total when unfiltered, no select of every teacher on the change form
+    list_select_related = ('teacher',)
+    date_hierarchy = 'date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    raw_id_fields = ('teacher',)
 
     def teacher(self, obj):
         return obj.teacher.get_full_name()  # Display teacher's full name
+    teacher.admin_order_field = 'teacher__last_name'
 
 
 @admin.register(Booking)
@@ -16,22 +25,30 @@ class BookingAdmin(admin.ModelAdmin):
     list_display = (
         'student', 'teacher', 'date', 'start_time', 'end_time', 'booked_at', 'short_message'
     )
-    list_filter = ('teacher_availability__date',)
     search_fields = (
         'student__first_name', 'student__last_name',
         'teacher_availability__teacher__first_name',
         'teacher_availability__teacher__last_name',
         'message'
     )
+    # Same as TeacherAvailabilityAdmin: the columns below read the slot and its teacher
+    list_select_related = ('student', 'teacher_availability__teacher')
+    date_hierarchy = 'teacher_availability__date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    raw_id_fields = ('student', 'teacher_availability')
 
     def teacher(self, obj):
         return obj.teacher_availability.teacher.get_full_name()
+    teacher.admin_order_field = 'teacher_availability__teacher__last_name'
 
     def date(self, obj):
         return obj.teacher_availability.date
+    date.admin_order_field = 'teacher_availability__date'
 
     def start_time(self, obj):
         return obj.teacher_availability.start_time
+    start_time.admin_order_field = 'teacher_availability__start_time'
 
     def end_time(self, obj):
         return obj.teacher_availability.end_time
@@ -39,3 +56,36 @@ class BookingAdmin(admin.ModelAdmin):
     def short_message(self, obj):
         return obj.message[:40] + '…' if obj.message and len(obj.message) > 40 else (obj.message or "—")
     short_message.short_description = "Message"
+
+
+@admin.register(UtilisationRollup)
+class UtilisationRollupAdmin(admin.ModelAdmin):
+    list_display = ('teacher', 'date', 'slots_opened', 'slots_booked', 'fill_rate', 'updated_at')
+    list_filter = ('date',)
+    list_select_related = ('teacher',)
+    # Maintained by booking/rollups.py; fix drift with `manage.py rebuild_utilisation`
+    readonly_fields = ('teacher', 'date', 'slots_opened', 'slots_booked', 'lead_minutes_total', 'updated_at')
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('student', 'teacher', 'date_from', 'date_to', 'status', 'created_at')
+    list_filter = ('status',)
+    list_select_related = ('student', 'teacher')
+    search_fields = ('student__email', 'teacher__email')
+
+
+@admin.register(WaitlistOpening)
+class WaitlistOpeningAdmin(admin.ModelAdmin):
+    list_display = ('teacher_availability', 'created_at')
+    list_select_related = ('teacher_availability__teacher',)
+    raw_id_fields = ('teacher_availability',)
+
+
+@admin.register(BookingRequest)
+class BookingRequestAdmin(admin.ModelAdmin):
+    list_display = ('student', 'teacher_availability', 'status', 'error', 'created_at', 'processed_at')
+    list_filter = ('status',)
+    list_select_related = ('student', 'teacher_availability__teacher')
+    search_fields = ('student__email',)
+    raw_id_fields = ('student', 'teacher_availability', 'booking')
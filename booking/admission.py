@@ -0,0 +1,197 @@
+# booking/admission.py
+"""
+Fair admission for scheduled slot releases.
+
+When a teacher schedules a batch (TeacherAvailability.release_at), booking
+attempts that arrive within BOOKING_ADMISSION_WINDOW_SECONDS of the release
+are not run against the slot rows straight away (nor are later ones, while
+queued attempts on the slot are still waiting, nor any attempt on a slot
+reopened for waitlisted students until they have been matched). They are
+stored as BookingRequest rows and processed one at a time by `manage.py
+process_booking_queue`:
+
+  BOOKING_ADMISSION_ORDER = "fifo"     -> arrival order, processed as they come
+  BOOKING_ADMISSION_ORDER = "lottery"  -> random order, once the window closes
+                                          (so arriving 50 ms earlier doesn't help)
+
+Serial processing means at most one select_for_update on the released rows
+at a time instead of a burst of competing transactions and 409s. A request
+left in PROCESSING by a crashed worker is reclaimed after
+BOOKING_QUEUE_CLAIM_TIMEOUT_SECONDS.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import logging
+import secrets
+from datetime import timedelta
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from .models import Booking, BookingRequest, WaitlistOpening
+from .services import BookingError, book_slot
+from .utils import SlotClock
+
+logger = logging.getLogger(__name__)
+
+
+def _window():
+  return timedelta(seconds=settings.BOOKING_ADMISSION_WINDOW_SECONDS)
+
+
+def released_q(now=None):
+  """TeacherAvailability filter: no scheduled release, or already released."""
+  return Q(release_at__isnull=True) | Q(release_at__lte=now or timezone.now())
+
+
+def in_admission_window(slot, now=None) -> bool:
+  """True if `slot` was released less than the admission window ago."""
+  if not slot.release_at:
+    return False
+  now = now or timezone.now()
+  return slot.release_at <= now < slot.release_at + _window()
+
+
+def has_open_requests(slot) -> bool:
+  """True while queued attempts on `slot` are pending or being processed."""
+  return BookingRequest.objects.filter(
+    teacher_availability=slot,
+    status__in=[BookingRequest.STATUS_PENDING, BookingRequest.STATUS_PROCESSING],
+  ).exists()
+
+
+def has_waitlist_opening(slot) -> bool:
+  """True while `slot` is recorded for waitlist matching (booking/waitlist.py) and not yet matched."""
+  return WaitlistOpening.objects.filter(teacher_availability=slot).exists()
+
+
+def must_queue(slot, now=None) -> bool:
+  """
+  True if an attempt on `slot` has to go through the queue: during the
+  admission window, and after it for as long as earlier entrants are still
+  waiting (a lottery only draws once the window has closed) or waitlisted
+  students haven't been matched yet, so a direct booking can't overtake them.
+  """
+  return in_admission_window(slot, now) or has_open_requests(slot) or has_waitlist_opening(slot)
+
+
+def enqueue_booking_request(student, slot, message=""):
+  """
+  Queue the student's attempt on `slot` (idempotent while still pending,
+  so double-clicks don't buy extra lottery tickets).
+  """
+  existing = BookingRequest.objects.filter(
+    student=student,
+    teacher_availability=slot,
+    status__in=[BookingRequest.STATUS_PENDING, BookingRequest.STATUS_PROCESSING],
+  ).first()
+  if existing:
+    return existing
+  return BookingRequest.objects.create(
+    student=student,
+    teacher_availability=slot,
+    message=message,
+    lottery_key=secrets.randbelow(2**31),
+  )
+
+
+def due_requests(now=None):
+  """Pending requests ready to process, in the order they should be served."""
+  now = now or timezone.now()
+  qs = (
+    BookingRequest.objects
+    .filter(status=BookingRequest.STATUS_PENDING)
+    # The waitlist gets a reopened slot first (drain_waitlist)
+    .exclude(teacher_availability__waitlist_opening__isnull=False)
+  )
+
+  if settings.BOOKING_ADMISSION_ORDER == "lottery":
+    # Wait for the whole window's entrants before drawing; a release cleared
+    # early (release_at=None) has nothing left to wait for
+    return (
+      qs.filter(
+        Q(teacher_availability__release_at__isnull=True)
+        | Q(teacher_availability__release_at__lte=now - _window())
+      )
+      .order_by("lottery_key", "pk")
+    )
+  return qs.order_by("created_at", "pk")
+
+
+def process_request(request_id, clock=None) -> bool:
+  """
+  Claim and process one request. Returns False if another worker got it first.
+  `clock`: SlotClock shared across a drain pass.
+  """
+  claimed = BookingRequest.objects.filter(
+    pk=request_id, status=BookingRequest.STATUS_PENDING
+  ).update(status=BookingRequest.STATUS_PROCESSING, claimed_at=timezone.now())
+  if not claimed:
+    return False
+
+  req = BookingRequest.objects.select_related("student").get(pk=request_id)
+  try:
+    booking = book_slot(req.student, message=req.message or "", clock=clock, pk=req.teacher_availability_id)
+  except BookingError as e:
+    req.status = BookingRequest.STATUS_REJECTED
+    req.error = e.message
+    req.error_status = e.status
+  except Exception:
+    # Never leave the row in PROCESSING: the student's page is polling it
+    logger.exception("Booking request %s failed", request_id)
+    req.status = BookingRequest.STATUS_REJECTED
+    req.error = "Booking failed. Please try again."
+    req.error_status = 500
+  else:
+    req.status = BookingRequest.STATUS_BOOKED
+    req.booking = booking
+  req.processed_at = timezone.now()
+  req.save(update_fields=["status", "booking", "error", "error_status", "processed_at"])
+  return True
+
+
+def reclaim_stale_requests(now=None) -> int:
+  """
+  Resolve requests left in PROCESSING for BOOKING_QUEUE_CLAIM_TIMEOUT_SECONDS
+  (the worker died mid-request): BOOKED if the booking committed, otherwise
+  back to PENDING for another attempt. Returns how many were reclaimed.
+  """
+  now = now or timezone.now()
+  cutoff = now - timedelta(seconds=settings.BOOKING_QUEUE_CLAIM_TIMEOUT_SECONDS)
+  stale = BookingRequest.objects.filter(
+    Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True, created_at__lt=cutoff),  # claimed before claimed_at existed
+    status=BookingRequest.STATUS_PROCESSING,
+  )
+  reclaimed = 0
+  for req in stale:
+    booking = Booking.objects.filter(student_id=req.student_id, teacher_availability_id=req.teacher_availability_id).first()
+    if booking:
+      changes = dict(status=BookingRequest.STATUS_BOOKED, booking=booking, processed_at=now)
+    else:
+      changes = dict(status=BookingRequest.STATUS_PENDING, claimed_at=None)
+    # Conditional, so a worker that was only slow keeps its result
+    reclaimed += BookingRequest.objects.filter(
+      pk=req.pk, status=BookingRequest.STATUS_PROCESSING, claimed_at=req.claimed_at,
+    ).update(**changes)
+  return reclaimed
+
+
+def drain_queue(limit=None, now=None) -> int:
+  """Process due requests one after another. Returns how many were processed."""
+  reclaim_stale_requests(now)
+  processed = 0
+  # One "now"/cutoff for the pass: a drain takes moments, the lead time is minutes
+  clock = SlotClock(now)
+  for request_id in due_requests(now).values_list("pk", flat=True)[:limit]:
+    if process_request(request_id, clock=clock):
+      processed += 1
+  return processed
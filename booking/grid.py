@@ -0,0 +1,182 @@
+# booking/grid.py
+"""
+Row/cell structures for the availability grids, built by the views in render
+order so the templates only loop and print: no per-cell key building,
+dictionary lookups or date formatting (see `manage.py benchmark_grid_render`).
+
+Cells are NamedTuples: small, immutable, attribute access in templates.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple, Optional
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from .utils import OPEN
+from users.avatars import resolve_avatars
+
+SLOT_MINUTES = 30
+DAY_START_HOUR = 9
+DAY_END_HOUR = 18
+
+
+def day_time_slots():
+  """[(start, end), ...] for the grid columns: 30-minute slots 9:00-18:00."""
+  return [
+    (
+      time(hour, minute),
+      (datetime.combine(date.min, time(hour, minute)) + timedelta(minutes=SLOT_MINUTES)).time(),
+    )
+    for hour in range(DAY_START_HOUR, DAY_END_HOUR)
+    for minute in (0, 30)
+  ]
+
+
+# -----------------------------------------------------------------------------
+# Teacher month grid (teacher_availability.html)
+# -----------------------------------------------------------------------------
+class TeacherCell(NamedTuple):
+  start_str: str
+  end_str: str
+  closed: bool  # past or inside the lead time: can't be toggled
+  is_available: bool = False
+  has_booking: bool = False
+  student_name: str = ""
+  student_email: str = ""
+  student_avatar: str = ""
+  student_message: str = ""
+
+
+class TeacherRow(NamedTuple):
+  day: date
+  date_str: str
+  is_today: bool
+  is_past: bool
+  is_friday: bool
+  cells: list
+
+
+def teacher_month_rows(slots, month_dates, time_slots, clock, avatar_url):
+  """
+  One TeacherRow per day in `month_dates`, one TeacherCell per time slot.
+  `clock` is the page's SlotClock; `avatar_url(student)` turns a booked student's
+  (already resolved) avatar_url into what the cell shows.
+  """
+  today = clock.now_date
+  by_key = {(slot.date, slot.start_time): slot for slot in slots}
+  # The month's booked students at once; storage checks batched and cached
+  resolve_avatars(slot.booking.student for slot in by_key.values() if hasattr(slot, "booking"))
+  columns = [(start, start.strftime("%H:%M:%S"), end.strftime("%H:%M:%S")) for start, end in time_slots]
+
+  rows = []
+  for day in month_dates:
+    states = clock.classify_many((day, start) for start, _, _ in columns)
+    cells = []
+    for (start, start_str, end_str), state in zip(columns, states):
+      slot = by_key.get((day, start))
+      closed = state != OPEN
+      if slot is None:
+        cells.append(TeacherCell(start_str, end_str, closed))
+      elif hasattr(slot, "booking"):
+        student = slot.booking.student
+        cells.append(TeacherCell(
+          start_str, end_str, closed,
+          is_available=slot.is_available,
+          has_booking=True,
+          student_name=f"{student.first_name} {student.last_name}".strip(),
+          student_email=student.email,
+          student_avatar=avatar_url(student),
+          student_message=slot.booking.message or "",
+        ))
+      else:
+        cells.append(TeacherCell(start_str, end_str, closed, is_available=slot.is_available))
+
+    rows.append(TeacherRow(
+      day=day,
+      date_str=day.strftime("%Y-%m-%d"),
+      is_today=day == today,
+      is_past=day < today,
+      is_friday=day.weekday() == 4,
+      cells=cells,
+    ))
+  return rows
+
+
+# -----------------------------------------------------------------------------
+# Student week grid (student_booking_view.html)
+# -----------------------------------------------------------------------------
+class StudentCell(NamedTuple):
+  start_str: str
+  end_str: str
+  state: str  # "mine", "booked", "available" or "unavailable"
+  closed: bool  # past or inside the lead time: can't be booked
+  message: str = ""
+
+
+class StudentRow(NamedTuple):
+  advisor_id: int
+  email: str
+  name: str
+  avatar_url: str
+  cells: list
+
+
+class StudentDay(NamedTuple):
+  date: date
+  date_str: str
+  rows: list
+
+
+def _student_cell_state(slot: Optional[object], student_id):
+  if slot is None:
+    return "unavailable"
+  if hasattr(slot, "booking"):
+    return "mine" if slot.booking.student_id == student_id else "booked"
+  return "available" if slot.is_available else "unavailable"
+
+
+def student_week_days(slots, week_dates, time_slots, student_id, clock):
+  """
+  One StudentDay per date in `week_dates`, with a StudentRow per advisor
+  that has slots that day (in `slots` order) and a StudentCell per time slot.
+  `clock` is the page's SlotClock.
+  """
+  by_day = {day: {} for day in week_dates}
+  advisors = {}
+  for slot in slots:
+    if slot.date not in by_day:
+      continue
+    by_day[slot.date].setdefault(slot.teacher_id, {})[slot.start_time] = slot
+    advisors.setdefault(slot.teacher_id, slot.teacher)
+
+  columns = [(start, start.strftime("%H:%M:%S"), end.strftime("%H:%M:%S")) for start, end in time_slots]
+  # Once per advisor, not per cell; storage checks batched and cached
+  resolve_avatars(advisors.values())
+  heads = {
+    teacher_id: (
+      teacher.email,
+      f"{teacher.first_name} {teacher.last_name}",
+      teacher.avatar_url,
+    )
+    for teacher_id, teacher in advisors.items()
+  }
+
+  days = []
+  for day in week_dates:
+    # Same for every advisor on the day
+    closed = [state != OPEN for state in clock.classify_many((day, start) for start, _, _ in columns)]
+    rows = []
+    for teacher_id, day_slots in by_day[day].items():
+      cells = []
+      for (start, start_str, end_str), is_closed in zip(columns, closed):
+        slot = day_slots.get(start)
+        state = _student_cell_state(slot, student_id)
+        message = (slot.booking.message or "") if state == "mine" else ""
+        cells.append(StudentCell(start_str, end_str, state, is_closed, message))
+      rows.append(StudentRow(teacher_id, *heads[teacher_id], cells))
+    days.append(StudentDay(day, day.strftime("%Y-%m-%d"), rows))
+  return days
@@ -0,0 +1,168 @@
+# booking/loadtest.py
+"""
+User journeys for `manage.py load_test_journeys`, run over HTTP against a
+live server (one journey per task in a process pool).
+
+Standard library only, no Django: workers may be spawned rather than forked,
+and must not share the parent's database connections. Every request is
+recorded as a Step (journey, step name, HTTP status, milliseconds); the
+command aggregates them into throughput and latency percentiles.
+
+Journeys (the plan dicts are built by the command from the seeded data):
+  student  log in, fill the questionnaire, open the week grid, fetch the week
+           and a day's slots, book one
+  teacher  log in, open a month, toggle every weekday slot of it
+  admin    log in, search current and past bookings, search the booking admin
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import http.cookiejar
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from typing import NamedTuple
+
+
+class Step(NamedTuple):
+  journey: str
+  name: str
+  status: int  # 0: connection error / timeout
+  ms: float
+
+
+class Session:
+  """A logged-out browser: cookie jar, CSRF header, timed requests."""
+
+  def __init__(self, base_url, journey, timeout):
+    self.base_url = base_url.rstrip("/")
+    self.journey = journey
+    self.timeout = timeout
+    self.steps = []
+    self.cookies = http.cookiejar.CookieJar()
+    self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+  def _csrf_token(self):
+    return next((cookie.value for cookie in self.cookies if cookie.name == "csrftoken"), "")
+
+  def request(self, name, path, *, params=None, form=None, payload=None):
+    """Run one timed request (redirects followed); returns (status, body bytes)."""
+    url = self.base_url + path
+    if params:
+      url += "?" + urllib.parse.urlencode(params)
+    headers = {"Referer": url}
+    data = None
+    if form is not None:
+      data = urllib.parse.urlencode({**form, "csrfmiddlewaretoken": self._csrf_token()}, doseq=True).encode()
+      headers["Content-Type"] = "application/x-www-form-urlencoded"
+    elif payload is not None:
+      data = json.dumps(payload).encode()
+      headers["Content-Type"] = "application/json"
+    if data is not None:
+      headers["X-CSRFToken"] = self._csrf_token()
+
+    started = time.perf_counter()
+    try:
+      with self.opener.open(urllib.request.Request(url, data=data, headers=headers), timeout=self.timeout) as response:
+        status, body = response.status, response.read()
+    except urllib.error.HTTPError as e:
+      status, body = e.code, e.read()
+    except (urllib.error.URLError, OSError):
+      status, body = 0, b""
+    self.steps.append(Step(self.journey, name, status, (time.perf_counter() - started) * 1000))
+    return status, body
+
+  def json(self, name, path, **kwargs):
+    status, body = self.request(name, path, **kwargs)
+    try:
+      return status, json.loads(body or b"{}")
+    except ValueError:
+      return status, {}
+
+  def log_in(self, email, password):
+    self.request("login_page", "/users/login/")
+    self.request("login", "/users/login/", form={"email": email, "password": password})
+
+
+# -----------------------------------------------------------------------------
+# Journeys
+# -----------------------------------------------------------------------------
+def student_journey(session, plan):
+  session.log_in(plan["email"], plan["password"])
+  session.request("questionnaire_submit", "/users/student/questionnaire/", form=plan["questionnaire"])
+  session.request("week_grid", "/booking/bookings/", params={"date": plan["week_start"]})
+  session.json("week_slots", "/booking/week-slots/", params={"date": plan["week_start"]})
+
+  status, data = session.json("day_slots", "/booking/get-available-slots/", params={"date": plan["date"]})
+  # {"HH:MM:SS": [teacher_email, ...]}: spread students over the offers; collisions are 409s
+  offers = sorted((start, email) for start, emails in data.get("slots", {}).items() for email in emails)
+  if not offers:
+    return
+  start, email = offers[plan["index"] % len(offers)]
+  session.json("book", "/booking/booking/create/", payload={
+    "teacher": email, "date": plan["date"], "start": start, "end": plan["slot_ends"][start],
+    "message": "Load test booking",
+  })
+
+
+def teacher_journey(session, plan):
+  session.log_in(plan["email"], plan["password"])
+  session.request("month_grid", "/booking/availability/", params={"year": plan["year"], "month": plan["month"]})
+  for day, start, end in plan["toggles"]:
+    session.json("toggle", "/booking/toggle-availability/", payload={"date": day, "start_time": start, "end_time": end})
+
+
+def admin_journey(session, plan):
+  session.log_in(plan["email"], plan["password"])
+  for term in plan["searches"]:
+    session.request("bookings_search", "/booking/admin/bookings/", params={"search": term})
+    session.request("past_bookings_search", "/booking/admin/bookings/past/", params={"search": term})
+    session.request("admin_changelist_search", "/admin/booking/booking/", params={"q": term})
+
+
+JOURNEYS = {
+  "student": student_journey,
+  "teacher": teacher_journey,
+  "admin": admin_journey,
+}
+
+
+def run_journey(base_url, journey, plan, timeout=30):
+  """Process pool entry point: run one journey, return its Steps."""
+  session = Session(base_url, journey, timeout)
+  JOURNEYS[journey](session, plan)
+  return session.steps
+
+
+# -----------------------------------------------------------------------------
+# Reporting
+# -----------------------------------------------------------------------------
+def percentile(sorted_values, fraction):
+  """Nearest-rank percentile of an already sorted list."""
+  if not sorted_values:
+    return 0.0
+  rank = max(1, round(fraction * len(sorted_values)))
+  return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarise(steps, wall_seconds):
+  """
+  [(journey, step, count, statuses, req/s, p50, p90, p95, p99, max)] in first-seen order;
+  statuses is e.g. "200:18 409:2" (0 = no response).
+  """
+  groups = {}
+  for step in steps:
+    groups.setdefault((step.journey, step.name), []).append(step)
+  rows = []
+  for (journey, name), group in groups.items():
+    times = sorted(step.ms for step in group)
+    statuses = " ".join(f"{status}:{count}" for status, count in sorted(Counter(step.status for step in group).items()))
+    rows.append((
+      journey, name, len(group), statuses, len(group) / wall_seconds if wall_seconds else 0.0,
+      percentile(times, 0.50), percentile(times, 0.90), percentile(times, 0.95), percentile(times, 0.99), times[-1],
+    ))
+  return rows
@@ -0,0 +1,137 @@
+# booking/management/commands/benchmark_grid_render.py
+"""
+Time the two availability grid pages with a full, realistic grid:
+
+  teacher month   every weekday slot of next month open, every 4th booked
+  student week    --advisors advisors with every slot of next week open
+
+Data is created inside a transaction that is rolled back, so this is safe
+to run against a dev database. Prints per-request times and query counts;
+run it before/after template or grid changes (booking/grid.py) to compare.
+booking/tests.py (GridRenderTests) renders the same data in the test suite
+and pins the query counts.
+
+Examples:
+  python manage.py benchmark_grid_render
+  python manage.py benchmark_grid_render --iterations 50 --advisors 12
+"""
+
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.grid import day_time_slots
+from booking.models import Booking, TeacherAvailability
+from users.models import CustomUser, Questionnaire
+
+EMAIL_DOMAIN = "grid-benchmark.invalid"
+
+
+def _weekdays(start, end):
+  day = start
+  while day <= end:
+    if day.weekday() < 5:
+      yield day
+    day += timedelta(days=1)
+
+
+def _user(email, role):
+  user = CustomUser.objects.create_user(email, password=None, first_name="Bench", last_name=role.title(), role=role)
+  if role == "teacher":
+    user.teacher_profile.is_active_advisor = True
+    user.teacher_profile.can_host_online = True
+    user.teacher_profile.save()
+  return user
+
+
+class Command(BaseCommand):
+  help = "Benchmark rendering of the teacher and student availability grids (no data is kept)."
+
+  def add_arguments(self, parser):
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--advisors", type=int, default=8, help="Advisors on the student week grid")
+
+  def handle(self, *args, iterations=20, advisors=8, **options):
+    if iterations < 1 or advisors < 1:
+      raise CommandError("--iterations and --advisors must be positive")
+
+    with transaction.atomic():
+      teacher_url, student_url, teacher, student = self._seed(advisors)
+      results = [
+        ("teacher month", self._measure(teacher, teacher_url, iterations)),
+        ("student week", self._measure(student, student_url, iterations)),
+      ]
+      transaction.set_rollback(True)
+
+    for label, (times, queries, size) in results:
+      self.stdout.write(
+        f"{label:<14} median {statistics.median(times):7.1f} ms   "
+        f"min {min(times):7.1f} ms   {queries} queries   {size / 1024:.0f} KiB"
+      )
+
+  def _seed(self, advisors):
+    today = timezone.localdate()
+    time_slots = day_time_slots()
+
+    # Teacher month: next month, all open, every 4th slot booked by its own student
+    month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    month_end = (month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    teacher = _user(f"teacher@{EMAIL_DOMAIN}", "teacher")
+    slots = TeacherAvailability.objects.bulk_create([
+      TeacherAvailability(teacher=teacher, date=day, start_time=start, end_time=end, is_available=True)
+      for day in _weekdays(month, month_end)
+      for start, end in time_slots
+    ])
+    booked = slots[::4]
+    students = [_user(f"student{i}@{EMAIL_DOMAIN}", "student") for i in range(len(booked))]
+    Booking.objects.bulk_create([
+      Booking(student=s, teacher_availability=slot, message="Benchmark booking")
+      for s, slot in zip(students, booked)
+    ])
+    TeacherAvailability.objects.filter(pk__in=[slot.pk for slot in booked]).update(is_available=False)
+
+    # Student week: next week, `advisors` advisors with every slot open
+    week_start = today - timedelta(days=today.weekday()) + timedelta(days=7)
+    TeacherAvailability.objects.bulk_create([
+      TeacherAvailability(teacher=advisor, date=day, start_time=start, end_time=end, is_available=True)
+      for advisor in [_user(f"advisor{i}@{EMAIL_DOMAIN}", "teacher") for i in range(advisors)]
+      for day in _weekdays(week_start, week_start + timedelta(days=4))
+      for start, end in time_slots
+    ])
+    student = students[0]
+    Questionnaire.objects.create(
+      student_profile=student.student_profile, completed=True,
+      faculty_department="-", mother_tongue="-", language_mandatory_name="-",
+      language_mandatory_proficiency="beginner", language_mandatory_goals=[],
+      aspects_to_improve="-", activities_you_can_manage="-", hours_per_week="1",
+    )
+
+    teacher_url = f"{reverse('teacher_availability')}?year={month.year}&month={month.month}"
+    student_url = f"{reverse('student_booking_view')}?date={week_start:%Y-%m-%d}"
+    return teacher_url, student_url, teacher, student
+
+  def _measure(self, user, url, iterations):
+    # Any concrete ALLOWED_HOSTS entry (wildcards/".domain" can't be sent as a Host)
+    host = next((h for h in settings.ALLOWED_HOSTS if h[0] not in "*."), "localhost")
+    client = Client(HTTP_HOST=host)
+    client.force_login(user)
+
+    response = client.get(url)  # warm-up (template loading, caches)
+    if response.status_code != 200:
+      raise CommandError(f"{url} returned {response.status_code}")
+
+    times = []
+    for _ in range(iterations):
+      with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(url)
+        times.append((time.perf_counter() - started) * 1000)
+    return times, len(queries), len(response.content)
@@ -0,0 +1,214 @@
+# booking/management/commands/load_test_journeys.py
+"""
+Run concurrent end-to-end user journeys against a live server and report
+throughput and latency percentiles per step (journeys: booking/loadtest.py).
+
+  student  log in, questionnaire, week grid, week/day slots, book
+  teacher  log in, month grid, toggle every weekday slot of a month
+  admin    log in, search current/past bookings and the booking admin
+
+Users (@loadtest.invalid, admins included, with a random password per run)
+and the slots students book are created in the database the server uses
+before the run and deleted afterwards, even if the run fails (--keep to
+inspect them). Refuses to run unless DEBUG is on (--allow-non-debug for a
+staging database). Start the server with the same settings, and with
+RATE_LIMIT_ENABLED=false: all journeys come from one IP, so the rate limiter
+would otherwise answer most of them with 429.
+
+Examples:
+  python manage.py load_test_journeys
+  python manage.py load_test_journeys --base-url http://127.0.0.1:8000 --students 200 --teachers 20 --concurrency 16
+"""
+
+import os
+import secrets
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import repeat
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from booking.grid import day_time_slots
+from booking.loadtest import run_journey, summarise
+from booking.models import TeacherAvailability
+from users.forms import QuestionnaireForm
+from users.models import CustomUser
+
+EMAIL_DOMAIN = "loadtest.invalid"
+
+
+def _weekdays(start, end):
+  day = start
+  while day <= end:
+    if day.weekday() < 5:
+      yield day
+    day += timedelta(days=1)
+
+
+def _questionnaire_form():
+  """Valid POST data for QuestionnaireForm: first choice of every choice field, filler text elsewhere."""
+  data = {}
+  for name, field in QuestionnaireForm().fields.items():
+    choices = [value for value, _ in getattr(field, "choices", []) if value != ""]
+    if choices:
+      data[name] = [choices[0]] if getattr(field.widget, "allow_multiple_selected", False) else choices[0]
+    elif field.required:
+      data[name] = "1" if field.__class__.__name__ in ("IntegerField", "DecimalField", "FloatField") else "Load test"
+  return data
+
+
+class Command(BaseCommand):
+  help = "Load-test whole user journeys (student booking, teacher month, admin search) against a live server."
+
+  def add_arguments(self, parser):
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--teachers", type=int, default=5)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 4, help="Worker processes")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds per request")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded users and their data")
+    parser.add_argument(
+      "--allow-non-debug", action="store_true",
+      help="Run although DEBUG is off (seeds superusers: never against production)",
+    )
+
+  def handle(self, *args, base_url, students, teachers, admins, concurrency, timeout, keep, allow_non_debug, **options):
+    if not settings.DEBUG and not allow_non_debug:
+      raise CommandError("Refusing to seed load-test superusers with DEBUG off; pass --allow-non-debug for a staging database")
+    if teachers < 1 or concurrency < 1 or students < 0 or admins < 0:
+      raise CommandError("--teachers and --concurrency must be positive, --students and --admins not negative")
+    self._check_server(base_url)
+
+    self._cleanup()
+    password = secrets.token_urlsafe(18)
+    try:
+      tasks = self._seed(students, teachers, admins, password)
+      self.stdout.write(f"{len(tasks)} journeys, {concurrency} processes, against {base_url}")
+
+      # Workers only speak HTTP; don't hand them this process's DB connections
+      connections.close_all()
+      started = time.perf_counter()
+      with ProcessPoolExecutor(max_workers=concurrency, mp_context=get_context("spawn")) as pool:
+        journeys, plans = zip(*tasks)
+        runs = list(pool.map(run_journey, repeat(base_url), journeys, plans, repeat(timeout)))
+      wall = time.perf_counter() - started
+    finally:
+      if keep:
+        self.stdout.write(f"Kept the @{EMAIL_DOMAIN} users; their password for this run is {password}")
+      else:
+        self._cleanup()
+    self._report(runs, wall)
+
+  def _check_server(self, base_url):
+    try:
+      urllib.request.urlopen(base_url.rstrip("/") + "/users/login/", timeout=10).close()
+    except (urllib.error.URLError, OSError) as e:
+      raise CommandError(f"No server answering at {base_url} ({e}); start one with `manage.py runserver` or gunicorn")
+
+  def _cleanup(self):
+    CustomUser.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").delete()  # cascades to slots, bookings, questionnaires
+
+  @transaction.atomic
+  def _seed(self, students, teachers, admins, password):
+    hashed = make_password(password)  # once, not per user
+
+    def user(email, role, last_name, **extra):
+      return CustomUser.objects.create(
+        email=email, password=hashed, role=role, first_name="Load", last_name=last_name, **extra
+      )
+
+    time_slots = day_time_slots()
+    slot_ends = {start.strftime("%H:%M:%S"): end.strftime("%H:%M:%S") for start, end in time_slots}
+
+    # Students book next week (past the lead time), on one of its weekdays each
+    today = timezone.localdate()
+    week_start = today - timedelta(days=today.weekday()) + timedelta(days=7)
+    week_days = list(_weekdays(week_start, week_start + timedelta(days=4)))
+
+    advisors = []
+    for i in range(teachers):
+      advisor = user(f"teacher{i}@{EMAIL_DOMAIN}", "teacher", f"Teacher{i}")
+      advisor.teacher_profile.is_active_advisor = True
+      advisor.teacher_profile.can_host_online = True
+      advisor.teacher_profile.save()
+      advisors.append(advisor)
+    TeacherAvailability.objects.bulk_create([
+      TeacherAvailability(teacher=advisor, date=day, start_time=start, end_time=end, is_available=True)
+      for advisor in advisors
+      for day in week_days
+      for start, end in time_slots
+    ])
+
+    # Teachers toggle a month that doesn't overlap the booking week
+    month = (today.replace(day=1) + timedelta(days=62)).replace(day=1)
+    month_end = (month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    toggles = [
+      (f"{day:%Y-%m-%d}", start.strftime("%H:%M:%S"), end.strftime("%H:%M:%S"))
+      for day in _weekdays(month, month_end)
+      for start, end in time_slots
+    ]
+
+    questionnaire = _questionnaire_form()
+    tasks = []
+    for i in range(students):
+      student = user(f"student{i}@{EMAIL_DOMAIN}", "student", f"Student{i}")
+      tasks.append(("student", {
+        "email": student.email, "password": password, "index": i, "questionnaire": questionnaire,
+        "week_start": f"{week_start:%Y-%m-%d}", "date": f"{week_days[i % len(week_days)]:%Y-%m-%d}",
+        "slot_ends": slot_ends,
+      }))
+    for advisor in advisors:
+      tasks.append(("teacher", {
+        "email": advisor.email, "password": password, "year": month.year, "month": month.month, "toggles": toggles,
+      }))
+    for i in range(admins):
+      admin = user(f"admin{i}@{EMAIL_DOMAIN}", "admin", f"Admin{i}", is_staff=True, is_superuser=True)
+      tasks.append(("admin", {
+        "email": admin.email, "password": password, "searches": ["Load", "Student1", "Teacher0", EMAIL_DOMAIN],
+      }))
+
+    # Spread each kind evenly over the run, so teachers and admins overlap the students
+    totals = Counter(journey for journey, _ in tasks)
+    seen = Counter()
+    ordered = []
+    for journey, plan in tasks:
+      seen[journey] += 1
+      ordered.append((seen[journey] / totals[journey], journey, plan))
+    return [(journey, plan) for _, journey, plan in sorted(ordered, key=lambda item: item[0])]
+
+  def _report(self, runs, wall):
+    steps = [step for run in runs for step in run]
+    self.stdout.write(f"{len(steps)} requests in {wall:.1f} s ({len(steps) / wall:.1f} req/s)\n")
+
+    header = f"{'journey':<8} {'step':<24} {'n':>6} {'req/s':>7} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}  statuses"
+    self.stdout.write(header)
+    self.stdout.write("-" * len(header))
+    for journey, name, count, statuses, rate, p50, p90, p95, p99, slowest in summarise(steps, wall):
+      self.stdout.write(
+        f"{journey:<8} {name:<24} {count:>6} {rate:>7.1f} {p50:>8.1f} {p90:>8.1f} {p95:>8.1f} {p99:>8.1f} {slowest:>8.1f}  {statuses}"
+      )
+
+    self.stdout.write("\nWhole journeys (ms, sum of their steps):")
+    for journey in ("student", "teacher", "admin"):
+      totals = sorted(sum(step.ms for step in run) for run in runs if run and run[0].journey == journey)
+      if totals:
+        self.stdout.write(
+          f"  {journey:<8} n={len(totals):<5} median {statistics.median(totals):9.1f}   max {totals[-1]:9.1f}"
+        )
+
+    if any(step.status == 429 for step in steps):
+      self.stdout.write(self.style.WARNING(
+        "Some requests were rate limited (429): restart the server with RATE_LIMIT_ENABLED=false "
+        "to measure the application rather than the limiter."
+      ))
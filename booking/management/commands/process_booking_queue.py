@@ -0,0 +1,48 @@
+# booking/management/commands/process_booking_queue.py
+"""
+Admission-queue worker for scheduled slot releases (see booking/admission.py).
+Each pass first matches slots opened for waiting students (booking/waitlist.py);
+queued attempts on those slots are processed after them.
+
+Examples:
+  python manage.py process_booking_queue                  # drain once and exit (cron)
+  python manage.py process_booking_queue --loop           # keep draining
+  python manage.py process_booking_queue --loop --interval 0.5
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.admission import drain_queue
+from booking.waitlist import drain_waitlist
+
+
+class Command(BaseCommand):
+  help = "Process queued booking attempts for just-released slots, one at a time, and waitlist matches."
+
+  def add_arguments(self, parser):
+    parser.add_argument("--loop", action="store_true", help="Keep running until interrupted")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when the queue is empty")
+    parser.add_argument("--limit", type=int, help="Process at most this many requests per pass")
+
+  def handle(self, *args, loop=False, interval=1.0, limit=None, **options):
+    if interval <= 0:
+      raise CommandError("--interval must be positive")
+
+    if not loop:
+      assigned, processed = drain_waitlist(limit=limit), drain_queue(limit=limit)
+      self.stdout.write(self.style.SUCCESS(
+        f"Processed {processed} booking request(s); assigned {assigned} slot(s) from waitlists."
+      ))
+      return
+
+    try:
+      while True:
+        assigned, processed = drain_waitlist(limit=limit), drain_queue(limit=limit)
+        if processed or assigned:
+          self.stdout.write(f"Processed {processed} booking request(s); assigned {assigned} slot(s) from waitlists.")
+        else:
+          time.sleep(interval)
+    except KeyboardInterrupt:
+      self.stdout.write("Stopped.")
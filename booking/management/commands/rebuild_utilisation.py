@@ -0,0 +1,47 @@
+# booking/management/commands/rebuild_utilisation.py
+"""
+Backfill / repair UtilisationRollup rows from TeacherAvailability and Booking.
+
+Examples:
+  python manage.py rebuild_utilisation                       # everything
+  python manage.py rebuild_utilisation --from 2025-01-01 --to 2025-12-31
+  python manage.py rebuild_utilisation --teacher advisor@example.com
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.rollups import rebuild_rollups
+from users.models import CustomUser
+
+
+def _parse_date(value):
+  try:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+  except ValueError:
+    raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+  help = "Recompute per-teacher, per-day utilisation rollups from bookings and availability."
+
+  def add_arguments(self, parser):
+    parser.add_argument("--from", dest="start", type=_parse_date, help="First date (YYYY-MM-DD), inclusive")
+    parser.add_argument("--to", dest="end", type=_parse_date, help="Last date (YYYY-MM-DD), inclusive")
+    parser.add_argument("--teacher", help="Only rebuild this teacher (email)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+
+  def handle(self, *args, start=None, end=None, teacher=None, batch_size=1000, **options):
+    if start and end and start > end:
+      raise CommandError("--from must not be after --to")
+
+    teacher_user = None
+    if teacher:
+      try:
+        teacher_user = CustomUser.objects.get(email__iexact=teacher, role="teacher")
+      except CustomUser.DoesNotExist:
+        raise CommandError(f"No teacher with email {teacher}")
+
+    written = rebuild_rollups(start=start, end=end, teacher=teacher_user, batch_size=batch_size)
+    self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} utilisation rollup row(s)."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-19 05:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_slot_release_admission_queue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teacheravailability',
+            index=models.Index(fields=['date', 'start_time'], name='availability_date_start_idx'),
+        ),
+    ]
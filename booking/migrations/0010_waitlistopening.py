@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-19 05:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0009_bookingrequest_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='waitlistentry',
+            name='status',
+            field=models.CharField(choices=[('waiting', 'Waiting'), ('assigned', 'Assigned'), ('cancelled', 'Cancelled'), ('expired', 'Expired')], default='waiting', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='WaitlistOpening',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('teacher_availability', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_opening', to='booking.teacheravailability')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -16,14 +16,43 @@ class TeacherAvailability(models.Model):
 
     is_available = models.BooleanField(default=False)  # Teachers must manually mark slots as available
 
+    # Scheduled release: an open slot only becomes bookable at this time (null = immediately).
+    # Bookings arriving just after release go through the admission queue (booking/admission.py).
+    release_at = models.DateTimeField(null=True, blank=True)
+
+    # AvailabilityVersion.version of this slot's teacher-month when the slot last changed
+    # (delta updates for the teacher grid, see booking/versions.py)
+    version = models.PositiveIntegerField(default=0)
+
     class Meta:
         unique_together = ('teacher', 'date', 'start_time')  # Prevent duplicate availability entries
         ordering = ['date', 'start_time']  # Order slots chronologically
+        indexes = [
+            # "Next available" search: walk slots in time order from the cutoff, stop at LIMIT (booking/search.py)
+            models.Index(fields=['date', 'start_time'], name='availability_date_start_idx'),
+        ]
 
     def __str__(self):
         return f"{self.teacher.email} - {self.date} ({self.start_time} - {self.end_time})"
 
 
+class AvailabilityVersion(models.Model):
+    """
+    Change counter for one teacher's month of slots. Every tracked change to a
+    slot in the month bumps it and stamps the slot with the new value, so a
+    client at version N can fetch just the slots with version > N.
+    """
+    teacher = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="availability_versions")
+    month = models.DateField()  # first day of the month
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('teacher', 'month')
+
+    def __str__(self):
+        return f"{self.teacher.email} - {self.month:%Y-%m} v{self.version}"
+
+
 class Booking(models.Model):
     """
     Stores which students have booked which time slots.
@@ -47,3 +76,138 @@ class Booking(models.Model):
     def __str__(self):
         return f"{self.student.email} booked {self.teacher_availability}"
 
+
+
+class BookingRequest(models.Model):
+    """
+    A booking attempt queued during a release's admission window.
+    Processed one at a time, in arrival order or by lottery, by
+    `manage.py process_booking_queue`; the student's page polls for the outcome.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_BOOKED = 'booked'
+    STATUS_REJECTED = 'rejected'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_BOOKED, 'Booked'),
+        (STATUS_REJECTED, 'Rejected'),
+    ]
+
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="booking_requests")
+    teacher_availability = models.ForeignKey(TeacherAvailability, on_delete=models.CASCADE, related_name="booking_requests")
+    message = models.CharField(max_length=300, blank=True, null=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    lottery_key = models.PositiveIntegerField()  # random draw, used when BOOKING_ADMISSION_ORDER = "lottery"
+    booking = models.OneToOneField(Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name="admission_request")
+    error = models.CharField(max_length=200, blank=True)
+    error_status = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)  # set with STATUS_PROCESSING; stale claims are reclaimed
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),  # worker: next pending request
+        ]
+
+    def __str__(self):
+        return f"{self.student.email} → {self.teacher_availability} ({self.status})"
+
+
+class UtilisationRollup(models.Model):
+    """
+    Per (teacher, date) counters for admin statistics.
+    Maintained incrementally by booking/rollups.py from the toggle and booking
+    write paths; `manage.py rebuild_utilisation` recomputes them from scratch.
+
+    slots_opened: slots offered that day (open now, or already booked)
+    slots_booked: bookings made on those slots
+    lead_minutes_total: sum over bookings of (slot start - booked_at), in minutes
+    """
+    teacher = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="utilisation_rollups")
+    date = models.DateField()
+
+    slots_opened = models.PositiveIntegerField(default=0)
+    slots_booked = models.PositiveIntegerField(default=0)
+    lead_minutes_total = models.PositiveBigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('teacher', 'date')
+        ordering = ['date', 'teacher']
+        indexes = [
+            models.Index(fields=['date']),  # year/month range scans for the dashboard
+        ]
+
+    @property
+    def fill_rate(self):
+        return (self.slots_booked / self.slots_opened) if self.slots_opened else 0.0
+
+    @property
+    def avg_lead_minutes(self):
+        return (self.lead_minutes_total / self.slots_booked) if self.slots_booked else None
+
+    def __str__(self):
+        return f"{self.teacher.email} - {self.date} ({self.slots_booked}/{self.slots_opened})"
+
+
+class WaitlistEntry(models.Model):
+    """
+    A student waiting for any slot with a given advisor between two dates.
+    When the advisor opens a matching slot, the queue worker
+    (booking/waitlist.py) books it for the oldest eligible entry (same rules
+    as create_booking) and notifies them. Entries whose range has ended expire.
+    """
+    STATUS_WAITING = 'waiting'
+    STATUS_ASSIGNED = 'assigned'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (STATUS_WAITING, 'Waiting'),
+        (STATUS_ASSIGNED, 'Assigned'),
+        (STATUS_CANCELLED, 'Cancelled'),
+        (STATUS_EXPIRED, 'Expired'),
+    ]
+
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="waitlist_entries")
+    teacher = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="waitlisted_by")
+    date_from = models.DateField()
+    date_to = models.DateField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_WAITING)
+    booking = models.OneToOneField(Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name="waitlist_entry")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']  # first come, first served
+        indexes = [
+            # "who is waiting for this teacher on this date?" on every slot opening
+            models.Index(fields=['teacher', 'status', 'date_from']),
+        ]
+
+    def __str__(self):
+        return f"{self.student.email} waiting for {self.teacher.email} ({self.date_from} – {self.date_to}, {self.status})"
+
+
+class WaitlistOpening(models.Model):
+    """
+    A slot opened while students were waiting for its advisor, not yet
+    matched. Written with the toggle; `manage.py process_booking_queue`
+    matches and deletes it (booking/waitlist.py).
+    """
+    teacher_availability = models.OneToOneField(TeacherAvailability, on_delete=models.CASCADE, related_name="waitlist_opening")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Waitlist opening: {self.teacher_availability}"
@@ -0,0 +1,152 @@
+# booking/rollups.py
+"""
+Incremental utilisation rollups (see UtilisationRollup).
+
+Write paths call the record_* helpers inside their own transaction, so a
+rollup change commits or rolls back together with the slot/booking change.
+Anything that bypasses those paths (admin edits, deletes, fixtures) is
+repaired by `manage.py rebuild_utilisation`, which uses rebuild_rollups().
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+from collections import defaultdict
+from datetime import datetime
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest, TruncMonth
+from django.utils import timezone
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from .models import Booking, TeacherAvailability, UtilisationRollup
+
+
+def lead_minutes(slot_date, slot_start_time, booked_at) -> int:
+  """Whole minutes between booking and the slot start (never negative)."""
+  slot_start = timezone.make_aware(
+    datetime.combine(slot_date, slot_start_time), timezone.get_current_timezone()
+  )
+  return max(0, int((slot_start - booked_at).total_seconds() // 60))
+
+
+def _bump(teacher_id, day, **deltas):
+  """Apply F()-based deltas to the (teacher, day) row, creating it if needed."""
+  UtilisationRollup.objects.get_or_create(teacher_id=teacher_id, date=day)
+  UtilisationRollup.objects.filter(teacher_id=teacher_id, date=day).update(
+    # clamp at 0: rows can drift via paths we don't track until the next rebuild
+    **{field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()},
+    updated_at=timezone.now(),
+  )
+
+
+def record_slot_toggled(slot, opened: bool):
+  """
+  A teacher opened/closed `slot`. Booked slots stay counted as offered,
+  so toggling one doesn't change slots_opened.
+  """
+  if hasattr(slot, "booking"):
+    return
+  _bump(slot.teacher_id, slot.date, slots_opened=1 if opened else -1)
+
+
+def record_booking_created(booking):
+  """A student booked an open slot: it was already counted as offered."""
+  slot = booking.teacher_availability
+  _bump(
+    slot.teacher_id, slot.date,
+    slots_booked=1,
+    lead_minutes_total=lead_minutes(slot.date, slot.start_time, booking.booked_at),
+  )
+
+
+@transaction.atomic
+def rebuild_rollups(start=None, end=None, teacher=None, batch_size=1000) -> int:
+  """
+  Recompute rollups from TeacherAvailability/Booking for [start, end]
+  (inclusive; either bound optional), optionally for a single teacher.
+  Returns the number of rollup rows written.
+  """
+  def _scope(qs, date_field):
+    if start:
+      qs = qs.filter(**{f"{date_field}__gte": start})
+    if end:
+      qs = qs.filter(**{f"{date_field}__lte": end})
+    return qs
+
+  slots = _scope(TeacherAvailability.objects.all(), "date")
+  bookings = _scope(Booking.objects.all(), "teacher_availability__date")
+  existing = _scope(UtilisationRollup.objects.all(), "date")
+  if teacher is not None:
+    slots = slots.filter(teacher=teacher)
+    bookings = bookings.filter(teacher_availability__teacher=teacher)
+    existing = existing.filter(teacher=teacher)
+
+  # (teacher_id, date) -> [opened, booked, lead_total]
+  totals = defaultdict(lambda: [0, 0, 0])
+
+  offered = (
+    slots.filter(Q(is_available=True) | Q(booking__isnull=False))
+    .values("teacher_id", "date")
+    .annotate(n=Count("id"))
+  )
+  for row in offered:
+    totals[(row["teacher_id"], row["date"])][0] = row["n"]
+
+  for teacher_id, day, start_time, booked_at in bookings.values_list(
+    "teacher_availability__teacher_id", "teacher_availability__date",
+    "teacher_availability__start_time", "booked_at",
+  ).iterator():
+    entry = totals[(teacher_id, day)]
+    entry[1] += 1
+    entry[2] += lead_minutes(day, start_time, booked_at)
+
+  existing.delete()
+  rows = [
+    UtilisationRollup(
+      teacher_id=teacher_id, date=day,
+      slots_opened=opened, slots_booked=booked, lead_minutes_total=lead_total,
+    )
+    for (teacher_id, day), (opened, booked, lead_total) in totals.items()
+  ]
+  UtilisationRollup.objects.bulk_create(rows, batch_size=batch_size)
+  return len(rows)
+
+
+def _summarise(row):
+  opened, booked, lead = row["opened"] or 0, row["booked"] or 0, row["lead"] or 0
+  row["fill_rate"] = (booked / opened) if opened else 0.0
+  row["avg_lead_hours"] = (lead / booked / 60) if booked else None
+  return row
+
+
+def utilisation_report(start, end):
+  """
+  Dashboard figures for [start, end], read from the rollups only:
+    totals:     one dict for the whole range
+    by_month:   one dict per month
+    by_teacher: one dict per teacher (busiest first)
+  """
+  qs = UtilisationRollup.objects.filter(date__gte=start, date__lte=end)
+  sums = dict(opened=Sum("slots_opened"), booked=Sum("slots_booked"), lead=Sum("lead_minutes_total"))
+
+  totals = _summarise(qs.aggregate(**sums))
+  by_month = [
+    _summarise(row)
+    for row in qs.annotate(month=TruncMonth("date")).values("month").annotate(**sums).order_by("month")
+  ]
+  by_teacher = [
+    _summarise(row)
+    for row in (
+      qs.values("teacher_id", "teacher__first_name", "teacher__last_name", "teacher__email")
+      .annotate(**sums)
+      .order_by("-booked", "teacher__last_name")
+    )
+  ]
+  return {"totals": totals, "by_month": by_month, "by_teacher": by_teacher}
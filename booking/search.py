@@ -0,0 +1,84 @@
+# booking/search.py
+"""
+"Next available slot" search across advisors.
+
+One query over open slots, ordered by (date, start_time) and cut off by
+LIMIT: the (date, start_time) index on TeacherAvailability matches that
+order, so the database walks forward from the booking cutoff and stops after
+N matching rows; the cost doesn't grow with how far ahead slots are published.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+from datetime import timedelta
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.db.models import Q
+from django.utils import timezone
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from .admission import released_q
+from .models import Booking, TeacherAvailability
+from .utils import SlotClock
+
+MEETING_MODES = ("online", "in_person")
+MAX_RESULTS = 20
+HORIZON_DAYS = 90  # don't scan further ahead than this
+
+
+def bookable_after_q(now=None):
+  """
+  Slots starting after the BOOKING_LEAD_MINUTES cutoff
+  (the complement of utils.slot_is_in_past_or_too_soon).
+  """
+  return SlotClock(now).open_q()
+
+
+def next_available_slots(student, limit=5, teacher_id=None, mode=None, now=None):
+  """
+  The earliest `limit` slots `student` could book right now:
+  open, released, past the lead-time cutoff, with a bookable advisor
+  (optionally one advisor and/or a meeting mode), on days the student
+  has no booking yet.
+  """
+  now = now or timezone.now()
+  today = timezone.localtime(now).date()
+
+  qs = (
+    TeacherAvailability.objects
+    .filter(
+      bookable_after_q(now),
+      released_q(now),
+      is_available=True,
+      date__lte=today + timedelta(days=HORIZON_DAYS),
+      teacher__role="teacher",
+      teacher__teacher_profile__is_active_advisor=True,
+    )
+    # One booking per day: skip days already taken
+    .exclude(date__in=Booking.objects.filter(
+      student=student, teacher_availability__date__gte=today,
+    ).values("teacher_availability__date"))
+  )
+
+  if mode == "online":
+    qs = qs.filter(teacher__teacher_profile__can_host_online=True)
+  elif mode == "in_person":
+    qs = qs.filter(teacher__teacher_profile__can_host_in_person=True)
+  else:
+    qs = qs.filter(
+      Q(teacher__teacher_profile__can_host_online=True) |
+      Q(teacher__teacher_profile__can_host_in_person=True)
+    )
+  if teacher_id:
+    qs = qs.filter(teacher_id=teacher_id)
+
+  limit = max(1, min(int(limit), MAX_RESULTS))
+  return list(
+    qs.select_related("teacher", "teacher__teacher_profile")
+    .order_by("date", "start_time", "pk")[:limit]
+  )
@@ -0,0 +1,111 @@
+# booking/services.py
+"""
+Booking rules shared by every path that creates a Booking:
+the create_booking view and waitlist assignment (booking/waitlist.py).
+Views translate BookingError into JSON responses.
+"""
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from .models import TeacherAvailability, Booking
+from .rollups import record_booking_created
+from .utils import slot_is_in_past_or_too_soon
+from .versions import record_slot_changed
+from users.utils import has_completed_questionnaire
+
+
+class BookingError(Exception):
+  """
+  A booking rule was violated.
+    status: HTTP status to report
+    code:   stable reason ("unavailable", "not_released", "advisor", "too_soon",
+            "one_per_day", "conflict", "forbidden", "questionnaire") for callers
+            that branch on it
+  """
+
+  def __init__(self, message, status=400, code=""):
+    super().__init__(message)
+    self.message = message
+    self.status = status
+    self.code = code
+
+
+def check_student_can_book(user):
+  """Role and questionnaire gate, checked before any slot is touched."""
+  if getattr(user, "role", None) != "student":
+    raise BookingError("Unauthorized access", status=403, code="forbidden")
+  if not has_completed_questionnaire(user):
+    raise BookingError("Please complete the questionnaire first.", status=403, code="questionnaire")
+
+
+def book_slot(student, message="", clock=None, **slot_lookup):
+  """
+  Book the open slot matching `slot_lookup` (TeacherAvailability filter kwargs)
+  for `student`, enforcing:
+    - slot exists, is open and released (404)
+    - advisor is bookable: active + at least one meeting mode (400)
+    - slot is not in the past / inside BOOKING_LEAD_MINUTES (400)
+    - one booking per student per day (400)
+    - no double booking (409)
+  Locks the slot row for the duration. Returns the new Booking.
+  `clock` (a SlotClock) lets batch callers share one "now".
+  """
+  with transaction.atomic():
+    try:
+      slot = (
+        TeacherAvailability.objects
+        .select_for_update()
+        .select_related("teacher", "teacher__teacher_profile")
+        .get(teacher__role="teacher", is_available=True, **slot_lookup)
+      )
+    except TeacherAvailability.DoesNotExist:
+      raise BookingError("This slot is not available", status=404, code="unavailable")
+
+    # Scheduled release: not bookable before release_at
+    if slot.release_at and slot.release_at > timezone.now():
+      raise BookingError("This slot is not open for booking yet.", status=404, code="not_released")
+
+    # ✅ Bookable gate: advisor must be active AND offer at least one meeting mode
+    prof = getattr(slot.teacher, "teacher_profile", None)
+    if prof is None or not prof.is_active_advisor or not (prof.can_host_online or prof.can_host_in_person):
+      raise BookingError("This advisor is not currently available to book.", code="advisor")
+
+    # Block past/too-soon bookings (do this inside the txn in case time advanced)
+    if slot_is_in_past_or_too_soon(slot.date, slot.start_time, clock=clock):
+      raise BookingError("This slot is no longer available to book.", code="too_soon")
+
+    # Enforce 1 booking per student per day (check inside the txn to avoid races)
+    if Booking.objects.filter(student=student, teacher_availability__date=slot.date).exists():
+      raise BookingError("You already have a booking on this day.", code="one_per_day")
+
+    # Double-booking guard (in case a Booking row already exists)
+    if Booking.objects.filter(teacher_availability=slot).exists():
+      raise BookingError("Slot already booked", status=409, code="conflict")
+
+    try:
+      # Savepoint so a uniqueness race doesn't poison the outer transaction
+      with transaction.atomic():
+        booking = Booking.objects.create(
+          student=student,
+          teacher_availability=slot,
+          message=message,
+        )
+    except IntegrityError:
+      # In case of DB uniqueness constraints, surface as conflict
+      raise BookingError("Slot already booked", status=409, code="conflict")
+
+    # Mark the slot as no longer available
+    slot.is_available = False
+    slot.save(update_fields=["is_available"])
+
+    record_booking_created(booking)
+    record_slot_changed(slot)
+
+  return booking
@@ -0,0 +1,26 @@
+# booking/signals.py
+# Signal receivers that invalidate cached booking data.
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Booking, TeacherAvailability
+from .utils import bump_weeks
+
+
+@receiver(post_save, sender=TeacherAvailability)
+@receiver(post_delete, sender=TeacherAvailability)
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def _invalidate_week_grids(sender, instance, raw=False, **kwargs):
+  """
+  Toggles, bookings and admin edits change what the student week grid shows:
+  bump the slot's week ("availability:<year>-W<week>") so every worker drops
+  that cached week, and only that one, once the change commits
+  (core/cacheversions.py). QuerySet.update() skips this; such paths bump
+  themselves.
+  """
+  if raw:
+    return
+  slot = instance if sender is TeacherAvailability else instance.teacher_availability
+  bump_weeks([slot.date])
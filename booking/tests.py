@@ -1,3 +1,297 @@
-from django.test import TestCase
+from datetime import datetime, time, timedelta
+from io import StringIO
+import time as clock
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import CacheVersion
+from users.models import CustomUser, Questionnaire, StudentProfile
+from .management.commands.benchmark_grid_render import Command as GridBenchmark
+from .admission import due_requests, enqueue_booking_request, must_queue, process_request, reclaim_stale_requests
+from .models import Booking, BookingRequest, TeacherAvailability, WaitlistEntry, WaitlistOpening
+from .utils import week_namespace
+from .views import _cached_week_slots
+from .waitlist import assign_slot_from_waitlist, drain_waitlist, join_waitlist
+
+
+def make_teacher(email="teacher@example.com"):
+  teacher = CustomUser.objects.create_user(email, "pw", first_name="Tea", last_name="Cher", role="teacher")
+  teacher.teacher_profile.is_active_advisor = True
+  teacher.teacher_profile.can_host_online = True
+  teacher.teacher_profile.save()
+  return teacher
+
+
+def make_student(email="student@example.com"):
+  return CustomUser.objects.create_user(email, "pw", first_name="Stu", last_name="Dent", role="student")
+
+
+def complete_questionnaire(student):
+  Questionnaire.objects.create(
+    student_profile=student.student_profile, completed=True,
+    faculty_department="-", mother_tongue="-", language_mandatory_name="-",
+    language_mandatory_proficiency="beginner", language_mandatory_goals=[],
+    aspects_to_improve="-", activities_you_can_manage="-", hours_per_week="1",
+  )
+  return student
+
+
+def next_weekday(days_ahead=7):
+  day = timezone.localdate() + timedelta(days=days_ahead)
+  while day.weekday() >= 5:
+    day += timedelta(days=1)
+  return day
+
+
+def make_slot(teacher, day=None, start=time(10), **fields):
+  end = (datetime.combine(timezone.localdate(), start) + timedelta(minutes=30)).time()
+  fields.setdefault("is_available", True)
+  return TeacherAvailability.objects.create(
+    teacher=teacher, date=day or next_weekday(), start_time=start, end_time=end, **fields,
+  )
+
+
+@override_settings(BOOKING_ADMISSION_WINDOW_SECONDS=10)
+class AdmissionQueueTests(TestCase):
+  def setUp(self):
+    self.teacher = make_teacher()
+    self.student = make_student()
+    self.now = timezone.now()
+
+  def test_queues_after_the_window_while_entrants_wait(self):
+    slot = make_slot(self.teacher, release_at=self.now - timedelta(seconds=30))
+    self.assertFalse(must_queue(slot, now=self.now))
+
+    enqueue_booking_request(self.student, slot)
+    self.assertTrue(must_queue(slot, now=self.now))
+
+    BookingRequest.objects.update(status=BookingRequest.STATUS_REJECTED)
+    self.assertFalse(must_queue(slot, now=self.now))
+
+  @override_settings(BOOKING_ADMISSION_ORDER="lottery")
+  def test_lottery_draws_after_the_window(self):
+    slot = make_slot(self.teacher, release_at=self.now - timedelta(seconds=5))
+    request = enqueue_booking_request(self.student, slot)
+    self.assertNotIn(request, due_requests(now=self.now))
+    self.assertIn(request, due_requests(now=self.now + timedelta(seconds=10)))
+
+  @override_settings(BOOKING_ADMISSION_ORDER="lottery")
+  def test_lottery_draws_requests_of_a_cleared_release(self):
+    slot = make_slot(self.teacher, release_at=self.now - timedelta(seconds=5))
+    request = enqueue_booking_request(self.student, slot)
+    TeacherAvailability.objects.filter(pk=slot.pk).update(release_at=None)  # schedule_release "clear"
+    self.assertIn(request, due_requests(now=self.now))
+
+  def test_unexpected_error_rejects_instead_of_leaving_processing(self):
+    slot = make_slot(self.teacher, release_at=self.now - timedelta(seconds=5))
+    request = enqueue_booking_request(self.student, slot)
+    with mock.patch("booking.admission.book_slot", side_effect=RuntimeError("db went away")):
+      self.assertTrue(process_request(request.pk))
+    request.refresh_from_db()
+    self.assertEqual((request.status, request.error_status), (BookingRequest.STATUS_REJECTED, 500))
+
+  @override_settings(BOOKING_QUEUE_CLAIM_TIMEOUT_SECONDS=60)
+  def test_stale_processing_requests_are_reclaimed(self):
+    slot = make_slot(self.teacher, release_at=self.now - timedelta(seconds=5))
+    other = make_slot(self.teacher, start=time(11), release_at=self.now - timedelta(seconds=5))
+    crashed = enqueue_booking_request(self.student, slot)
+    committed = enqueue_booking_request(make_student("other@example.com"), other)
+    booking = Booking.objects.create(student=committed.student, teacher_availability=other)
+    BookingRequest.objects.update(status=BookingRequest.STATUS_PROCESSING, claimed_at=self.now - timedelta(minutes=5))
+
+    self.assertEqual(reclaim_stale_requests(now=self.now), 2)
+    crashed.refresh_from_db()
+    committed.refresh_from_db()
+    self.assertEqual(crashed.status, BookingRequest.STATUS_PENDING)
+    self.assertEqual((committed.status, committed.booking), (BookingRequest.STATUS_BOOKED, booking))
+
+
+class LoadTestJourneysCommandTests(TestCase):
+  @override_settings(DEBUG=False)
+  def test_refuses_without_debug(self):
+    with self.assertRaisesMessage(CommandError, "--allow-non-debug"):
+      call_command("load_test_journeys", "--base-url", "http://127.0.0.1:9")
+    self.assertFalse(CustomUser.objects.filter(email__endswith="@loadtest.invalid").exists())
+
+
+class GridRenderTests(TestCase):
+  """
+  The availability grids with a full month / week (the benchmark_grid_render
+  data): a fixed number of queries whatever the number of slots, and no
+  pathological render time.
+  """
+  RENDER_BUDGET_SECONDS = 2.0  # generous: a few hundred ms on a laptop
+
+  def setUp(self):
+    cache.clear()  # version stamps restart with each test's rollback
+    self.teacher_url, self.student_url, self.teacher, self.student = GridBenchmark()._seed(advisors=8)
+
+  def render(self, user, url, queries):
+    self.client.force_login(user)
+    self.client.get(url)  # warm-up: templates, week grid cache
+    with self.assertNumQueries(queries):
+      started = clock.perf_counter()
+      response = self.client.get(url)
+      elapsed = clock.perf_counter() - started
+    self.assertEqual(response.status_code, 200)
+    self.assertLess(elapsed, self.RENDER_BUDGET_SECONDS)
+    return response
+
+  def test_teacher_month_grid(self):
+    # session, user, month version, slots (bookings/students/profiles joined)
+    response = self.render(self.teacher, self.teacher_url, queries=4)
+    self.assertContains(response, "Benchmark booking")
+
+  def test_teacher_grid_checks_each_avatar_once(self):
+    booked = Booking.objects.filter(teacher_availability__teacher=self.teacher).values_list("student_id", flat=True)
+    for student_id in set(booked):
+      StudentProfile.objects.filter(user_id=student_id).update(profile_picture=f"profile_pictures/students/{student_id}.png")
+    self.client.force_login(self.teacher)
+    with mock.patch("users.avatars.default_storage.exists", return_value=True) as exists:
+      self.client.get(self.teacher_url)
+      self.assertEqual(exists.call_count, len(set(booked)))
+      exists.reset_mock()
+      self.client.get(self.teacher_url)  # cached
+      exists.assert_not_called()
+
+  def test_student_week_grid(self):
+    # session, user, profile + questionnaire gate, cache versions (the week's slots are cached)
+    self.render(self.student, self.student_url, queries=5)
+
+
+class WaitlistAssignmentTests(TestCase):
+  def setUp(self):
+    self.teacher = make_teacher()
+    self.day = next_weekday()
+
+  def waiting(self, email, questionnaire=True):
+    student = make_student(email)
+    if questionnaire:
+      complete_questionnaire(student)
+    return join_waitlist(student, self.teacher, self.day - timedelta(days=1), self.day + timedelta(days=1))
+
+  def test_oldest_eligible_entry_gets_the_slot(self):
+    skipped = self.waiting("no-questionnaire@example.com", questionnaire=False)
+    first = self.waiting("first@example.com")
+    second = self.waiting("second@example.com")
+    slot = make_slot(self.teacher, day=self.day)
+
+    self.assertEqual(assign_slot_from_waitlist(slot.pk), first)
+
+    first.refresh_from_db()
+    slot.refresh_from_db()
+    self.assertEqual(first.status, WaitlistEntry.STATUS_ASSIGNED)
+    self.assertEqual(first.booking.teacher_availability, slot)
+    self.assertIsNotNone(first.resolved_at)
+    self.assertFalse(slot.is_available)
+    for entry in (skipped, second):
+      entry.refresh_from_db()
+      self.assertEqual(entry.status, WaitlistEntry.STATUS_WAITING)
+
+  def test_slot_outside_every_range_stays_open(self):
+    self.waiting("first@example.com")
+    slot = make_slot(self.teacher, day=self.day + timedelta(days=7))
+    self.assertIsNone(assign_slot_from_waitlist(slot.pk))
+    slot.refresh_from_db()
+    self.assertTrue(slot.is_available)
+
+  def test_toggle_records_the_opening_for_the_worker(self):
+    entry = self.waiting("first@example.com")
+    self.client.force_login(self.teacher)
+    with mock.patch("booking.waitlist.assign_slot_from_waitlist") as assign:
+      response = self.client.post(
+        "/booking/toggle-availability/",
+        {"date": self.day.isoformat(), "start_time": "10:00:00", "end_time": "10:30:00"},
+        content_type="application/json",
+      )
+    self.assertEqual(response.status_code, 200)
+    self.assertTrue(response.json()["is_available"])
+    assign.assert_not_called()  # no booking or email inside the request
+
+    slot = TeacherAvailability.objects.get(teacher=self.teacher, date=self.day)
+    self.assertTrue(WaitlistOpening.objects.filter(teacher_availability=slot).exists())
+
+    self.assertEqual(drain_waitlist(), 1)
+    entry.refresh_from_db()
+    self.assertEqual(entry.status, WaitlistEntry.STATUS_ASSIGNED)
+    self.assertFalse(WaitlistOpening.objects.exists())
+
+  def test_opening_waits_for_a_scheduled_release(self):
+    self.waiting("first@example.com")
+    now = timezone.now()
+    slot = make_slot(self.teacher, day=self.day, release_at=now + timedelta(hours=1))
+    WaitlistOpening.objects.create(teacher_availability=slot)
+    self.assertEqual(drain_waitlist(now=now), 0)
+    self.assertTrue(WaitlistOpening.objects.exists())
+
+  def test_ended_entries_expire(self):
+    entry = self.waiting("first@example.com")
+    WaitlistEntry.objects.filter(pk=entry.pk).update(date_to=timezone.localdate() - timedelta(days=1))
+    drain_waitlist()
+    entry.refresh_from_db()
+    self.assertEqual(entry.status, WaitlistEntry.STATUS_EXPIRED)
+
+  def test_direct_booking_cannot_overtake_the_waitlist(self):
+    entry = self.waiting("first@example.com")
+    rival = complete_questionnaire(make_student("rival@example.com"))
+    self.client.force_login(self.teacher)
+    self.client.post(
+      "/booking/toggle-availability/",
+      {"date": self.day.isoformat(), "start_time": "10:00:00", "end_time": "10:30:00"},
+      content_type="application/json",
+    )
+    slot = TeacherAvailability.objects.get(teacher=self.teacher, date=self.day)
+
+    # The rival refreshes and books before the worker has run: queued, not booked
+    self.client.force_login(rival)
+    response = self.client.post(reverse("create_booking"), {
+      "teacher": self.teacher.email, "date": self.day.isoformat(), "start": "10:00:00", "end": "10:30:00",
+    }, content_type="application/json")
+    self.assertEqual(response.status_code, 202)
+    self.assertFalse(Booking.objects.exists())
+    self.assertFalse(due_requests().exists())  # held back until the opening is matched
+
+    call_command("process_booking_queue", stdout=StringIO())
+    entry.refresh_from_db()
+    self.assertEqual(entry.booking.teacher_availability, slot)
+    request = BookingRequest.objects.get(student=rival)
+    self.assertEqual(request.status, BookingRequest.STATUS_REJECTED)
+
+
+class WeekSlotsCacheTests(TestCase):
+  def setUp(self):
+    cache.clear()
+    self.teacher = make_teacher()
+    self.week = next_weekday(7) - timedelta(days=next_weekday(7).weekday())
+    self.other_week = self.week + timedelta(days=7)
+
+  def cached(self, monday):
+    return _cached_week_slots(monday, monday + timedelta(days=4))
+
+  def test_a_write_only_invalidates_its_own_week(self):
+    make_slot(self.teacher, day=self.other_week)
+    self.cached(self.week)
+    self.cached(self.other_week)
+
+    with self.captureOnCommitCallbacks(execute=True):
+      slot = make_slot(self.teacher, day=self.week)
+
+    self.assertEqual(CacheVersion.objects.get(namespace=week_namespace(self.week)).version, 1)
+    self.assertFalse(CacheVersion.objects.filter(namespace=week_namespace(self.other_week)).exists())
+    self.assertEqual([s.pk for s in self.cached(self.week)], [slot.pk])
+    with mock.patch("booking.views._week_slots") as query:
+      self.cached(self.other_week)
+    query.assert_not_called()
+
+  def test_advisor_changes_invalidate_every_week(self):
+    make_slot(self.teacher, day=self.week)
+    self.assertEqual(len(self.cached(self.week)), 1)
+    with self.captureOnCommitCallbacks(execute=True):
+      self.teacher.teacher_profile.is_active_advisor = False
+      self.teacher.teacher_profile.save()
+    self.assertEqual(self.cached(self.week), [])
@@ -2,30 +2,44 @@
 from django.urls import path
 from .views import (
   teacher_availability_view,
+  schedule_release,
   toggle_availability,
+  availability_changes,
   student_booking_view,
   get_available_slots,
+  next_available_slots_view,
+  week_slots_view,
   create_booking,
+  booking_request_status,
   student_bookings_list,
   teacher_bookings_list,
   admin_bookings_list,
   student_bookings_past,
   teacher_bookings_past,
   admin_bookings_past,
+  join_waitlist_view,
+  leave_waitlist_view,
 )
 
 urlpatterns = [
   path("availability/", teacher_availability_view, name="teacher_availability"),
+  path("availability/release/", schedule_release, name="schedule_release"),
   path("toggle-availability/", toggle_availability, name="toggle_availability"),
+  path("availability/changes/", availability_changes, name="availability_changes"),
   path("bookings/", student_booking_view, name="student_booking_view"),
   path("get-available-slots/", get_available_slots, name="get_available_slots"),
+  path("next-available/", next_available_slots_view, name="next_available_slots"),
+  path("week-slots/", week_slots_view, name="week_slots"),
   path('booking/create/', create_booking, name='create_booking'),
+  path("booking/requests/<int:pk>/", booking_request_status, name="booking_request_status"),
   path("student/bookings/", student_bookings_list, name="student_bookings_list"),
   path("teacher/bookings/", teacher_bookings_list, name="teacher_bookings_list"),
   path("admin/bookings/", admin_bookings_list, name="admin_bookings_list"),
   path('student/bookings/past/', student_bookings_past, name='student_bookings_past'),
   path("teacher/bookings/past/", teacher_bookings_past, name="teacher_bookings_past"),
   path("admin/bookings/past/", admin_bookings_past, name="admin_bookings_past"),
+  path("waitlist/<int:teacher_id>/join/", join_waitlist_view, name="join_waitlist"),
+  path("waitlist/<int:pk>/leave/", leave_waitlist_view, name="leave_waitlist"),
 ]
 
 
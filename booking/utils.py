@@ -1,25 +1,108 @@
 # booking/utils.py
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.conf import settings
+from django.db.models import Q
 from django.utils import timezone
 
-def slot_is_in_past_or_too_soon(slot_date, slot_start_time, *, lead_minutes=None):
+from core import cacheversions
+
+# SlotClock.classify() results
+PAST = "past"
+TOO_SOON = "too_soon"
+OPEN = "open"
+
+
+class SlotClock:
+  """
+  "Now" and the booking cutoff (now + BOOKING_LEAD_MINUTES), computed once and
+  shared by everything that asks "can this slot still be opened/booked?" for
+  many slots: the grids, booking validation, queue draining.
+
+  The cutoff is now + lead in absolute time (then converted to local), so it
+  stays correct across DST changes; adding minutes to a local datetime would
+  move the wall clock instead. Slots are compared as aware datetimes, and only
+  on the (at most two) dates between now and the cutoff: everything before
+  now's date is past, everything after the cutoff's date is open.
+  """
+  __slots__ = ("tz", "now", "cutoff", "now_local", "cutoff_local")
+
+  def __init__(self, now=None, lead_minutes=None):
+    # default to settings, but allow an override for tests
+    lead = settings.BOOKING_LEAD_MINUTES if lead_minutes is None else int(lead_minutes)
+    self.tz = timezone.get_current_timezone()
+    # UTC, so comparisons with local slot times are always by instant
+    self.now = (now or timezone.now()).astimezone(dt_timezone.utc)
+    self.cutoff = self.now + timedelta(minutes=lead)
+    self.now_local = timezone.localtime(self.now, self.tz)
+    self.cutoff_local = timezone.localtime(self.cutoff, self.tz)
+
+  @property
+  def now_date(self):
+    return self.now_local.date()
+
+  @property
+  def cutoff_date(self):
+    return self.cutoff_local.date()
+
+  @property
+  def cutoff_time(self):
+    """Local wall-clock cutoff (for the templates' data-cutoff)."""
+    return self.cutoff_local.time().replace(microsecond=0)
+
+  def classify(self, slot_date, slot_start_time) -> str:
+    """PAST, TOO_SOON or OPEN for a slot starting at slot_date/slot_start_time (local)."""
+    if slot_date < self.now_date:
+      return PAST
+    if slot_date > self.cutoff_date:
+      return OPEN
+    # Boundary date: compare instants (make_aware resolves DST gaps/overlaps)
+    slot_start = timezone.make_aware(datetime.combine(slot_date, slot_start_time), self.tz)
+    if slot_start <= self.now:
+      return PAST
+    if slot_start <= self.cutoff:
+      return TOO_SOON
+    return OPEN
+
+  def classify_many(self, pairs) -> list:
+    """classify() for an iterable of (date, start_time) pairs, in order."""
+    return [self.classify(slot_date, slot_start_time) for slot_date, slot_start_time in pairs]
+
+  def is_open(self, slot_date, slot_start_time) -> bool:
+    return self.classify(slot_date, slot_start_time) == OPEN
+
+  def open_q(self, prefix=""):
+    """
+    Q for slots starting after the cutoff (wall-clock comparison in the DB;
+    differs from classify() only inside a DST overlap hour at the cutoff).
+    """
+    return (
+      Q(**{f"{prefix}date__gt": self.cutoff_date}) |
+      Q(**{f"{prefix}date": self.cutoff_date, f"{prefix}start_time__gt": self.cutoff_local.time()})
+    )
+
+
+def slot_is_in_past_or_too_soon(slot_date, slot_start_time, *, lead_minutes=None, clock=None):
   """
   A tiny utility that answers: “Is this slot in the past, or too soon (within BOOKING_LEAD_MINUTES)?
   True if the slot starts in the past OR within lead_minutes from 'now'
   (using the project's timezone).
   - slot_date: datetime.date
   - slot_start_time: datetime.time
+  - clock: a SlotClock to reuse when checking several slots
   """
-  # default to settings, but allow an override for tests
-  lead = settings.BOOKING_LEAD_MINUTES if lead_minutes is None else int(lead_minutes)
+  clock = clock or SlotClock(lead_minutes=lead_minutes)
+  return not clock.is_open(slot_date, slot_start_time)
+
 
-  # 'now' in local (Europe/London) time
-  now_local = timezone.localtime()
+# -----------------------------------------------------------------------------
+# Student week grid cache versions (booking/views.py _cached_week_slots)
+# -----------------------------------------------------------------------------
+def week_namespace(day) -> str:
+  """Cache-version namespace of the ISO week containing `day`."""
+  year, week, _ = day.isocalendar()
+  return f"availability:{year}-W{week:02d}"
 
-  # build an aware datetime for the slot start in the current TZ
-  slot_start_naive = datetime.combine(slot_date, slot_start_time)
-  slot_start = timezone.make_aware(slot_start_naive, timezone.get_current_timezone())
 
-  cutoff = now_local + timedelta(minutes=lead)
-  return slot_start <= cutoff
+def bump_weeks(days):
+  """Invalidate the cached weeks containing `days` once the current transaction commits."""
+  cacheversions.bump(*{week_namespace(day) for day in days})
@@ -0,0 +1,89 @@
+# booking/versions.py
+"""
+Versioned deltas for the teacher availability grid.
+
+Each teacher-month has a counter (AvailabilityVersion). Write paths call
+record_slot_changed() inside their transaction: it bumps the counter and
+stamps the slot with the new value. The grid page embeds the version it was
+rendered at; toggle_availability and the catch-up endpoint then return only
+the slots stamped after the client's version, so the response (and the
+query behind it) grows with the number of changes, not the size of the month.
+
+Paths that bypass record_slot_changed (admin edits, shell) aren't seen by
+open grids until the page is reloaded.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+from datetime import date
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.db import transaction
+from django.db.models import F
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from .models import AvailabilityVersion, TeacherAvailability
+
+
+def month_start(day):
+  return day.replace(day=1)
+
+
+def month_version(teacher_id, year, month) -> int:
+  """Current version of a teacher-month (0 if nothing has changed yet)."""
+  return (
+    AvailabilityVersion.objects
+    .filter(teacher_id=teacher_id, month=date(year, month, 1))
+    .values_list("version", flat=True)
+    .first()
+  ) or 0
+
+
+@transaction.atomic
+def record_slot_changed(slot) -> int:
+  """Bump `slot`'s teacher-month version and stamp the slot with it. Returns the new version."""
+  counter = AvailabilityVersion.objects.filter(teacher_id=slot.teacher_id, month=month_start(slot.date))
+  # The UPDATE row-locks the counter until commit, so concurrent changes get distinct versions
+  if not counter.update(version=F("version") + 1):
+    _, created = AvailabilityVersion.objects.get_or_create(
+      teacher_id=slot.teacher_id, month=month_start(slot.date), defaults={"version": 1},
+    )
+    if not created:  # lost the creation race
+      counter.update(version=F("version") + 1)
+
+  slot.version = counter.values_list("version", flat=True).get()
+  TeacherAvailability.objects.filter(pk=slot.pk).update(version=slot.version)
+  return slot.version
+
+
+def cell_state(slot) -> dict:
+  """A slot as the teacher grid sees it (keys match the page's data-date/data-start-time)."""
+  return {
+    "date": slot.date.strftime("%Y-%m-%d"),
+    "start_time": slot.start_time.strftime("%H:%M:%S"),
+    "is_available": slot.is_available,
+    "has_booking": hasattr(slot, "booking"),
+  }
+
+
+def changes_since(teacher_id, year, month, since):
+  """
+  (version, [cell_state, ...]) for slots in the teacher-month that changed
+  after version `since`.
+  """
+  version = month_version(teacher_id, year, month)
+  if since >= version:
+    return version, []
+
+  slots = (
+    TeacherAvailability.objects
+    .filter(teacher_id=teacher_id, date__year=year, date__month=month, version__gt=since)
+    .select_related("booking")
+    .order_by("date", "start_time")
+  )
+  return version, [cell_state(slot) for slot in slots]
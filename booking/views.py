@@ -12,10 +12,12 @@ from html import escape
 # -----------------------------------------------------------------------------
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.db import transaction, IntegrityError
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min, Q
 from django.http import JsonResponse 
 from django.shortcuts import render, redirect, get_object_or_404  # get_object_or_404 for advisor filter
+from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
@@ -23,12 +25,23 @@ from django.views.decorators.http import require_POST
 # -----------------------------------------------------------------------------
 # 3) Local application imports
 # -----------------------------------------------------------------------------
-from .models import TeacherAvailability, Booking
-from .utils import slot_is_in_past_or_too_soon
+from .admission import enqueue_booking_request, must_queue, released_q
+from .grid import day_time_slots, student_week_days, teacher_month_rows
+from .models import TeacherAvailability, Booking, BookingRequest, WaitlistEntry
+from .rollups import record_slot_toggled
+from .search import MEETING_MODES, next_available_slots
+from .services import BookingError, book_slot, check_student_can_book
+from .waitlist import join_waitlist, leave_waitlist, record_waitlist_opening
+from .utils import SlotClock, bump_weeks, slot_is_in_past_or_too_soon, week_namespace
+from .versions import cell_state, changes_since, month_version, record_slot_changed
 from users.utils import has_completed_questionnaire, absolute_avatar_url
 from users.models import CustomUser, TeacherProfile  # CustomUser for advisor lookup
+from core import cacheversions, metrics
+from core.dbrouting import read_replica
+from core.ratelimit import rate_limit
 
 
+@read_replica
 @login_required
 def teacher_availability_view(request):
   """
@@ -52,64 +65,31 @@ def teacher_availability_view(request):
     if date(year, month, day).weekday() < 5
   ]
 
-  time_slots = [
-    (
-      datetime(2000, 1, 1, hour, minute).time(),
-      (datetime(2000, 1, 1, hour, minute) + timedelta(minutes=30)).time(),
-    )
-    for hour in range(9, 18)
-    for minute in (0, 30)
-  ]
+  time_slots = day_time_slots()
 
   teacher_availabilities = TeacherAvailability.objects.filter(
     teacher=request.user, date__year=year, date__month=month
-  ).select_related("booking__student")
-
-  availability_dict = {}
+  ).select_related("booking__student__student_profile")  # avatars without a query per booking
+  # Read before the slots: a change landing in between is then re-sent, not lost
+  availability_version = month_version(request.user.id, year, month)
 
-  for slot in teacher_availabilities:
-    key = f"{slot.date.strftime('%Y-%m-%d')},{slot.start_time.strftime('%H:%M:%S')}"
+  # One "now"/cutoff for the whole page
+  clock = SlotClock()
 
-    slot_info = {
-      "is_available": slot.is_available,
-      "has_booking": False,
-      "student_name": None,
-      "student_email": None,
-      "student_avatar": None,
-    }
-
-    if hasattr(slot, "booking"):
-      student = slot.booking.student
-      slot_info["has_booking"] = True
-      slot_info["student_name"]  = f"{student.first_name} {student.last_name}".strip()
-      slot_info["student_email"] = student.email
-      slot_info["student_message"] = slot.booking.message or ""
-      slot_info["student_avatar"] = absolute_avatar_url(request, student)
-
-
-    availability_dict[key] = slot_info
-
-  # Fill in empty slots with default values
-  for day in month_dates:
-    day_str = day.strftime('%Y-%m-%d')
-    for start_time, _ in time_slots:
-      key = f"{day_str},{start_time.strftime('%H:%M:%S')}"
-      if key not in availability_dict:
-        availability_dict[key] = {
-          "is_available": False,
-          "has_booking": False,
-          "student_name": None,
-          "student_email": None,
-          "student_avatar": None,
-          "student_message": "",
-        }
+  # Rows/cells in render order (booking/grid.py)
+  month_rows = teacher_month_rows(
+    teacher_availabilities, month_dates, time_slots, clock,
+    avatar_url=lambda student: absolute_avatar_url(request, student),
+  )
 
   context = {
-    "today": timezone.localdate(),
+    "today": clock.now_date,
     "month_dates": month_dates,
     "time_slots": time_slots,
-    "availability_dict": availability_dict,
+    "month_rows": month_rows,
+    "availability_version": availability_version,
     "current_month": calendar.month_name[month],
+    "current_month_number": month,
     "current_year": year,
     "prev_month": (month - 1) if month > 1 else 12,
     "prev_year": year if month > 1 else year - 1,
@@ -117,19 +97,77 @@ def teacher_availability_view(request):
     "next_year": year if month < 12 else year + 1,
   }
 
-  now_local = timezone.localtime()
-  context["now_date"] = now_local.date()
-  context["cutoff_time"] = (now_local + timedelta(minutes=settings.BOOKING_LEAD_MINUTES)).time().replace(microsecond=0)
+  context["now_date"] = clock.now_date
+  context["cutoff_date"] = clock.cutoff_date
+  context["cutoff_time"] = clock.cutoff_time
+
+  # Scheduled release for this month's open slots (if any)
+  pending_release = [
+    s.release_at for s in teacher_availabilities
+    if s.is_available and s.release_at and s.release_at > clock.now
+  ]
+  context["scheduled_release_at"] = min(pending_release) if pending_release else None
+  context["scheduled_release_count"] = len(pending_release)
 
   return render(request, "booking/teacher_availability.html", context)
 
 
+@require_POST
+@login_required
+def schedule_release(request):
+  """
+  Hold back this month's open, unbooked future slots until a given time
+  (form field `release_at`, local datetime), or release them now (`clear`).
+  Attempts right after the release go through the admission queue.
+  """
+  if request.user.role != "teacher":
+    return redirect("teacher_profile")
+
+  try:
+    year = int(request.POST.get("year", ""))
+    month = int(request.POST.get("month", ""))
+  except ValueError:
+    return redirect("teacher_availability")
+  back = redirect(f"{reverse('teacher_availability')}?year={year}&month={month}")
+
+  if request.POST.get("clear"):
+    release_at = None
+  else:
+    try:
+      release_at = timezone.make_aware(
+        datetime.strptime(request.POST.get("release_at", ""), "%Y-%m-%dT%H:%M"),
+        timezone.get_current_timezone(),
+      )
+    except ValueError:
+      return back
+    if release_at <= timezone.now():
+      return back
+
+  TeacherAvailability.objects.filter(
+    teacher=request.user,
+    date__year=year,
+    date__month=month,
+    date__gte=timezone.localdate(),
+    is_available=True,
+    booking__isnull=True,
+  ).update(release_at=release_at)
+  # update() skips booking/signals.py: bump the month's remaining weeks
+  _, num_days = calendar.monthrange(year, month)
+  first = max(date(year, month, 1), timezone.localdate())
+  bump_weeks(first + timedelta(days=n) for n in range((date(year, month, num_days) - first).days + 1))
+  return back
+
+
 @csrf_exempt  # Allows AJAX POST requests without CSRF issues
 @require_POST
 @login_required
+@rate_limit("toggle_availability")
 def toggle_availability(request):
   """
   Toggles a specific time slot's availability for the logged-in teacher.
+  With "version" (the grid's current month version) in the body, "changes"
+  holds every cell changed since then, this toggle included; without it,
+  just this cell.
   """
   if request.method == "POST":
     try:
@@ -145,6 +183,8 @@ def toggle_availability(request):
       slot_date = datetime.strptime(date_str, "%Y-%m-%d").date()
       slot_time = datetime.strptime(start_time_str, "%H:%M:%S").time()
       end_time = datetime.strptime(end_time_str, "%H:%M:%S").time()
+      client_version = data.get("version")
+      client_version = int(client_version) if client_version is not None else None
 
       # Ensure the user is a teacher
       if request.user.role != "teacher":
@@ -169,23 +209,29 @@ def toggle_availability(request):
             status=400
           )
 
-      # Proceed with the toggle
-      slot.is_available = new_state
-      slot.save(update_fields=["is_available"])
+      # Proceed with the toggle (rollup counters commit with it)
+      with transaction.atomic():
+        slot.is_available = new_state
+        slot.save(update_fields=["is_available"])
+        record_slot_toggled(slot, opened=new_state)
+        record_slot_changed(slot)
 
-      # Refresh availability dict for the month (string keys for JSON)
-      teacher_availabilities = TeacherAvailability.objects.filter(
-        teacher=request.user, date__year=slot_date.year, date__month=slot_date.month
-      )
-      updated_availability_dict = {
-        f"{s.date.strftime('%Y-%m-%d')},{s.start_time.strftime('%H:%M:%S')}": s.is_available
-        for s in teacher_availabilities
-      }
+        # Waiting students get first go: the queue worker matches them, and until
+        # then direct attempts on the slot are queued behind them (must_queue)
+        if new_state:
+          record_waitlist_opening(slot)
+
+      # Only what changed, not the whole month
+      if client_version is None:
+        version, changes = month_version(request.user.id, slot_date.year, slot_date.month), [cell_state(slot)]
+      else:
+        version, changes = changes_since(request.user.id, slot_date.year, slot_date.month, client_version)
 
       return JsonResponse({
         "success": True,
         "is_available": slot.is_available,
-        "availability_dict": updated_availability_dict
+        "version": version,
+        "changes": changes,
       })
 
     except Exception as e:
@@ -195,6 +241,83 @@ def toggle_availability(request):
   return JsonResponse({"error": "Invalid request"}, status=400)
 
 
+@read_replica
+@login_required
+def availability_changes(request):
+  """
+  Catch-up for an open teacher grid: cells of ?year=&month= changed since
+  version ?since= (0 = every slot that has ever changed), plus the current version.
+  """
+  if request.user.role != "teacher":
+    return JsonResponse({"error": "Unauthorized access"}, status=403)
+
+  try:
+    year = int(request.GET["year"])
+    month = int(request.GET["month"])
+    since = int(request.GET.get("since", 0))
+  except (KeyError, ValueError):
+    return JsonResponse({"error": "year, month and since must be integers"}, status=400)
+  if not (1 <= month <= 12) or since < 0:
+    return JsonResponse({"error": "Invalid month or version"}, status=400)
+
+  version, changes = changes_since(request.user.id, year, month, since)
+  return JsonResponse({"success": True, "version": version, "changes": changes})
+
+
+def _week_slots(week_start, week_end):
+  """
+  Slots students can see in [week_start, week_end]: open and released, or
+  already booked, for bookable advisors. One query, time-ordered.
+  """
+  return (
+    TeacherAvailability.objects
+      .filter(date__range=(week_start, week_end))
+      .filter((Q(is_available=True) & released_q()) | Q(booking__isnull=False))
+      .filter(
+          teacher__role='teacher',
+          teacher__teacher_profile__is_active_advisor=True,
+      )
+      .filter(
+          Q(teacher__teacher_profile__can_host_online=True) |
+          Q(teacher__teacher_profile__can_host_in_person=True)
+      )
+      .select_related("teacher", "booking__student", "teacher__teacher_profile")
+      .order_by("date", "start_time")
+  )
+
+
+def _cached_week_slots(week_start, week_end):
+  """
+  _week_slots() as a list, cached in this worker under two versions
+  (core/cacheversions.py): the week's own ("availability:<year>-W<week>",
+  bumped by slot, booking and release changes in that week) and the global
+  "availability" (user and advisor profile changes, which show in every
+  week). Every worker sees either on its next request. An entry also expires
+  at the week's next scheduled release, which changes the result without
+  any write.
+  """
+  key = f"week-slots:{week_start:%Y-%m-%d}:{week_end:%Y-%m-%d}:{cacheversions.version('availability')}"
+  version = cacheversions.version(week_namespace(week_start))
+  slots = cache.get(key, version=version)
+  metrics.cache_lookup("week_slots", hits=int(slots is not None), misses=int(slots is None))
+  if slots is not None:
+    return slots
+
+  now = timezone.now()
+  next_release = (
+    TeacherAvailability.objects
+      .filter(date__range=(week_start, week_end), is_available=True, release_at__gt=now)
+      .aggregate(next=Min("release_at"))["next"]
+  )
+  slots = list(_week_slots(week_start, week_end))
+  timeout = settings.WEEK_SLOTS_CACHE_SECONDS
+  if next_release:
+    timeout = min(timeout, (next_release - now).total_seconds())
+  cache.set(key, slots, timeout, version=version)
+  return slots
+
+
+@read_replica
 @login_required
 def student_booking_view(request):
   if request.user.role == 'student' and not has_completed_questionnaire(request.user):
@@ -214,8 +337,9 @@ def student_booking_view(request):
       except TeacherProfile.DoesNotExist:
           return redirect("advisors")  
   
-  # Get today's date
-  today = timezone.localdate()
+  # Get today's date (and the booking cutoff, once for the whole grid)
+  clock = SlotClock()
+  today = clock.now_date
 
   # Try to get selected date from query string, fallback to today
   selected_date_str = request.GET.get("date")
@@ -259,57 +383,14 @@ def student_booking_view(request):
   else:
     month_display = f"{calendar.month_name[week_start.month]} - {calendar.month_name[week_end.month]} {week_end.year}"
 
-  # Generate all 30-min time slots between 9:00–17:30
-  time_slots = [
-    (
-      datetime(2000, 1, 1, hour, minute).time(),
-      (datetime(2000, 1, 1, hour, minute) + timedelta(minutes=30)).time()
-    )
-    for hour in range(9, 18)
-    for minute in (0, 30)
-  ]
+  # All 30-min time slots between 9:00–17:30
+  time_slots = day_time_slots()
 
-  # === Include slots that are AVAILABLE or already BOOKED on the selected day ===
-  day_slots = (
-    TeacherAvailability.objects
-      .filter(date=selected_date)
-      .filter(Q(is_available=True) | Q(booking__isnull=False))
-      .filter(
-          teacher__role='teacher',
-          teacher__teacher_profile__is_active_advisor=True,
-      )
-      .filter(
-          Q(teacher__teacher_profile__can_host_online=True) |
-          Q(teacher__teacher_profile__can_host_in_person=True)
-      )
-      .select_related("teacher", "booking__student", "teacher__teacher_profile")
+  # === The whole week (Mon–Fri) in one query; day tabs switch client-side ===
+  week_days = student_week_days(
+    _cached_week_slots(week_dates[0], week_dates[-1]), week_dates, time_slots, request.user.id, clock,
   )
 
-
-  teacher_availability_by_email = {}
-  teacher_profiles = {}
-
-  for slot in day_slots:
-    # thanks to select_related, this doesn't hit the DB again
-    profile = slot.teacher.teacher_profile
-
-    # optional belt-and-braces; your queryset already filters to bookable
-    if not profile.is_bookable:
-        continue
-
-    teacher_email = slot.teacher.email
-    key = f"{slot.date.strftime('%Y-%m-%d')},{slot.start_time.strftime('%H:%M:%S')}"
-    teacher_availability_by_email.setdefault(teacher_email, {})[key] = slot
-    teacher_profiles[teacher_email] = profile
-
-  # Ensure every time slot exists (even if not in DB) for the teachers we kept — for SELECTED DAY ONLY
-  date_str = selected_date.strftime('%Y-%m-%d')
-  for email in list(teacher_availability_by_email.keys()):
-    for start_time, _ in time_slots:
-      key = f"{date_str},{start_time.strftime('%H:%M:%S')}"
-      if key not in teacher_availability_by_email[email]:
-        teacher_availability_by_email[email][key] = None
-
   # Pass all data to the template
   context = {
     "today": today,
@@ -321,22 +402,23 @@ def student_booking_view(request):
     "disabled_days": disabled_days,
     "month_display": month_display,
     "time_slots": time_slots,
-    "teacher_availability_by_email": teacher_availability_by_email,
-    "teacher_profiles": teacher_profiles,
+    "week_days": week_days,
     "student_email": request.user.email,
   }
 
   # Provide 'now' and 'cutoff' for visual disabling in the template
-  now_local = timezone.localtime()
-  context["now_date"] = now_local.date()
-  context["cutoff_time"] = (now_local + timedelta(minutes=settings.BOOKING_LEAD_MINUTES)).time().replace(microsecond=0)
+  context["now_date"] = clock.now_date
+  context["cutoff_date"] = clock.cutoff_date
+  context["cutoff_time"] = clock.cutoff_time
   # expose the current advisor filter to the template
   context["advisor_id"] = teacher_user.id if teacher_user else None
 
   return render(request, "booking/student_booking_view.html", context)
 
 
+@read_replica
 @login_required
+@rate_limit("get_available_slots")
 def get_available_slots(request):
     """
     Returns available teachers and their time slots for a given date.
@@ -359,7 +441,7 @@ def get_available_slots(request):
     #  Filter to bookable teachers
     available_slots = (
         TeacherAvailability.objects
-        .filter(date=selected_date, is_available=True)
+        .filter(released_q(), date=selected_date, is_available=True)
         .filter(teacher__role="teacher")
         .filter(teacher__teacher_profile__is_active_advisor=True)
         .filter(
@@ -381,9 +463,102 @@ def get_available_slots(request):
     return JsonResponse({"success": True, "slots": slots_dict})
 
 
+@read_replica
+@login_required
+@rate_limit("week_slots")
+def week_slots_view(request):
+  """
+  The student grid's week as JSON, from one (cached) query:
+    {"week_start", "days": {"YYYY-MM-DD": {teacher_email: {"teacher_name", "advisor_id",
+                                                          "slots": {"HH:MM:SS": state}}}}}
+  state: "available", "booked" (by someone else) or "mine".
+  ?date= picks the week (any day in it); defaults to this week.
+  """
+  if request.user.role == 'student' and not has_completed_questionnaire(request.user):
+    return JsonResponse({"error": "Please complete the questionnaire first."}, status=403)
+
+  today = timezone.localdate()
+  try:
+    selected_date = datetime.strptime(request.GET["date"], "%Y-%m-%d").date() if request.GET.get("date") else today
+  except ValueError:
+    return JsonResponse({"error": "Invalid date format"}, status=400)
+
+  week_start = selected_date - timedelta(days=selected_date.weekday())
+  days = {(week_start + timedelta(days=i)).strftime("%Y-%m-%d"): {} for i in range(5)}
+
+  for slot in _cached_week_slots(week_start, week_start + timedelta(days=4)):
+    teacher = slot.teacher
+    if hasattr(slot, "booking"):
+      state = "mine" if slot.booking.student_id == request.user.id else "booked"
+    else:
+      state = "available"
+    entry = days[slot.date.strftime("%Y-%m-%d")].setdefault(teacher.email, {
+      "teacher_name": f"{teacher.first_name} {teacher.last_name}".strip(),
+      "advisor_id": teacher.id,
+      "slots": {},
+    })
+    entry["slots"][slot.start_time.strftime("%H:%M:%S")] = state
+
+  return JsonResponse({"success": True, "week_start": week_start.strftime("%Y-%m-%d"), "days": days})
+
+
+@read_replica
+@login_required
+@rate_limit("next_available_slots")
+def next_available_slots_view(request):
+  """
+  Earliest bookable slots for the current student, across all advisors.
+  Query: ?limit=5 (max 20), ?advisor=<teacher id>, ?mode=online|in_person
+  JSON by default; an HTML list for HTMX requests (booking page panel).
+  """
+  try:
+    check_student_can_book(request.user)
+  except BookingError as e:
+    return JsonResponse({"error": e.message}, status=e.status)
+
+  try:
+    limit = int(request.GET.get("limit", 5))
+    advisor_id = int(request.GET["advisor"]) if request.GET.get("advisor") else None
+  except ValueError:
+    return JsonResponse({"error": "Invalid parameters"}, status=400)
+  mode = request.GET.get("mode") or None
+  if mode and mode not in MEETING_MODES:
+    return JsonResponse({"error": "Invalid meeting mode"}, status=400)
+
+  slots = next_available_slots(request.user, limit=limit, teacher_id=advisor_id, mode=mode)
+
+  if request.headers.get("HX-Request"):
+    return render(request, "booking/partials/next_slots.html", {"slots": slots})
+
+  return JsonResponse({
+    "success": True,
+    "slots": [
+      {
+        "date": slot.date.strftime("%Y-%m-%d"),
+        "start": slot.start_time.strftime("%H:%M:%S"),
+        "end": slot.end_time.strftime("%H:%M:%S"),
+        "teacher_name": f"{slot.teacher.first_name} {slot.teacher.last_name}".strip(),
+        "teacher_email": slot.teacher.email,
+        "advisor_id": slot.teacher_id,
+        "online": slot.teacher.teacher_profile.can_host_online,
+        "in_person": slot.teacher.teacher_profile.can_host_in_person,
+        "booking_url": f"{reverse('student_booking_view')}?date={slot.date:%Y-%m-%d}&advisor={slot.teacher_id}",
+      }
+      for slot in slots
+    ],
+  })
+
+
+def _booking_response(outcome, payload, status=200):
+  """create_booking's JsonResponse, counted in booking_outcomes_total (core/metrics.py)."""
+  metrics.inc("booking_outcomes_total", outcome=outcome, status=status)
+  return JsonResponse(payload, status=status)
+
+
 @csrf_exempt
 @require_POST
 @login_required
+@rate_limit("create_booking")
 def create_booking(request):
   """Creates a booking for the current student, given a valid availability slot.
   Prevents double-booking and enforces only one booking per day.
@@ -391,7 +566,7 @@ def create_booking(request):
   """
   # Block bookings until questionnaire is complete
   if getattr(request.user, "role", None) == "student" and not has_completed_questionnaire(request.user):
-    return JsonResponse({"error": "Please complete the questionnaire first."}, status=403)
+    return _booking_response("questionnaire", {"error": "Please complete the questionnaire first."}, status=403)
 
   try:
     data = json.loads(request.body)
@@ -402,93 +577,85 @@ def create_booking(request):
     message        = (data.get("message", "") or "").strip()[:300]  # defensive cap
 
     if not all([teacher_email, date_str, start_time_str, end_time_str]):
-      return JsonResponse({"error": "Missing required data"}, status=400)
+      return _booking_response("missing_data", {"error": "Missing required data"}, status=400)
 
     # Only students can create bookings
     if getattr(request.user, "role", None) != "student":
-      return JsonResponse({"error": "Unauthorized access"}, status=403)
+      return _booking_response("forbidden", {"error": "Unauthorized access"}, status=403)
 
     # Parse inputs
     slot_date  = datetime.strptime(date_str, "%Y-%m-%d").date()
     start_time = datetime.strptime(start_time_str, "%H:%M:%S").time()
     end_time   = datetime.strptime(end_time_str,   "%H:%M:%S").time()
 
-    # Use a transaction and lock the slot row to avoid races
-    with transaction.atomic():
-      # Lock just the candidate slot
-      try:
-        slot = (
-          TeacherAvailability.objects
-          .select_for_update()
-          .select_related("teacher", "teacher__teacher_profile")
-          .get(
-            teacher__email=teacher_email,
-            teacher__role="teacher",
-            date=slot_date,
-            start_time=start_time,
-            end_time=end_time,
-            is_available=True
-          )
-        )
-      except TeacherAvailability.DoesNotExist:
-        return JsonResponse({"error": "This slot is not available"}, status=404)
-      
-      # ✅ Bookable gate: advisor must be active AND offer at least one meeting mode
-      prof = getattr(slot.teacher, "teacher_profile", None)
-      if prof is None or not prof.is_active_advisor or not (prof.can_host_online or prof.can_host_in_person):
-        return JsonResponse({"error": "This advisor is not currently available to book."}, status=400)
-
-      # Block past/too-soon bookings (do this inside the txn in case time advanced)
-      if slot_is_in_past_or_too_soon(slot.date, slot.start_time):
-        return JsonResponse({"error": "This slot is no longer available to book."}, status=400)
-
-      # Enforce 1 booking per student per day (check inside the txn to avoid races)
-      if Booking.objects.filter(student=request.user, teacher_availability__date=slot_date).exists():
-        return JsonResponse({"error": "You already have a booking on this day."}, status=400)
-
-      # Double-booking guard (in case a Booking row already exists)
-      if Booking.objects.filter(teacher_availability=slot).exists():
-        return JsonResponse({"error": "Slot already booked"}, status=409)
-
-      # Create the booking
-      try:
-        booking = Booking.objects.create(
-          student=request.user,
-          teacher_availability=slot,
-          message=message
-        )
-      except IntegrityError:
-        # In case of DB uniqueness constraints, surface as conflict
-        return JsonResponse({"error": "Slot already booked"}, status=409)
-
-      # Mark the slot as no longer available
-      slot.is_available = False
-      slot.save(update_fields=["is_available"])
-
-    # Prepare teacher metadata (outside the lock)
-    teacher = slot.teacher
-    teacher_name = f"{teacher.first_name} {teacher.last_name}".strip()
-    teacher_avatar = absolute_avatar_url(request, teacher)
-
+    slot_lookup = dict(
+      teacher__email=teacher_email,
+      date=slot_date,
+      start_time=start_time,
+      end_time=end_time,
+    )
 
-    print("📸 Avatar sent to frontend:", teacher_avatar)
+    # Just-released slot (or earlier entrants / waitlisted students still waiting): queue the attempt instead of racing for the row lock
+    slot = (
+      TeacherAvailability.objects
+      .filter(is_available=True, **slot_lookup)
+      .only("id", "release_at")
+      .first()
+    )
+    if slot and must_queue(slot):
+      queued = enqueue_booking_request(request.user, slot, message=message)
+      return _booking_response("queued", {
+        "queued": True,
+        "request_id": queued.id,
+        "status_url": reverse("booking_request_status", args=[queued.id]),
+      }, status=202)
+
+    # Lock the slot row and apply the booking rules (see booking/services.py)
+    try:
+      booking = book_slot(request.user, message=message, **slot_lookup)
+    except BookingError as e:
+      return _booking_response(e.code or "rejected", {"error": e.message}, status=e.status)
 
-    return JsonResponse({
-      "success": True,
-      "message": "Booking confirmed!",
-      "booking_id": booking.id,
-      "teacher_name": teacher_name,
-      "teacher_email": teacher.email,
-      "teacher_avatar": teacher_avatar,
-      "student_message": escape(booking.message),
-      "advisor_id": teacher.id,  # preserve advisor context for links
-    })
+    return _booking_response("success", _booking_success_payload(request, booking))
 
   except Exception as e:
     print("❌ Unexpected error during booking:", str(e))
-    return JsonResponse({"error": "An unexpected error occurred."}, status=500)
+    return _booking_response("error", {"error": "An unexpected error occurred."}, status=500)
+
+
+def _booking_success_payload(request, booking):
+  """JSON body for a confirmed booking (teacher metadata for the grid)."""
+  teacher = booking.teacher_availability.teacher
+  return {
+    "success": True,
+    "message": "Booking confirmed!",
+    "booking_id": booking.id,
+    "teacher_name": f"{teacher.first_name} {teacher.last_name}".strip(),
+    "teacher_email": teacher.email,
+    "teacher_avatar": absolute_avatar_url(request, teacher),
+    "student_message": escape(booking.message),
+    "advisor_id": teacher.id,  # preserve advisor context for links
+  }
+
+
+@login_required
+def booking_request_status(request, pk):
+  """
+  Poll target for a queued booking attempt (see create_booking).
+  Pending -> {"queued": true}; then the same payload/error create_booking gives.
+  """
+  req = get_object_or_404(
+    BookingRequest.objects.select_related("booking__teacher_availability__teacher"),
+    pk=pk, student=request.user,
+  )
+  if req.status in (BookingRequest.STATUS_PENDING, BookingRequest.STATUS_PROCESSING):
+    return JsonResponse({"queued": True, "status": req.status})
+  if req.status == BookingRequest.STATUS_BOOKED and req.booking:
+    return JsonResponse(_booking_success_payload(request, req.booking))
+  return JsonResponse({"error": req.error or "Booking failed."}, status=req.error_status or 400)
 
 
+@read_replica
 @login_required
 def student_bookings_list(request):
   # only students may stay here
@@ -550,6 +717,7 @@ def student_bookings_list(request):
   })
   
   
+@read_replica
 @login_required
 def teacher_bookings_list(request):
   # only teachers may stay here
@@ -652,6 +820,7 @@ def teacher_bookings_list(request):
   })
   
 
+@read_replica
 @login_required
 def admin_bookings_list(request):
   # only admins may stay here
@@ -808,6 +977,7 @@ def admin_bookings_list(request):
   })
   
   
+@read_replica
 @login_required
 def student_bookings_past(request):
   if request.user.role != "student":
@@ -862,6 +1032,7 @@ def student_bookings_past(request):
   })
   
   
+@read_replica
 @login_required
 def teacher_bookings_past(request):
   # only teachers stay here
@@ -921,6 +1092,7 @@ def teacher_bookings_past(request):
   })
   
 
+@read_replica
 @login_required
 def admin_bookings_past(request):
   # restrict view to admins
@@ -1029,3 +1201,44 @@ def admin_bookings_past(request):
   })
 
 
+@require_POST
+@login_required
+def join_waitlist_view(request, teacher_id):
+  """
+  Student joins (or updates) the waitlist for an advisor between two dates.
+  Form POST from the advisor's profile page; redirects back to it.
+  """
+  teacher_user = get_object_or_404(CustomUser, pk=teacher_id, role="teacher")
+  back = redirect("teacher_profile_admin", teacher_id=teacher_user.id)
+
+  try:
+    check_student_can_book(request.user)
+  except BookingError:
+    return back
+
+  try:
+    date_from = datetime.strptime(request.POST.get("date_from", ""), "%Y-%m-%d").date()
+    date_to = datetime.strptime(request.POST.get("date_to", ""), "%Y-%m-%d").date()
+  except ValueError:
+    return back
+
+  # Clamp to sensible bounds: not in the past, not reversed, at most WAITLIST_MAX_DAYS
+  today = timezone.localdate()
+  date_from = max(date_from, today)
+  date_to = min(date_to, today + timedelta(days=settings.WAITLIST_MAX_DAYS))
+  if date_to < date_from:
+    return back
+
+  join_waitlist(request.user, teacher_user, date_from, date_to)
+  return back
+
+
+@require_POST
+@login_required
+def leave_waitlist_view(request, pk):
+  """Student removes their own waiting entry."""
+  entry = get_object_or_404(
+    WaitlistEntry, pk=pk, student=request.user, status=WaitlistEntry.STATUS_WAITING
+  )
+  leave_waitlist(entry)
+  return redirect("teacher_profile_admin", teacher_id=entry.teacher_id)
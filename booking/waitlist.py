@@ -0,0 +1,153 @@
+# booking/waitlist.py
+"""
+Waitlist matching: when an advisor opens a slot, book it for the oldest
+waiting student whose date range covers it and who passes the same rules
+create_booking enforces (booking/services.py).
+
+toggle_availability only records a WaitlistOpening (with the toggle, so a
+rolled back toggle records nothing); `manage.py process_booking_queue` runs
+drain_waitlist(), which books and emails outside the request. Until then,
+booking attempts on the slot are queued (booking/admission.py must_queue)
+and processed only after the opening is matched. Openings of a scheduled
+release wait until release_at. Entries whose date_to has passed are marked
+expired on each pass.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import logging
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from .models import TeacherAvailability, WaitlistEntry, WaitlistOpening
+from .services import BookingError, book_slot, check_student_can_book
+
+logger = logging.getLogger(__name__)
+
+# Student-specific failures: try the next student in the queue.
+# Anything else means the slot itself is gone/unbookable: stop.
+_SKIP_STUDENT_CODES = {"forbidden", "questionnaire", "one_per_day"}
+
+
+def join_waitlist(student, teacher, date_from, date_to):
+  """
+  Add (or widen) the student's waiting entry for this advisor.
+  One waiting entry per (student, teacher): re-joining updates the range
+  but keeps the original queue position.
+  """
+  entry = (
+    WaitlistEntry.objects
+    .filter(student=student, teacher=teacher, status=WaitlistEntry.STATUS_WAITING)
+    .first()
+  )
+  if entry:
+    entry.date_from, entry.date_to = date_from, date_to
+    entry.save(update_fields=["date_from", "date_to"])
+    return entry
+  return WaitlistEntry.objects.create(student=student, teacher=teacher, date_from=date_from, date_to=date_to)
+
+
+def leave_waitlist(entry):
+  entry.status = WaitlistEntry.STATUS_CANCELLED
+  entry.resolved_at = timezone.now()
+  entry.save(update_fields=["status", "resolved_at"])
+
+
+def assign_slot_from_waitlist(slot_id):
+  """
+  Try to book slot `slot_id` for the next eligible waiting student.
+  Returns the WaitlistEntry that got it, or None.
+  """
+  try:
+    slot = TeacherAvailability.objects.get(pk=slot_id, is_available=True)
+  except TeacherAvailability.DoesNotExist:
+    return None
+
+  candidates = (
+    WaitlistEntry.objects
+    .filter(
+      teacher_id=slot.teacher_id,
+      status=WaitlistEntry.STATUS_WAITING,
+      date_from__lte=slot.date,
+      date_to__gte=slot.date,
+    )
+    .select_related("student")
+    .order_by("created_at", "pk")
+  )
+
+  for entry in candidates:
+    try:
+      check_student_can_book(entry.student)
+      with transaction.atomic():
+        booking = book_slot(entry.student, pk=slot.pk)
+        entry.status = WaitlistEntry.STATUS_ASSIGNED
+        entry.booking = booking
+        entry.resolved_at = timezone.now()
+        entry.save(update_fields=["status", "booking", "resolved_at"])
+    except BookingError as e:
+      if e.code in _SKIP_STUDENT_CODES:
+        continue
+      return None
+
+    from notifications.services import notify_waitlist_assigned  # on first use, not at worker boot
+    notify_waitlist_assigned(entry)
+    return entry
+
+  return None
+
+
+def record_waitlist_opening(slot):
+  """
+  Queue a just-opened slot for matching if anyone is waiting for it.
+  Call inside the toggle's transaction.
+  """
+  waiting = WaitlistEntry.objects.filter(
+    teacher_id=slot.teacher_id,
+    status=WaitlistEntry.STATUS_WAITING,
+    date_from__lte=slot.date,
+    date_to__gte=slot.date,
+  )
+  if waiting.exists():
+    WaitlistOpening.objects.get_or_create(teacher_availability=slot)
+
+
+def expire_waitlist_entries(today=None) -> int:
+  """Mark waiting entries whose range has ended as expired. Returns how many."""
+  today = today or timezone.localdate()
+  return WaitlistEntry.objects.filter(
+    status=WaitlistEntry.STATUS_WAITING, date_to__lt=today,
+  ).update(status=WaitlistEntry.STATUS_EXPIRED, resolved_at=timezone.now())
+
+
+def drain_waitlist(limit=None, now=None) -> int:
+  """Match recorded openings, oldest first. Returns how many slots were assigned."""
+  now = now or timezone.now()
+  expire_waitlist_entries(timezone.localdate(now))
+
+  due = (
+    WaitlistOpening.objects
+    .filter(Q(teacher_availability__release_at__isnull=True) | Q(teacher_availability__release_at__lte=now))
+    .values_list("pk", "teacher_availability_id")[:limit]
+  )
+  assigned = 0
+  for opening_id, slot_id in due:
+    # Queued direct attempts on the slot wait until the opening is gone, so
+    # delete it only after matching (a second worker's book_slot finds the slot taken)
+    try:
+      if assign_slot_from_waitlist(slot_id):
+        assigned += 1
+    except Exception:
+      # Matching is best-effort: the slot stays open for normal booking
+      logger.exception("Waitlist assignment failed for slot %s", slot_id)
+    finally:
+      WaitlistOpening.objects.filter(pk=opening_id).delete()
+  return assigned
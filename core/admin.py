@@ -1,3 +1,39 @@
 from django.contrib import admin
+from django.db.models import F
+from django.utils.html import format_html
 
-# Register your models here.
+from .models import SlowQuery
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('short_sql', 'view_name', 'database', 'count', 'avg_ms_display', 'max_ms', 'total_ms', 'last_seen')
+    list_filter = ('database', 'view_name')
+    search_fields = ('sql', 'view_name')
+    date_hierarchy = 'last_seen'
+    # Recorded by core/slowqueries.py; "total" ranks shapes by overall cost (default ordering)
+    readonly_fields = (
+        'fingerprint', 'database', 'view_name', 'sql', 'count', 'total_ms', 'max_ms',
+        'sample_sql', 'sample_param_types', 'explain_display', 'first_seen', 'last_seen',
+    )
+    exclude = ('explain',)
+
+    def get_queryset(self, request):
+        # avg as an annotation so the column sorts in the database
+        return super().get_queryset(request).annotate(avg=F('total_ms') / F('count'))
+
+    def has_add_permission(self, request):
+        return False
+
+    def short_sql(self, obj):
+        return obj.sql[:100] + '…' if len(obj.sql) > 100 else obj.sql
+    short_sql.short_description = "Query"
+
+    def avg_ms_display(self, obj):
+        return round(obj.avg_ms, 1)
+    avg_ms_display.short_description = "Avg ms"
+    avg_ms_display.admin_order_field = 'avg'
+
+    def explain_display(self, obj):
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', obj.explain or "—")
+    explain_display.short_description = "EXPLAIN"
@@ -1,6 +1,28 @@
 from django.apps import AppConfig
+from django.contrib.staticfiles.apps import StaticFilesConfig
+from django_ckeditor_5.apps import DjangoCkeditor5Config
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+
+class CoreStaticFilesConfig(StaticFilesConfig):
+    """
+    staticfiles with project-specific collectstatic ignores.
+    css/tailwind.css is the Tailwind *source* (npm @imports); only the built
+    css/languagelink.css is served, and the manifest storage can't hash the source.
+    """
+    ignore_patterns = StaticFilesConfig.ignore_patterns + ["tailwind.css"]
+
+
+class CKEditor5Config(DjangoCkeditor5Config):
+    """
+    django_ckeditor_5 without its ready() signals. They only clean up images of
+    CKEditor5Field models (we have none: notes use the widget on a TextField),
+    and importing them loads Pillow in every worker at boot.
+    """
+
+    def ready(self):
+        pass
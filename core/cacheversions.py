@@ -0,0 +1,104 @@
+# core/cacheversions.py
+"""
+Cross-process invalidation for the per-process (LocMem) caches.
+
+Each cache namespace has a version in the database (CacheVersion). Cached
+values are stored with Django's cache `version=` argument set to the current
+version, so bumping it makes every worker's old entries unreachable at once,
+on every node, without a broker:
+
+  cache.get(key, version=cacheversions.version("directory"))
+  cacheversions.bump("directory", "avatars")   # after the write commits
+
+Write paths call bump() inside their transaction; the UPDATE runs in
+transaction.on_commit, so a rolled back write invalidates nothing and other
+workers never recompute from uncommitted data.
+
+Reads are cheap: during a request (CacheVersionMiddleware) the first
+version() call loads every namespace in one query and the rest of the request
+reuses it; outside a request each call reads the database. A worker's own
+bump() is seen by the rest of its request.
+
+Namespaces:
+  directory     student/advisor directory counts (users/pagination.py)
+  avatars       profile picture existence (users/avatars.py)
+  availability  the student week grids, all weeks: user and advisor profile
+                changes (booking/views.py _cached_week_slots)
+  availability:<year>-W<week>
+                one student week grid: slot, booking and release changes
+                in that ISO week (booking/utils.py week_namespace)
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import threading
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.db import transaction
+from django.db.models import F
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from .models import CacheVersion
+
+
+class _RequestVersions(threading.local):
+  active = False    # inside CacheVersionMiddleware
+  versions = None   # {namespace: version}, loaded on first use
+
+
+_request = _RequestVersions()
+
+
+def _load(*namespaces):
+  rows = CacheVersion.objects.all()
+  if namespaces:
+    rows = rows.filter(namespace__in=namespaces)
+  return dict(rows.values_list("namespace", "version"))
+
+
+def version(namespace) -> int:
+  """Current version of `namespace` (0 until first bumped)."""
+  if not _request.active:
+    return _load(namespace).get(namespace, 0)
+  if _request.versions is None:
+    _request.versions = _load()
+  return _request.versions.get(namespace, 0)
+
+
+def _bump_now(namespaces):
+  counters = CacheVersion.objects.filter(namespace__in=namespaces)
+  if counters.update(version=F("version") + 1) < len(namespaces):
+    existing = set(counters.values_list("namespace", flat=True))
+    for namespace in namespaces:
+      if namespace in existing:
+        continue
+      _, created = CacheVersion.objects.get_or_create(namespace=namespace, defaults={"version": 1})
+      if not created:  # lost the creation race; everything else was bumped above
+        CacheVersion.objects.filter(namespace=namespace).update(version=F("version") + 1)
+  _request.versions = None  # re-read, so the rest of this request sees the bump
+
+
+def bump(*namespaces):
+  """Invalidate `namespaces` in every process once the current transaction commits."""
+  namespaces = sorted(set(namespaces))
+  if namespaces:
+    transaction.on_commit(lambda: _bump_now(namespaces))
+
+
+class CacheVersionMiddleware:
+  """Scope version() reads to the request: at most one query per request."""
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+
+  def __call__(self, request):
+    _request.active, _request.versions = True, None
+    try:
+      return self.get_response(request)
+    finally:
+      _request.active, _request.versions = False, None
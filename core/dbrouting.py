@@ -0,0 +1,109 @@
+# core/dbrouting.py
+"""
+Optional read replica for heavy read-only views.
+
+With a "replica" entry in DATABASES (see prod.py: DB_REPLICA_HOST) and
+REPLICA_ROUTING_ENABLED (the default; turn it off if the replica misbehaves),
+views decorated with @read_replica send their ORM reads there; everything
+else, and every write, uses "default". Otherwise the router is a no-op.
+
+Read-your-writes: a successful unsafe request (POST, PUT, PATCH, DELETE)
+sets a cookie holding the end of the sticky window, and until then that
+browser's requests stay on the primary, so a student sees their booking and
+a teacher their toggles right away. The window (REPLICA_STICKY_SECONDS)
+should exceed the replica's usual lag.
+
+Per-worker caches (core/cacheversions.py) stay consistent: a replica-routed
+request reads the cache versions from the replica too, and a version bump
+replicates after the write that caused it.
+
+  @read_replica
+  @login_required
+  def admin_bookings_list(request): ...
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import threading
+import time
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA = "replica"
+STICKY_COOKIE = "db_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class _Routing(threading.local):
+  use_replica = False
+
+
+_routing = _Routing()
+
+
+def replica_configured() -> bool:
+  return REPLICA in settings.DATABASES and settings.REPLICA_ROUTING_ENABLED
+
+
+def _sticky(request) -> bool:
+  """True while the browser's last write is less than REPLICA_STICKY_SECONDS old."""
+  try:
+    return float(request.COOKIES[STICKY_COOKIE]) > time.time()
+  except (KeyError, ValueError):
+    return False
+
+
+def read_replica(view):
+  """Mark a read-only view as safe to serve from the replica."""
+  view.use_replica = True
+  return view
+
+
+class ReplicaRouter:
+  """Reads of replica-marked views go to REPLICA; all writes and migrations to default."""
+
+  def db_for_read(self, model, **hints):
+    return REPLICA if _routing.use_replica else DEFAULT_DB_ALIAS
+
+  def db_for_write(self, model, **hints):
+    return DEFAULT_DB_ALIAS
+
+  def allow_relation(self, obj1, obj2, **hints):
+    return True  # same data on both
+
+  def allow_migrate(self, db, app_label, model_name=None, **hints):
+    return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+  """Route @read_replica views to the replica unless this browser wrote recently."""
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+
+  def __call__(self, request):
+    try:
+      response = self.get_response(request)
+    finally:
+      _routing.use_replica = False
+
+    if request.method not in SAFE_METHODS and response.status_code < 400 and replica_configured():
+      response.set_cookie(
+        STICKY_COOKIE, f"{time.time() + settings.REPLICA_STICKY_SECONDS:.3f}",
+        max_age=settings.REPLICA_STICKY_SECONDS,
+        httponly=True, samesite="Lax", secure=settings.SESSION_COOKIE_SECURE,
+      )
+    return response
+
+  def process_view(self, request, view_func, view_args, view_kwargs):
+    _routing.use_replica = (
+      getattr(view_func, "use_replica", False)
+      and request.method in SAFE_METHODS
+      and not _sticky(request)
+      and replica_configured()
+    )
@@ -0,0 +1,151 @@
+# core/downloads.py
+"""
+Serving private media (files that must pass a permission check first).
+
+settings.PROTECTED_MEDIA_SERVER picks who moves the bytes:
+
+  "nginx"   -> empty response with X-Accel-Redirect: <PROTECTED_MEDIA_INTERNAL_URL><name>
+               (nginx serves it from an `internal` location, Range included)
+  "apache"  -> empty response with X-Sendfile: <absolute path>  (mod_xsendfile)
+  ""        -> Django streams it: FileResponse for the whole file, or a 206
+               partial response for a single `Range: bytes=` request
+
+Either way the view decides *whether* the user may have the file; only the
+fallback keeps a Python worker busy for the transfer.
+
+Files are user uploads, so they download as attachments unless the caller
+asks for inline and the type is in INLINE_CONTENT_TYPES (PDF, audio, raster
+images). Every response carries `X-Content-Type-Options: nosniff` and
+`Content-Security-Policy: sandbox`, so an uploaded .html/.svg can't run
+script on our origin.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Safe to render in the browser (no script); audio/* is matched by prefix
+INLINE_CONTENT_TYPES = {"application/pdf", "image/png", "image/jpeg", "image/gif", "image/webp"}
+
+
+def parse_range(header, size):
+  """
+  Parse a single-range `Range` header against a file of `size` bytes.
+  Returns (start, end) inclusive, None to ignore the header (serve it all),
+  or False if the range can't be satisfied.
+  """
+  match = _RANGE_RE.match(header.strip()) if header else None
+  if not match:
+    return None  # absent, malformed or multi-range: send the whole file
+
+  first, last = match.groups()
+  if not first and not last:
+    return None
+  if not first:
+    # Suffix range: the last N bytes
+    length = int(last)
+    if length == 0:
+      return False
+    return max(0, size - length), size - 1
+
+  start = int(first)
+  end = min(int(last), size - 1) if last else size - 1
+  if start >= size or start > end:
+    return False
+  return start, end
+
+
+def _iter_range(fh, start, length):
+  try:
+    fh.seek(start)
+    while length > 0:
+      chunk = fh.read(min(CHUNK_SIZE, length))
+      if not chunk:
+        break
+      length -= len(chunk)
+      yield chunk
+  finally:
+    fh.close()
+
+
+def _content_type(filename):
+  content_type, encoding = mimetypes.guess_type(filename)
+  if encoding:
+    # e.g. .gz: don't let the browser transparently decompress it
+    return "application/octet-stream"
+  return content_type or "application/octet-stream"
+
+
+def _inline_allowed(content_type):
+  return content_type in INLINE_CONTENT_TYPES or content_type.startswith("audio/")
+
+
+def _secure(response):
+  response["X-Content-Type-Options"] = "nosniff"
+  response["Content-Security-Policy"] = "sandbox"
+  return response
+
+
+def serve_protected_file(request, field_file, as_attachment=True):
+  """
+  Response for `field_file` (a FieldFile the caller has already authorised).
+  as_attachment=False opens PDFs, audio and images inline (browsers can then
+  seek with Range requests); anything else still downloads.
+  """
+  filename = os.path.basename(field_file.name)
+  content_type = _content_type(filename)
+  inline = not as_attachment and _inline_allowed(content_type)
+  disposition = content_disposition_header(not inline, filename)
+  server = settings.PROTECTED_MEDIA_SERVER
+
+  if server in ("nginx", "apache"):
+    response = HttpResponse(content_type=content_type)
+    if server == "nginx":
+      response["X-Accel-Redirect"] = quote(settings.PROTECTED_MEDIA_INTERNAL_URL + field_file.name)
+    else:
+      response["X-Sendfile"] = field_file.path
+    response["Content-Disposition"] = disposition
+    response["Cache-Control"] = "private"
+    return _secure(response)
+
+  size = field_file.size
+  byte_range = parse_range(request.headers.get("Range"), size)
+
+  if byte_range is False:
+    response = HttpResponse(status=416)
+    response["Content-Range"] = f"bytes */{size}"
+    return _secure(response)
+
+  if byte_range is None:
+    response = FileResponse(field_file.open("rb"), content_type=content_type)
+    response.block_size = CHUNK_SIZE
+  else:
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+      _iter_range(field_file.open("rb"), start, length),
+      status=206,
+      content_type=content_type,
+    )
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = str(length)
+
+  response["Accept-Ranges"] = "bytes"
+  response["Content-Disposition"] = disposition
+  response["Cache-Control"] = "private"
+  return _secure(response)
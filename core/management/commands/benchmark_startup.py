@@ -0,0 +1,137 @@
+# core/management/commands/benchmark_startup.py
+"""
+Measure what a fresh worker pays before serving its first request: boot
+time, peak resident memory and per-module import cost.
+
+Each run is a new interpreter (`python -X importtime`) that does what a
+gunicorn worker does: get_wsgi_application() and load the URLconf (which the
+first request would otherwise do). Times are medians over --runs.
+
+Reports:
+  - boot time, peak RSS and number of loaded modules
+  - the project's modules by cumulative import time (their own imports included)
+  - other packages (Django, third-party, stdlib) by import time
+  - whether known heavy modules (--watch) were loaded at boot
+
+Examples:
+  python manage.py benchmark_startup
+  python manage.py benchmark_startup --runs 10 --top 30
+  python manage.py benchmark_startup --watch PIL.Image notifications.services
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Loaded lazily on purpose; a regression shows up as "loaded at boot"
+DEFAULT_WATCH = [
+  "PIL.Image",
+  "django_ckeditor_5.storage_utils",
+  "notifications.services",
+  "users.bulk_import",
+  "cProfile",
+]
+
+_BOOT = """
+import json, os, resource, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+boot_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({
+  "boot_ms": boot_ms,
+  "rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+  "modules": len(sys.modules),
+  "loaded": [name for name in json.loads(os.environ["STARTUP_WATCH"]) if name in sys.modules],
+}))
+"""
+
+# "import time: self [us] | cumulative | indented.module.name"
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _project_packages():
+  """Top-level packages of the installed apps that live in this project."""
+  base = str(settings.BASE_DIR)
+  packages = {app.name.split(".")[0] for app in apps.get_app_configs() if app.path.startswith(base)}
+  packages.add(settings.ROOT_URLCONF.split(".")[0])
+  return packages
+
+
+class Command(BaseCommand):
+  help = "Benchmark worker boot: time, memory and per-module import cost (fresh interpreter per run)."
+
+  def add_arguments(self, parser):
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20, help="Modules/packages to list")
+    parser.add_argument("--watch", nargs="*", default=DEFAULT_WATCH, help="Modules that should not load at boot")
+
+  def handle(self, *args, runs=5, top=20, watch=None, **options):
+    if runs < 1:
+      raise CommandError("--runs must be positive")
+
+    results = []
+    own = defaultdict(list)         # module -> cumulative µs per run
+    packages = defaultdict(list)    # other top-level package (Django, stdlib, …) -> µs per run
+    project = _project_packages()
+    for _ in range(runs):
+      result, imports = self._boot(watch or [])
+      results.append(result)
+      per_package = defaultdict(int)
+      for module, self_us, cumulative_us in imports:
+        root = module.split(".")[0]
+        if root in project:
+          own[module].append(cumulative_us)
+        else:
+          per_package[root] += self_us  # self times add up without double counting nested imports
+      for root, total in per_package.items():
+        packages[root].append(total)
+
+    boot = [result["boot_ms"] for result in results]
+    rss = [result["rss_kib"] / 1024 for result in results]
+    self.stdout.write(
+      f"boot   median {statistics.median(boot):7.1f} ms   min {min(boot):7.1f} ms   "
+      f"peak RSS {statistics.median(rss):6.1f} MiB   {results[0]['modules']} modules   ({runs} runs)"
+    )
+
+    self.stdout.write("\nProject modules by cumulative import time (ms, includes their imports):")
+    for module, times in sorted(own.items(), key=lambda item: -statistics.median(item[1]))[:top]:
+      self.stdout.write(f"  {statistics.median(times) / 1000:7.1f}  {module}")
+
+    self.stdout.write("\nOther packages by import time (ms):")
+    for root, times in sorted(packages.items(), key=lambda item: -statistics.median(item[1]))[:top]:
+      self.stdout.write(f"  {statistics.median(times) / 1000:7.1f}  {root}")
+
+    if watch:
+      loaded = set(results[0]["loaded"])
+      self.stdout.write("\nLoaded at boot:")
+      for module in watch:
+        flag = self.style.WARNING("yes") if module in loaded else "no"
+        self.stdout.write(f"  {module:<36} {flag}")
+
+  def _boot(self, watch):
+    env = {**os.environ, "STARTUP_WATCH": json.dumps(watch)}  # DJANGO_SETTINGS_MODULE as for this command
+    process = subprocess.run(
+      [sys.executable, "-X", "importtime", "-c", _BOOT],
+      cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+      raise CommandError(f"Boot failed:\n{process.stderr[-2000:]}")
+
+    imports = []
+    for line in process.stderr.splitlines():
+      match = _IMPORTTIME_RE.match(line)
+      if match:
+        self_us, cumulative_us, _, module = match.groups()
+        imports.append((module, int(self_us), int(cumulative_us)))
+    return json.loads(process.stdout.strip().splitlines()[-1]), imports
@@ -0,0 +1,285 @@
+# core/metrics.py
+"""
+Process-shared metrics in Prometheus text format, served at /metrics.
+
+Every metric here is additive (counters, and histograms stored as cumulative
+bucket counters plus _sum/_count), so each worker process only keeps the
+increments since its last flush and adds them to a shared SQLite file
+(METRICS_DB) at most every METRICS_FLUSH_SECONDS. The endpoint flushes its
+own process and reads the file: totals across all gunicorn workers, without
+an external service. Counters survive restarts; Prometheus' rate() doesn't
+mind either way.
+
+Recording:
+  inc("booking_outcomes_total", outcome="conflict", status=409)
+  observe("email_send_seconds", 0.42, function="send_plain_email")
+  with timed("email_send_seconds", function="send_plain_email"): ...
+  cache_lookup("directory_count", hits=1, misses=0)
+
+MetricsMiddleware records, per URL name, request latency (histogram), the
+number of DB queries per request (histogram) and request counts by status.
+
+Settings:
+  METRICS_ENABLED          record and serve (off by default)
+  METRICS_DB               shared SQLite file
+  METRICS_FLUSH_SECONDS    how often a process writes its increments
+  METRICS_TOKEN            bearer token for scrapers ("" = staff or METRICS_ALLOWED_IPS only)
+  METRICS_ALLOWED_IPS      addresses that may scrape without a token (none by default)
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+EMAIL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+  "http_requests_total": ("counter", "Requests by URL name, method and status class.", None),
+  "http_request_duration_seconds": ("histogram", "Request latency by URL name.", LATENCY_BUCKETS),
+  "http_request_db_queries": ("histogram", "DB queries per request by URL name.", QUERY_COUNT_BUCKETS),
+  "db_queries_total": ("counter", "DB queries run by requests, by URL name.", None),
+  "booking_outcomes_total": ("counter", "create_booking results by outcome and HTTP status.", None),
+  "email_send_seconds": ("histogram", "Time to hand emails to the mail backend.", EMAIL_BUCKETS),
+  "emails_sent_total": ("counter", "Emails accepted by the mail backend.", None),
+  "email_failures_total": ("counter", "Email sends that raised.", None),
+  "cache_requests_total": ("counter", "Application cache lookups by cache and result.", None),
+  "ratelimit_rejected_total": ("counter", "Requests rejected by core.ratelimit, by scope and bucket.", None),
+}
+UNRESOLVED_VIEW = "(unresolved)"
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS samples (name TEXT, labels TEXT, value REAL, PRIMARY KEY (name, labels))"
+_UPSERT = (
+  "INSERT INTO samples (name, labels, value) VALUES (?, ?, ?) "
+  "ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value"
+)
+
+_lock = threading.Lock()
+_pending = defaultdict(float)  # (sample name, label string) -> increment since last flush
+_state = {"pid": None, "connection": None, "flushed_at": 0.0}
+
+
+# -----------------------------------------------------------------------------
+# Recording
+# -----------------------------------------------------------------------------
+def _escape(value):
+  return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_string(labels):
+  return ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items()))
+
+
+def _check_pid():
+  """Call with _lock held. In a freshly forked worker, drop the parent's increments and connection."""
+  if _state["pid"] != os.getpid():
+    _pending.clear()
+    _state.update(pid=os.getpid(), connection=None, flushed_at=time.monotonic())
+
+
+def _add(items):
+  """Add [(sample name, label string, amount)] to this process's pending increments."""
+  if not settings.METRICS_ENABLED:
+    return
+  with _lock:
+    _check_pid()
+    for sample, labels, amount in items:
+      _pending[(sample, labels)] += amount
+    due = time.monotonic() - _state["flushed_at"] >= settings.METRICS_FLUSH_SECONDS
+  if due:
+    flush()
+
+
+def inc(name, amount=1, **labels):
+  _add([(name, _label_string(labels), amount)])
+
+
+def _bucket_labels(base, bound):
+  # le always last, so render() can split it off
+  return f'{base},le="{bound}"' if base else f'le="{bound}"'
+
+
+def observe(name, value, **labels):
+  """Record `value` in histogram `name` (buckets from METRICS)."""
+  base = _label_string(labels)
+  items = [(f"{name}_bucket", _bucket_labels(base, bound), 1) for bound in METRICS[name][2] if value <= bound]
+  items += [
+    (f"{name}_bucket", _bucket_labels(base, "+Inf"), 1),
+    (f"{name}_sum", base, value),
+    (f"{name}_count", base, 1),
+  ]
+  _add(items)
+
+
+@contextmanager
+def timed(name, **labels):
+  """Observe the block's duration in seconds, whether or not it raises."""
+  start = time.perf_counter()
+  try:
+    yield
+  finally:
+    observe(name, time.perf_counter() - start, **labels)
+
+
+def cache_lookup(cache_name, hits=0, misses=0):
+  items = [
+    ("cache_requests_total", _label_string({"cache": cache_name, "result": result}), count)
+    for result, count in (("hit", hits), ("miss", misses)) if count
+  ]
+  if items:
+    _add(items)
+
+
+# -----------------------------------------------------------------------------
+# Shared store
+# -----------------------------------------------------------------------------
+def _connection():
+  if _state["connection"] is None:
+    path = Path(settings.METRICS_DB)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(_SCHEMA)
+    _state["connection"] = connection
+  return _state["connection"]
+
+
+def flush():
+  """Write this process's pending increments to METRICS_DB."""
+  with _lock:
+    _check_pid()
+    if not _pending:
+      _state["flushed_at"] = time.monotonic()
+      return
+    rows = [(sample, labels, amount) for (sample, labels), amount in _pending.items()]
+    _pending.clear()
+    try:
+      connection = _connection()
+      with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        connection.executemany(_UPSERT, rows)
+    except sqlite3.Error:
+      logger.exception("Could not flush metrics; keeping them for the next flush")
+      for sample, labels, amount in rows:
+        _pending[(sample, labels)] += amount
+    _state["flushed_at"] = time.monotonic()
+
+
+atexit.register(flush)
+
+
+def collect():
+  """{sample name: {label string: value}} across all processes (flushes this one first)."""
+  flush()
+  with _lock:
+    rows = _connection().execute("SELECT name, labels, value FROM samples").fetchall()
+  samples = defaultdict(dict)
+  for name, labels, value in rows:
+    samples[name][labels] = value
+  return samples
+
+
+def _format(value):
+  return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _bucket_key(labels):
+  """Sort key for a bucket's label string: other labels, then le numerically."""
+  base, _, le = labels.rpartition('le="')
+  return base, float(le.rstrip('"'))
+
+
+def render():
+  """The Prometheus text exposition of every metric."""
+  samples = collect()
+  lines = []
+  for name, (kind, help_text, buckets) in METRICS.items():
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    if kind == "histogram":
+      for labels in sorted(samples.get(f"{name}_bucket", {}), key=_bucket_key):
+        lines.append(f"{name}_bucket{{{labels}}} {_format(samples[f'{name}_bucket'][labels])}")
+      for suffix in ("_sum", "_count"):
+        for labels, value in sorted(samples.get(name + suffix, {}).items()):
+          lines.append(f"{name}{suffix}{{{labels}}} {_format(value)}" if labels else f"{name}{suffix} {_format(value)}")
+    else:
+      for labels, value in sorted(samples.get(name, {}).items()):
+        lines.append(f"{name}{{{labels}}} {_format(value)}" if labels else f"{name} {_format(value)}")
+
+  # Derived: hit ratio per application cache
+  lines += ["# HELP cache_hit_ratio Hits / lookups per application cache.", "# TYPE cache_hit_ratio gauge"]
+  totals = defaultdict(lambda: {"hit": 0, "miss": 0})
+  for labels, value in samples.get("cache_requests_total", {}).items():
+    cache_label, _, result = labels.rpartition(',result=')  # labels are sorted: cache, result
+    totals[cache_label][result.strip('"')] += value
+  for cache_label, counts in sorted(totals.items()):
+    lookups = counts["hit"] + counts["miss"]
+    if lookups:
+      lines.append(f"cache_hit_ratio{{{cache_label}}} {counts['hit'] / lookups:.4f}")
+  return "\n".join(lines) + "\n"
+
+
+# -----------------------------------------------------------------------------
+# Middleware
+# -----------------------------------------------------------------------------
+class QueryCounter:
+  """execute_wrapper counting one request's queries."""
+
+  def __init__(self):
+    self.count = 0
+
+  def __call__(self, execute, sql, params, many, context):
+    self.count += 1
+    return execute(sql, params, many, context)
+
+
+def _view_label(request):
+  match = getattr(request, "resolver_match", None)
+  if match is None:
+    return UNRESOLVED_VIEW
+  return match.view_name or match._func_path
+
+
+class MetricsMiddleware:
+  """Latency, status and query-count metrics per URL name (see module docstring)."""
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+
+  def __call__(self, request):
+    if not settings.METRICS_ENABLED:
+      return self.get_response(request)
+
+    counter = QueryCounter()
+    start = time.perf_counter()
+    with ExitStack() as stack:
+      for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(counter))
+      response = self.get_response(request)
+    duration = time.perf_counter() - start
+
+    view = _view_label(request)
+    inc("http_requests_total", view=view, method=request.method, status=f"{response.status_code // 100}xx")
+    observe("http_request_duration_seconds", duration, view=view)
+    observe("http_request_db_queries", counter.count, view=view)
+    if counter.count:
+      inc("db_queries_total", counter.count, view=view)
+    return response
@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-19 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_cacheversion'),
+    ]
+
+    operations = [
+        # Dropped, not converted: stored values included session keys and password hashes
+        migrations.RemoveField(
+            model_name='slowquery',
+            name='sample_params',
+        ),
+        migrations.AddField(
+            model_name='slowquery',
+            name='sample_param_types',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
@@ -1,3 +1,49 @@
 from django.db import models
 
-# Create your models here.
+
+class SlowQuery(models.Model):
+    """
+    Slow queries seen in production, aggregated per statement shape, view and
+    database (written by core/slowqueries.py). `explain` holds the plan of the
+    slowest sample seen so far.
+    """
+    fingerprint = models.CharField(max_length=40, unique=True)  # sha1 of database + view + shape
+    database = models.CharField(max_length=50)
+    view_name = models.CharField(max_length=200, db_index=True)
+    sql = models.TextField()  # normalised shape (placeholders, IN lists collapsed)
+
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+
+    # The slowest sample and its plan (placeholder SQL; parameter types only, never values)
+    sample_sql = models.TextField(blank=True)
+    sample_param_types = models.CharField(max_length=500, blank=True)
+    explain = models.TextField(blank=True)
+
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name_plural = "slow queries"
+        ordering = ['-total_ms']
+
+    @property
+    def avg_ms(self):
+        return self.total_ms / self.count if self.count else 0
+
+    def __str__(self):
+        return f"{self.view_name}: {self.sql[:60]}"
+
+
+class CacheVersion(models.Model):
+    """
+    Version stamp of a cache namespace, shared by every worker process
+    (core/cacheversions.py). Cached values are stored under the version they
+    were computed at; a bump makes all of them unreachable at once.
+    """
+    namespace = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.namespace} v{self.version}"
@@ -0,0 +1,135 @@
+# core/nplusone.py
+"""
+Opt-in N+1 query detector (NPlusOneMiddleware).
+
+For a sampled fraction of requests, every SQL statement is reduced to its
+shape (parameters are already placeholders; IN-lists and whitespace are
+collapsed) and counted. A shape run NPLUSONE_THRESHOLD times or more in one
+request is reported, together with the first application stack frames that
+issued it:
+
+  - a WARNING on the "core.nplusone" logger
+  - for staff users, a response header (NPLUSONE_HEADER), e.g.
+      X-NPlusOne: 2 shape(s); 48x SELECT ... FROM "users_studentprofile" ... @ users/views.py:812 in teacher_student_list_view
+
+Cost when a request isn't sampled: one random() call. When it is: a dict
+update per query, and one stack capture per repeated shape (taken when the
+shape reaches the threshold, not for every query).
+
+Settings:
+  NPLUSONE_ENABLED      off by default
+  NPLUSONE_SAMPLE_RATE  0.0-1.0 fraction of requests to watch
+  NPLUSONE_THRESHOLD    repeats of one shape that count as N+1
+  NPLUSONE_HEADER       header name for staff responses ("" to disable)
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import logging
+import os
+import random
+import re
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+STACK_FRAMES = 3          # application frames kept per finding
+SQL_PREVIEW_LENGTH = 120  # characters of the statement in the header
+
+_IN_LIST_RE = re.compile(r"IN \((?:%s|\?)(?:, (?:%s|\?))*\)")
+_SPACE_RE = re.compile(r"\s+")
+_PROJECT_ROOT = str(settings.BASE_DIR) + os.sep
+
+
+def normalise_sql(sql):
+  """Statement shape: IN (%s, %s, …) collapsed, whitespace squeezed."""
+  return _SPACE_RE.sub(" ", _IN_LIST_RE.sub("IN (...)", sql)).strip()
+
+
+def _app_stack():
+  """The innermost STACK_FRAMES frames from project code (not Django/site-packages/this module)."""
+  frames = [
+    frame for frame in traceback.extract_stack()[:-1]
+    if frame.filename.startswith(_PROJECT_ROOT)
+    and "site-packages" not in frame.filename
+    and not frame.filename.endswith(os.path.join("core", "nplusone.py"))
+  ]
+  return [
+    f"{os.path.relpath(frame.filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+    for frame in frames[-STACK_FRAMES:]
+  ]
+
+
+class QueryRecorder:
+  """execute_wrapper that counts statement shapes for one request."""
+
+  def __init__(self, threshold):
+    self.threshold = threshold
+    self.counts = Counter()
+    self.stacks = {}
+
+  def __call__(self, execute, sql, params, many, context):
+    shape = normalise_sql(sql)
+    self.counts[shape] += 1
+    if self.counts[shape] == self.threshold:
+      self.stacks[shape] = _app_stack()
+    return execute(sql, params, many, context)
+
+  @property
+  def total(self):
+    return sum(self.counts.values())
+
+  def findings(self):
+    """[(count, shape, stack)] for repeated shapes, worst first."""
+    return sorted(
+      ((count, shape, self.stacks.get(shape, [])) for shape, count in self.counts.items() if count >= self.threshold),
+      key=lambda finding: -finding[0],
+    )
+
+
+def _header_value(findings):
+  count, shape, stack = findings[0]
+  preview = shape if len(shape) <= SQL_PREVIEW_LENGTH else shape[:SQL_PREVIEW_LENGTH] + "..."
+  where = f" @ {stack[-1]}" if stack else ""
+  # Header values must be one line of latin-1
+  value = f"{len(findings)} shape(s); {count}x {preview}{where}"
+  return value.encode("latin-1", "replace").decode("latin-1")
+
+
+class NPlusOneMiddleware:
+  """Watch a sample of requests for repeated query shapes (see module docstring)."""
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+
+  def __call__(self, request):
+    if not settings.NPLUSONE_ENABLED or random.random() >= settings.NPLUSONE_SAMPLE_RATE:
+      return self.get_response(request)
+
+    recorder = QueryRecorder(settings.NPLUSONE_THRESHOLD)
+    with ExitStack() as stack:
+      for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(recorder))
+      response = self.get_response(request)
+
+    findings = recorder.findings()
+    if findings:
+      for count, shape, app_stack in findings:
+        logger.warning(
+          "Possible N+1 on %s %s: %dx (of %d queries) %s\n  %s",
+          request.method, request.path, count, recorder.total, shape,
+          "\n  ".join(app_stack) or "(no application frames)",
+        )
+      user = getattr(request, "user", None)
+      if settings.NPLUSONE_HEADER and user is not None and user.is_authenticated and user.is_staff:
+        response[settings.NPLUSONE_HEADER] = _header_value(findings)
+    return response
@@ -0,0 +1,65 @@
+# core/pagination.py
+"""
+EstimatedCountPaginator: admin paginator for tables too big to COUNT(*) on
+every changelist load.
+
+An unfiltered changelist takes its total from the database's table
+statistics (MySQL information_schema.TABLES.TABLE_ROWS, PostgreSQL
+pg_class.reltuples) once they report ADMIN_ESTIMATED_COUNT_THRESHOLD rows or
+more; the last page number is then approximate, which is fine for browsing.
+Filtered/searched changelists, small tables and backends without statistics
+(SQLite) count exactly.
+
+Use with `show_full_result_count = False`, so filtered pages don't run a
+second, unfiltered count for "N results (M total)".
+"""
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+_ESTIMATE_SQL = {
+  "mysql": (
+    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+  ),
+  "postgresql": "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+}
+
+
+def estimated_row_count(model, using="default"):
+  """Row count from table statistics, or None if the backend has none/unknown."""
+  connection = connections[using]
+  sql = _ESTIMATE_SQL.get(connection.vendor)
+  if sql is None:
+    return None
+  try:
+    with connection.cursor() as cursor:
+      cursor.execute(sql, [model._meta.db_table])
+      row = cursor.fetchone()
+  except DatabaseError:
+    return None
+  # reltuples is -1 for a table never analysed
+  if row is None or row[0] is None or row[0] < 0:
+    return None
+  return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+  """Paginator whose count is estimated for whole, large tables (see module docstring)."""
+
+  def _is_whole_table(self):
+    query = getattr(self.object_list, "query", None)
+    return query is not None and not query.where and not query.distinct and not query.is_sliced
+
+  @cached_property
+  def count(self):
+    if self._is_whole_table():
+      estimate = estimated_row_count(self.object_list.model, self.object_list.db)
+      if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+        return estimate
+    return super().count
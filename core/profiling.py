@@ -0,0 +1,208 @@
+# core/profiling.py
+"""
+On-demand profiling of a single request, for staff (ProfilingMiddleware).
+
+A staff user gets a signed token from /profiling/ and repeats the slow
+request with it, either as a query flag or a header:
+
+  /booking/availability/?year=2025&month=3&_profile=<token>
+  curl -H "X-Profile-Token: <token>" ...
+
+The token is only valid for the user it was issued to, for
+PROFILING_TOKEN_MAX_AGE seconds. `_profile_mode` picks the profiler:
+
+  cprofile  (default) deterministic; saves a .prof file for pstats/snakeviz
+  sample    samples the request thread's stack every PROFILING_SAMPLE_INTERVAL
+            seconds; saves a .collapsed file for flamegraph.pl/speedscope
+
+Captures go to PROFILING_DIR (newest PROFILING_MAX_FILES, none older than
+PROFILING_MAX_AGE_HOURS) and are listed/downloadable at /profiling/. The
+response carries an X-Profile-Capture header with the download URL.
+
+Requests without the flag/header cost one dict lookup each.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from django.utils.text import slugify
+
+QUERY_PARAM = "_profile"
+MODE_PARAM = "_profile_mode"
+TOKEN_HEADER = "X-Profile-Token"
+MODES = {"cprofile": ".prof", "sample": ".collapsed"}
+
+CAPTURE_NAME_RE = re.compile(r"^[\w.-]+\.(prof|collapsed)$")
+
+_TOKEN_SALT = "core.profiling"
+# cProfile can't run in two threads at once (one profiler per interpreter on 3.12+)
+_cprofile_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# Tokens
+# -----------------------------------------------------------------------------
+def make_token(user) -> str:
+  return signing.TimestampSigner(salt=_TOKEN_SALT).sign(str(user.pk))
+
+
+def token_is_valid(token, user) -> bool:
+  try:
+    user_id = signing.TimestampSigner(salt=_TOKEN_SALT).unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+  except signing.BadSignature:  # includes SignatureExpired
+    return False
+  return user_id == str(user.pk)
+
+
+# -----------------------------------------------------------------------------
+# Captures on disk
+# -----------------------------------------------------------------------------
+def capture_dir() -> Path:
+  path = Path(settings.PROFILING_DIR)
+  path.mkdir(parents=True, exist_ok=True)
+  return path
+
+
+def capture_path(name):
+  """Path of capture `name`, or None if the name isn't one of ours."""
+  if not CAPTURE_NAME_RE.match(name):
+    return None
+  path = capture_dir() / name
+  return path if path.is_file() else None
+
+
+def list_captures():
+  """[(name, size in bytes, modified datetime)], newest first."""
+  entries = [
+    (entry.name, entry.stat().st_size, datetime.fromtimestamp(entry.stat().st_mtime))
+    for entry in capture_dir().iterdir()
+    if entry.is_file() and CAPTURE_NAME_RE.match(entry.name)
+  ]
+  return sorted(entries, key=lambda entry: entry[2], reverse=True)
+
+
+def prune_captures():
+  """Apply PROFILING_MAX_FILES / PROFILING_MAX_AGE_HOURS."""
+  oldest = time.time() - settings.PROFILING_MAX_AGE_HOURS * 3600
+  for position, (name, _, modified) in enumerate(list_captures()):
+    if position >= settings.PROFILING_MAX_FILES or modified.timestamp() < oldest:
+      try:
+        (capture_dir() / name).unlink()
+      except FileNotFoundError:
+        pass  # another worker pruned it
+
+
+def _capture_name(request, mode):
+  stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+  path_slug = slugify(request.path.replace("/", "-"))[:60] or "root"
+  return f"{stamp}-u{request.user.pk}-{path_slug}{MODES[mode]}"
+
+
+# -----------------------------------------------------------------------------
+# Profilers
+# -----------------------------------------------------------------------------
+class StackSampler:
+  """
+  Samples one thread's Python stack from a background thread and counts
+  identical stacks, for collapsed-stack output ("outer;...;inner count").
+  """
+
+  def __init__(self, thread_id, interval):
+    self.thread_id = thread_id
+    self.interval = interval
+    self.stacks = Counter()
+    self._stop = threading.Event()
+    self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+  def _run(self):
+    while not self._stop.wait(self.interval):
+      frame = sys._current_frames().get(self.thread_id)
+      names = []
+      while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+      if names:
+        self.stacks[";".join(reversed(names))] += 1
+
+  def __enter__(self):
+    self._thread.start()
+    return self
+
+  def __exit__(self, *exc):
+    self._stop.set()
+    self._thread.join()
+
+  def collapsed(self) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _profile_cprofile(get_response, request, path):
+  if not _cprofile_lock.acquire(blocking=False):
+    return None  # another profiled request is running: serve this one normally
+  try:
+    import cProfile  # only profiled requests need it
+    profiler = cProfile.Profile()
+    response = profiler.runcall(get_response, request)
+    profiler.dump_stats(path)
+    return response
+  finally:
+    _cprofile_lock.release()
+
+
+def _profile_sample(get_response, request, path):
+  with StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL) as sampler:
+    response = get_response(request)
+  path.write_text(sampler.collapsed(), encoding="utf-8")
+  return response
+
+
+# -----------------------------------------------------------------------------
+# Middleware
+# -----------------------------------------------------------------------------
+class ProfilingMiddleware:
+  """Profile requests carrying a valid staff token (see module docstring)."""
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+
+  def __call__(self, request):
+    token = request.GET.get(QUERY_PARAM) or request.headers.get(TOKEN_HEADER)
+    if not token:
+      return self.get_response(request)
+
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated or not user.is_staff or not token_is_valid(token, user):
+      return self.get_response(request)
+
+    mode = request.GET.get(MODE_PARAM, "cprofile")
+    if mode not in MODES:
+      mode = "cprofile"
+
+    name = _capture_name(request, mode)
+    path = capture_dir() / name
+    run = _profile_sample if mode == "sample" else _profile_cprofile
+    response = run(self.get_response, request, path)
+    if response is None:
+      response = self.get_response(request)
+      response["X-Profile-Capture"] = "busy"
+      return response
+
+    prune_captures()
+    response["X-Profile-Capture"] = reverse("profile_capture_download", args=[name])
+    return response
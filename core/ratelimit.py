@@ -0,0 +1,137 @@
+# core/ratelimit.py
+"""
+Token-bucket rate limiting for hot JSON endpoints, backed by the default cache.
+
+Each scope in settings.RATE_LIMITS has a per-user and/or per-IP bucket:
+
+  RATE_LIMITS = {
+    "create_booking": {"user": (5, 10), "ip": (20, 10)},   # (burst, seconds to refill it)
+  }
+
+A request takes one token from every bucket that applies; if any is empty the
+view isn't called and the client gets 429 with Retry-After. Rejections are
+counted in the cache (`rejected_counts`) and logged.
+
+Buckets live in the cache with a plain get/set, so concurrent requests from the
+same key can occasionally both take the last token. That is fine for shedding
+floods; it's not a quota. With LocMemCache (the default) buckets are per process.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import logging
+import math
+import time
+from functools import wraps
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "ratelimit"
+
+
+def client_ip(request) -> str:
+  """Client address from settings.RATE_LIMIT_IP_META (REMOTE_ADDR unless behind a proxy)."""
+  value = request.META.get(settings.RATE_LIMIT_IP_META) or request.META.get("REMOTE_ADDR", "")
+  # X-Forwarded-For style headers: the first hop is the client
+  return value.split(",")[0].strip()
+
+
+def take_token(key, burst, period):
+  """
+  Take one token from bucket `key` (holds `burst` tokens, refilled over `period` seconds).
+  Returns 0 if allowed, otherwise the seconds until a token is available.
+  """
+  now = time.time()
+  rate = burst / period
+  tokens, stamp = cache.get(key, (burst, now))
+  tokens = min(burst, tokens + (now - stamp) * rate)
+
+  if tokens < 1:
+    cache.set(key, (tokens, now), timeout=math.ceil(period) + 1)
+    return (1 - tokens) / rate
+
+  cache.set(key, (tokens - 1, now), timeout=math.ceil(period) + 1)
+  return 0
+
+
+def _count_rejection(scope, kind):
+  metrics.inc("ratelimit_rejected_total", scope=scope, kind=kind)  # all workers; the cache counter is per process
+  key = f"{_KEY_PREFIX}:rejected:{scope}:{kind}"
+  # add() is a no-op if the counter exists; incr() is atomic on shared backends
+  cache.add(key, 0, timeout=None)
+  try:
+    cache.incr(key)
+  except ValueError:
+    cache.set(key, 1, timeout=None)
+
+
+def rejected_counts():
+  """{(scope, kind): rejected requests} for every configured bucket."""
+  keys = {
+    f"{_KEY_PREFIX}:rejected:{scope}:{kind}": (scope, kind)
+    for scope, buckets in settings.RATE_LIMITS.items()
+    for kind in buckets
+  }
+  values = cache.get_many(keys)
+  return {label: values.get(key, 0) for key, label in keys.items()}
+
+
+def check_rate_limit(request, scope):
+  """
+  Apply scope's buckets to this request. Returns None if allowed,
+  or the 429 JsonResponse to send back.
+  """
+  if not settings.RATE_LIMIT_ENABLED:
+    return None
+
+  buckets = settings.RATE_LIMITS.get(scope, {})
+  identities = {"ip": client_ip(request)}
+  if getattr(request, "user", None) is not None and request.user.is_authenticated:
+    identities["user"] = str(request.user.pk)
+
+  retry_after = 0
+  for kind, (burst, period) in buckets.items():
+    identity = identities.get(kind)
+    if not identity:
+      continue
+    wait = take_token(f"{_KEY_PREFIX}:{scope}:{kind}:{identity}", burst, period)
+    if wait:
+      _count_rejection(scope, kind)
+      logger.warning("Rate limited %s by %s bucket (%s)", scope, kind, identity)
+      retry_after = max(retry_after, wait)
+
+  if not retry_after:
+    return None
+
+  response = JsonResponse({"error": "Too many requests. Please wait a moment and try again."}, status=429)
+  response["Retry-After"] = str(math.ceil(retry_after))
+  return response
+
+
+def rate_limit(scope):
+  """
+  View decorator for check_rate_limit. Put it below @login_required so the
+  per-user bucket sees the logged-in user.
+  """
+  def decorator(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+      limited = check_rate_limit(request, scope)
+      if limited is not None:
+        return limited
+      return view(request, *args, **kwargs)
+    return wrapper
+  return decorator
@@ -0,0 +1,215 @@
+# core/slowqueries.py
+"""
+Slow-query capture with stored EXPLAIN plans (SlowQueryMiddleware).
+
+Every query a request runs is timed (execute_wrapper on each connection).
+Queries taking SLOW_QUERY_THRESHOLD_MS or longer are sampled
+(SLOW_QUERY_SAMPLE_RATE) and handed to a background thread, which:
+
+  - upserts a SlowQuery row per (database, view, statement shape):
+    count, total and max duration, last seen
+  - for SELECTs, when the sample is the slowest seen for that row (or no
+    plan is stored yet), runs EXPLAIN with the sample's parameters on its own
+    connection and stores the plan next to the sample
+
+Parameter values are never stored (they include session keys, password
+hashes, emails): a sample keeps its placeholder SQL and the parameter types.
+
+so the request never waits on the bookkeeping. Rows are browsable in the
+admin (Core > Slow queries), ordered by total time.
+
+Cost when enabled: two perf_counter() calls per query. Slow samples go
+through a bounded queue (SLOW_QUERY_QUEUE_SIZE); when it is full, samples
+are dropped rather than slowing requests down.
+
+Settings:
+  SLOW_QUERY_ENABLED       off by default
+  SLOW_QUERY_THRESHOLD_MS  duration that counts as slow
+  SLOW_QUERY_SAMPLE_RATE   0.0-1.0 fraction of slow queries recorded
+  SLOW_QUERY_QUEUE_SIZE    pending samples kept before dropping
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import hashlib
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.db import IntegrityError, connections
+from django.db.models import F
+from django.utils import timezone
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from .models import SlowQuery
+from .nplusone import normalise_sql
+
+logger = logging.getLogger(__name__)
+
+PARAM_TYPES_MAX_LENGTH = 500  # characters of the parameter type list stored with a sample
+UNRESOLVED_VIEW = "(unresolved)"  # queries run before URL resolution (sessions, auth)
+
+_queue = None
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def fingerprint(database, view_name, shape) -> str:
+  return hashlib.sha1(f"{database}\n{view_name}\n{shape}".encode("utf-8")).hexdigest()
+
+
+def _view_name(request):
+  match = getattr(request, "resolver_match", None)
+  if match is None:
+    return UNRESOLVED_VIEW
+  return match.view_name or match._func_path
+
+
+# -----------------------------------------------------------------------------
+# Background writer
+# -----------------------------------------------------------------------------
+def _explain(alias, sql, params):
+  """EXPLAIN output as tab-separated lines (header first), or "" if the backend has none."""
+  connection = connections[alias]
+  prefix = connection.ops.explain_query_prefix()
+  with connection.cursor() as cursor:
+    cursor.execute(f"{prefix} {sql}", params)
+    header = [column[0] for column in cursor.description or ()]
+    rows = cursor.fetchall()
+  lines = ["\t".join(header)] if header else []
+  lines += ["\t".join("" if value is None else str(value) for value in row) for row in rows]
+  return "\n".join(lines)
+
+
+def param_types(params) -> str:
+  """Count and types of the bind parameters, never their values: "3: str, int, datetime"."""
+  if params is None:
+    return ""
+  values = list(params.values() if isinstance(params, dict) else params)
+  types = ", ".join(type(value).__name__ for value in values)
+  return f"{len(values)}: {types}"[:PARAM_TYPES_MAX_LENGTH] if values else "0"
+
+
+def _is_explainable(sql):
+  head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+  return head in ("SELECT", "WITH")
+
+
+def record(alias, view_name, sql, params, duration_ms, seen_at):
+  """
+  Fold one slow sample into its SlowQuery row (runs on the writer thread).
+  Rows live in the default database; EXPLAIN runs where the query ran (`alias`).
+  """
+  shape = normalise_sql(sql)
+  key = fingerprint(alias, view_name, shape)
+  row = SlowQuery.objects.filter(fingerprint=key).only("max_ms", "explain").first()
+
+  updates = {}
+  if row is None or duration_ms > row.max_ms or not row.explain:
+    updates = {
+      "max_ms": max(duration_ms, row.max_ms if row else 0),
+      "sample_sql": sql,
+      "sample_param_types": param_types(params),
+    }
+    if _is_explainable(sql):
+      try:
+        updates["explain"] = _explain(alias, sql, params)
+      except Exception as exc:
+        updates["explain"] = f"EXPLAIN failed: {exc}"
+
+  if row is None:
+    try:
+      SlowQuery.objects.create(
+        fingerprint=key, database=alias, view_name=view_name, sql=shape,
+        count=1, total_ms=duration_ms, last_seen=seen_at, **updates,
+      )
+      return
+    except IntegrityError:
+      pass  # another process created it first: update instead
+
+  SlowQuery.objects.filter(fingerprint=key).update(
+    count=F("count") + 1, total_ms=F("total_ms") + duration_ms, last_seen=seen_at, **updates,
+  )
+
+
+def _run_worker(samples):
+  while True:
+    item = samples.get()
+    try:
+      record(*item)
+    except Exception:
+      logger.exception("Could not record slow query")
+    finally:
+      samples.task_done()
+    if samples.empty():
+      connections.close_all()  # this thread's connections; reopened on the next sample
+
+
+def _enqueue(item):
+  global _queue, _worker
+  if _worker is None:
+    with _worker_lock:
+      if _worker is None:
+        _queue = queue.Queue(maxsize=settings.SLOW_QUERY_QUEUE_SIZE)
+        _worker = threading.Thread(target=_run_worker, args=(_queue,), name="slow-query-writer", daemon=True)
+        _worker.start()
+  try:
+    _queue.put_nowait(item)
+  except queue.Full:
+    logger.warning("Slow query queue full; dropped a %.0f ms sample from %s", item[4], item[1])
+
+
+def flush():
+  """Wait until queued samples are written (management commands, tests)."""
+  if _queue is not None:
+    _queue.join()
+
+
+# -----------------------------------------------------------------------------
+# Request side
+# -----------------------------------------------------------------------------
+class SlowQueryTimer:
+  """execute_wrapper that times each query and queues slow ones for one request."""
+
+  def __init__(self, request, alias, threshold_ms, sample_rate):
+    self.request = request
+    self.alias = alias
+    self.threshold_ms = threshold_ms
+    self.sample_rate = sample_rate
+
+  def __call__(self, execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+      return execute(sql, params, many, context)
+    finally:
+      duration_ms = (time.perf_counter() - start) * 1000
+      if duration_ms >= self.threshold_ms and not many and random.random() < self.sample_rate:
+        _enqueue((self.alias, _view_name(self.request), sql, params, duration_ms, timezone.now()))
+
+
+class SlowQueryMiddleware:
+  """Record slow queries with their plans (see module docstring)."""
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+
+  def __call__(self, request):
+    if not settings.SLOW_QUERY_ENABLED:
+      return self.get_response(request)
+
+    with ExitStack() as stack:
+      for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(SlowQueryTimer(
+          request, alias, settings.SLOW_QUERY_THRESHOLD_MS, settings.SLOW_QUERY_SAMPLE_RATE,
+        )))
+      return self.get_response(request)
@@ -1,3 +1,219 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files import File
+from django.db import connections, router
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from users.models import CustomUser
+from .dbrouting import REPLICA, STICKY_COOKIE, _routing
+from .downloads import serve_protected_file
+from .models import SlowQuery
+from .ratelimit import take_token
+from .slowqueries import record
+
+
+class ProtectedDownloadTests(SimpleTestCase):
+  def setUp(self):
+    self.dir = tempfile.TemporaryDirectory()
+    self.addCleanup(self.dir.cleanup)
+    self.request = RequestFactory().get("/download/")
+
+  def upload(self, name, content=b"<script>alert(1)</script>"):
+    path = os.path.join(self.dir.name, name)
+    with open(path, "wb") as fh:
+      fh.write(content)
+    field_file = File(open(path, "rb"), name=name)
+    self.addCleanup(field_file.close)
+    return field_file
+
+  def assertHardened(self, response):
+    self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+    self.assertEqual(response["Content-Security-Policy"], "sandbox")
+
+  def test_html_downloads_even_when_inline_is_asked_for(self):
+    response = serve_protected_file(self.request, self.upload("notes.html"), as_attachment=False)
+    self.assertTrue(response["Content-Disposition"].startswith("attachment"))
+    self.assertHardened(response)
+
+  def test_svg_downloads_by_default(self):
+    response = serve_protected_file(self.request, self.upload("diagram.svg"))
+    self.assertTrue(response["Content-Disposition"].startswith("attachment"))
+    self.assertHardened(response)
+
+  def test_pdf_opens_inline_when_asked(self):
+    response = serve_protected_file(self.request, self.upload("reading.pdf", b"%PDF-1.4"), as_attachment=False)
+    self.assertTrue(response["Content-Disposition"].startswith("inline"))
+    self.assertHardened(response)
+
+  @override_settings(PROTECTED_MEDIA_SERVER="nginx", PROTECTED_MEDIA_INTERNAL_URL="/protected-media/")
+  def test_offloaded_responses_are_hardened(self):
+    response = serve_protected_file(self.request, self.upload("notes.html"), as_attachment=False)
+    self.assertEqual(response["X-Accel-Redirect"], "/protected-media/notes.html")
+    self.assertTrue(response["Content-Disposition"].startswith("attachment"))
+    self.assertHardened(response)
+
+  def test_unsatisfiable_range_is_hardened(self):
+    request = RequestFactory().get("/download/", HTTP_RANGE="bytes=999-")
+    response = serve_protected_file(request, self.upload("reading.pdf", b"%PDF-1.4"))
+    self.assertEqual(response.status_code, 416)
+    self.assertHardened(response)
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_TOKEN="s3cret", METRICS_ALLOWED_IPS=[])
+class MetricsAccessTests(TestCase):
+  def setUp(self):
+    self.dir = tempfile.TemporaryDirectory()
+    self.addCleanup(self.dir.cleanup)
+    patcher = override_settings(METRICS_DB=os.path.join(self.dir.name, "metrics.sqlite3"))
+    patcher.enable()
+    self.addCleanup(patcher.disable)
+
+  def test_proxied_requests_from_localhost_need_the_token(self):
+    # Behind nginx without RATE_LIMIT_IP_META, every client is 127.0.0.1
+    self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="127.0.0.1").status_code, 403)
+    self.assertEqual(
+      self.client.get(reverse("metrics"), REMOTE_ADDR="127.0.0.1", HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200,
+    )
+
+  def test_wrong_token_is_refused(self):
+    self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer nope").status_code, 403)
+
+  @override_settings(METRICS_ALLOWED_IPS=["10.0.0.5"])
+  def test_listed_address_needs_no_token(self):
+    self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.5").status_code, 200)
+
+
+class SlowQueryRecordTests(TestCase):
+  def test_parameter_values_are_not_stored(self):
+    secret = "pbkdf2_sha256$870000$salt$hash"
+    sql = 'SELECT "users_customuser"."id" FROM "users_customuser" WHERE "users_customuser"."password" = %s AND "users_customuser"."id" > %s'
+    record("default", "login", sql, (secret, 3), 250.0, timezone.now())
+
+    row = SlowQuery.objects.get()
+    self.assertEqual(row.sample_sql, sql)
+    self.assertEqual(row.sample_param_types, "2: str, int")
+    self.assertTrue(row.explain)
+    self.assertFalse(any(secret in str(value) for value in SlowQuery.objects.values().get().values()))
+
+
+class ProfileCapturesPageTests(TestCase):
+  @override_settings(PROFILING_TOKEN_MAX_AGE=900)
+  def test_token_lifetime_comes_from_the_setting(self):
+    staff = CustomUser.objects.create_user("staff@example.com", "pw", first_name="S", last_name="T", role="admin", is_staff=True)
+    self.client.force_login(staff)
+    with mock.patch("core.views.list_captures", return_value=[]):
+      response = self.client.get(reverse("profile_captures"))
+    self.assertContains(response, "for 15\xa0minutes")
+    self.assertNotContains(response, "an hour")
+
+
+class TakeTokenTests(SimpleTestCase):
+  KEY = "ratelimit:test:bucket"
+
+  def setUp(self):
+    cache.delete(self.KEY)
+    self.now = 1_000_000.0
+    patcher = mock.patch("core.ratelimit.time.time", side_effect=lambda: self.now)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_burst_then_exhaustion(self):
+    self.assertEqual([take_token(self.KEY, 3, 30) for _ in range(3)], [0, 0, 0])
+    self.assertAlmostEqual(take_token(self.KEY, 3, 30), 10.0)  # 3 tokens per 30 s: one every 10 s
+
+  def test_refill_over_time(self):
+    for _ in range(3):
+      take_token(self.KEY, 3, 30)
+    self.now += 5
+    self.assertAlmostEqual(take_token(self.KEY, 3, 30), 5.0)  # half a token back
+    self.now += 5
+    self.assertEqual(take_token(self.KEY, 3, 30), 0)
+    self.assertGreater(take_token(self.KEY, 3, 30), 0)
+
+  def test_refill_is_capped_at_the_burst(self):
+    take_token(self.KEY, 3, 30)
+    self.now += 3600
+    self.assertEqual([take_token(self.KEY, 3, 30) for _ in range(3)], [0, 0, 0])
+    self.assertGreater(take_token(self.KEY, 3, 30), 0)
+
+
+# Against the settings.dev "replica" stand-in, mirrored onto the test DB. A
+# TransactionTestCase: the mirror is a second connection, so it only sees committed rows.
+@override_settings(REPLICA_ROUTING_ENABLED=True, REPLICA_STICKY_SECONDS=10, RATE_LIMIT_ENABLED=False)
+class ReplicaRoutingTests(TransactionTestCase):
+  databases = {"default", REPLICA}
+
+  def setUp(self):
+    self.teacher = CustomUser.objects.create_user("teacher@example.com", "pw", first_name="Tea", last_name="Cher", role="teacher")
+    self.client.force_login(self.teacher)
+    self.month = timezone.localdate() + timedelta(days=40)
+
+  def request(self, method, url, **kwargs):
+    """(response, queries on default, queries on the replica)"""
+    with CaptureQueriesContext(connections["default"]) as primary, CaptureQueriesContext(connections[REPLICA]) as replica:
+      response = getattr(self.client, method)(url, **kwargs)
+    return response, len(primary), len(replica)
+
+  def grid(self):
+    return self.request("get", reverse("teacher_availability"), data={"year": self.month.year, "month": self.month.month})
+
+  def toggle(self):
+    day = self.month
+    while day.weekday() >= 5:
+      day += timedelta(days=1)
+    return self.request("post", reverse("toggle_availability"), content_type="application/json", data=json.dumps({
+      "date": f"{day:%Y-%m-%d}", "start_time": "10:00:00", "end_time": "10:30:00",
+    }))
+
+  def test_replica_views_read_from_the_replica(self):
+    response, primary, replica = self.grid()
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(primary, 0)
+    self.assertGreater(replica, 0)
+
+  def test_other_views_stay_on_the_primary(self):
+    response, primary, replica = self.request("get", reverse("admin_dashboard"))
+    self.assertEqual(response.status_code, 200)
+    self.assertGreater(primary, 0)
+    self.assertEqual(replica, 0)
+
+  def test_writes_go_to_the_primary(self):
+    _routing.use_replica = True  # even inside a replica-routed view
+    try:
+      self.assertEqual(router.db_for_write(CustomUser), "default")
+      self.assertEqual(router.db_for_read(CustomUser), REPLICA)
+    finally:
+      _routing.use_replica = False
+
+    response, primary, replica = self.toggle()
+    self.assertEqual(response.status_code, 200)
+    self.assertGreater(primary, 0)
+    self.assertEqual(replica, 0)
+
+  def test_primary_after_a_write_until_the_sticky_window_ends(self):
+    response, _, _ = self.toggle()
+    self.assertIn(STICKY_COOKIE, response.cookies)
+
+    response, primary, replica = self.grid()
+    self.assertEqual((response.status_code, replica), (200, 0))
+    self.assertGreater(primary, 0)
+
+    with mock.patch("core.dbrouting.time.time", return_value=time.time() + 11):
+      response, primary, replica = self.grid()
+    self.assertEqual((response.status_code, primary), (200, 0))
+    self.assertGreater(replica, 0)
+
+  @override_settings(REPLICA_ROUTING_ENABLED=False)
+  def test_routing_can_be_switched_off(self):
+    response, primary, replica = self.grid()
+    self.assertEqual((response.status_code, replica), (200, 0))
+    self.assertGreater(primary, 0)
@@ -4,4 +4,7 @@ from . import views
 urlpatterns = [
   path('', views.landing_page, name='landing_page'),
   path('about/', views.about_page, name='about_page'),
+  path('profiling/', views.profile_captures, name='profile_captures'),
+  path('profiling/<str:name>', views.profile_capture_download, name='profile_capture_download'),
+  path('metrics', views.metrics_view, name='metrics'),
 ]
@@ -1,4 +1,16 @@
+from datetime import timedelta
+
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from . import metrics
+from .profiling import MODE_PARAM, QUERY_PARAM, TOKEN_HEADER, capture_path, list_captures, make_token
+from .ratelimit import client_ip
 
 # View for the landing page
 def landing_page(request):
@@ -7,3 +19,48 @@ def landing_page(request):
 # View for the about page
 def about_page(request):
   return render(request, 'core/about.html')
+
+# CKEditor image uploads: django_ckeditor_5.views pulls in Pillow, so it is
+# imported on the first upload rather than when the URLconf loads
+def ckeditor_upload(request):
+  from django_ckeditor_5.views import upload_file
+  return upload_file(request)
+
+# Staff: profiling token + captured profiles (core/profiling.py)
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+def profile_captures(request):
+  issued = timezone.now()
+  return render(request, 'core/profile_captures.html', {
+    'token': make_token(request.user),
+    'token_issued': issued,
+    'token_expires': issued + timedelta(seconds=settings.PROFILING_TOKEN_MAX_AGE),
+    'query_param': QUERY_PARAM,
+    'mode_param': MODE_PARAM,
+    'token_header': TOKEN_HEADER,
+    'captures': list_captures(),
+  })
+
+# Staff: download one capture
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+def profile_capture_download(request, name):
+  path = capture_path(name)
+  if path is None:
+    raise Http404("No such capture")
+  return FileResponse(path.open('rb'), as_attachment=True, filename=name, content_type='application/octet-stream')
+
+# Prometheus scrape endpoint (core/metrics.py): bearer token, allowed IPs or staff
+@require_GET
+def metrics_view(request):
+  if not settings.METRICS_ENABLED:
+    raise Http404("Metrics are disabled")
+  auth = request.headers.get('Authorization', '')
+  allowed = (
+    (settings.METRICS_TOKEN and constant_time_compare(auth, f'Bearer {settings.METRICS_TOKEN}'))
+    or client_ip(request) in settings.METRICS_ALLOWED_IPS
+    or (request.user.is_authenticated and request.user.is_staff)
+  )
+  if not allowed:
+    return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+  return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -15,12 +15,15 @@ ALLOWED_HOSTS = [h for h in os.getenv("ALLOWED_HOSTS", "").split(",") if h] or [
 
 INSTALLED_APPS = [
     'django.contrib.admin','django.contrib.auth','django.contrib.contenttypes',
-    'django.contrib.sessions','django.contrib.messages','django.contrib.staticfiles',
-    "django_ckeditor_5",
+    'django.contrib.sessions','django.contrib.messages',
+    'core.apps.CoreStaticFilesConfig',  # django.contrib.staticfiles + project ignores
+    'core.apps.CKEditor5Config',  # django_ckeditor_5 without its boot-time (Pillow) imports
     'core','users','booking','notifications',
 ]
 
 MIDDLEWARE = [
+  'core.metrics.MetricsMiddleware',  # first, so latency covers the whole stack
+  'core.cacheversions.CacheVersionMiddleware',  # cache namespace versions read once per request
   'django.middleware.security.SecurityMiddleware',
   'django.contrib.sessions.middleware.SessionMiddleware',
   'django.middleware.common.CommonMiddleware',
@@ -28,6 +31,10 @@ MIDDLEWARE = [
   'django.contrib.auth.middleware.AuthenticationMiddleware',
   'django.contrib.messages.middleware.MessageMiddleware',
   'django.middleware.clickjacking.XFrameOptionsMiddleware',
+  'core.dbrouting.ReplicaRoutingMiddleware',  # no-op without DATABASES['replica']
+  'core.nplusone.NPlusOneMiddleware',  # no-op unless NPLUSONE_ENABLED
+  'core.profiling.ProfilingMiddleware',  # only acts on a staff profiling token
+  'core.slowqueries.SlowQueryMiddleware',  # no-op unless SLOW_QUERY_ENABLED
 ]
 
 ROOT_URLCONF = 'languagelink.urls'
@@ -54,6 +61,12 @@ DATABASES = {
   }
 }
 
+# Optional read replica (core/dbrouting.py): settings modules add DATABASES['replica']
+DATABASE_ROUTERS = ['core.dbrouting.ReplicaRouter']
+REPLICA_ROUTING_ENABLED = os.getenv("REPLICA_ROUTING_ENABLED", "true").lower() == "true"  # off: everything on default
+# After a write, that browser reads from the primary for this long (keep above the replica's lag)
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
 AUTH_PASSWORD_VALIDATORS = [
   {'NAME':'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
   {'NAME':'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -68,6 +81,55 @@ USE_TZ = True
 
 # Booking rules
 BOOKING_LEAD_MINUTES = int(os.getenv("BOOKING_LEAD_MINUTES", "60"))
+WAITLIST_MAX_DAYS = int(os.getenv("WAITLIST_MAX_DAYS", "60"))  # furthest a waitlist range may reach
+# Scheduled releases: attempts within this many seconds of release_at are queued (booking/admission.py)
+BOOKING_ADMISSION_WINDOW_SECONDS = int(os.getenv("BOOKING_ADMISSION_WINDOW_SECONDS", "10"))
+BOOKING_ADMISSION_ORDER = os.getenv("BOOKING_ADMISSION_ORDER", "fifo")  # "fifo" or "lottery"
+BOOKING_QUEUE_CLAIM_TIMEOUT_SECONDS = int(os.getenv("BOOKING_QUEUE_CLAIM_TIMEOUT_SECONDS", "60"))  # then a stuck request is retried
+
+# Rate limiting for booking JSON endpoints (core/ratelimit.py)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_IP_META = os.getenv("RATE_LIMIT_IP_META", "REMOTE_ADDR")  # e.g. HTTP_X_REAL_IP behind nginx
+RATE_LIMITS = {
+  # scope: {bucket: (burst, seconds to refill the whole burst)}
+  "create_booking":      {"user": (5, 10),  "ip": (20, 10)},
+  "toggle_availability": {"user": (30, 10), "ip": (60, 10)},
+  "get_available_slots": {"user": (30, 10), "ip": (60, 10)},
+  "next_available_slots": {"user": (10, 10), "ip": (30, 10)},
+  "week_slots":          {"user": (30, 10), "ip": (60, 10)},
+}
+
+# N+1 query detector (core/nplusone.py): logs repeated query shapes, header for staff
+NPLUSONE_ENABLED = os.getenv("NPLUSONE_ENABLED", "false").lower() == "true"
+NPLUSONE_SAMPLE_RATE = float(os.getenv("NPLUSONE_SAMPLE_RATE", "1.0"))
+NPLUSONE_THRESHOLD = int(os.getenv("NPLUSONE_THRESHOLD", "10"))
+NPLUSONE_HEADER = os.getenv("NPLUSONE_HEADER", "X-NPlusOne")
+
+# On-demand request profiling for staff (core/profiling.py, /profiling/)
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / "var" / "profiles"))
+PROFILING_TOKEN_MAX_AGE = int(os.getenv("PROFILING_TOKEN_MAX_AGE", "3600"))  # seconds
+PROFILING_SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", "0.001"))  # seconds, "sample" mode
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "50"))
+PROFILING_MAX_AGE_HOURS = int(os.getenv("PROFILING_MAX_AGE_HOURS", "72"))
+
+# Slow-query capture with EXPLAIN plans (core/slowqueries.py, admin: Core > Slow queries)
+SLOW_QUERY_ENABLED = os.getenv("SLOW_QUERY_ENABLED", "false").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+SLOW_QUERY_QUEUE_SIZE = int(os.getenv("SLOW_QUERY_QUEUE_SIZE", "1000"))
+
+# Admin changelists of big tables (core/pagination.py): estimate unfiltered totals at/above this many rows
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv("ADMIN_ESTIMATED_COUNT_THRESHOLD", "100000"))
+
+# Metrics endpoint (core/metrics.py, /metrics): workers share counters through a local SQLite file.
+# Off unless configured, so tests and local runs don't leave (and lock) METRICS_DB behind
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+METRICS_DB = os.getenv("METRICS_DB", str(BASE_DIR / "var" / "metrics.sqlite3"))
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # scrapers send "Authorization: Bearer <token>"
+# Tokenless scrape addresses, as seen by core.ratelimit.client_ip. Empty by default: behind nginx every
+# request comes from 127.0.0.1 unless RATE_LIMIT_IP_META names the proxy's client-address header.
+METRICS_ALLOWED_IPS = [ip for ip in os.getenv("METRICS_ALLOWED_IPS", "").split(",") if ip]
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static', BASE_DIR / 'core/static']
@@ -76,6 +138,17 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'  # used in prod collectstatic
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# How long a profile picture's storage.exists() result is reused (users/avatars.py)
+AVATAR_EXISTS_CACHE_SECONDS = int(os.getenv("AVATAR_EXISTS_CACHE_SECONDS", "300"))
+
+# Upper bound on how long a worker reuses a student week grid (booking/views.py); writes invalidate it sooner
+WEEK_SLOTS_CACHE_SECONDS = int(os.getenv("WEEK_SLOTS_CACHE_SECONDS", "300"))
+
+# Permission-checked media (ResourceAttachment downloads, core/downloads.py):
+# "nginx" -> X-Accel-Redirect, "apache" -> X-Sendfile, "" -> Django streams with Range support
+PROTECTED_MEDIA_SERVER = os.getenv("PROTECTED_MEDIA_SERVER", "")
+PROTECTED_MEDIA_INTERNAL_URL = os.getenv("PROTECTED_MEDIA_INTERNAL_URL", "/protected-media/")
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'users.CustomUser'
 
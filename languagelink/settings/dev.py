@@ -5,3 +5,12 @@ DEBUG = True
 ALLOWED_HOSTS = ["*"]  # or limit to localhost
 
 # DB stays SQLite from base.py
+
+# Replica stand-in: a "replica" alias on the same SQLite file (tests mirror it
+# onto the test DB). Routing to it (core/dbrouting.py) is off unless DEV_REPLICA=true;
+# core/tests.py turns it on for the routing tests.
+DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+REPLICA_ROUTING_ENABLED = os.getenv("DEV_REPLICA", "false").lower() == "true"
+
+# runserver has no proxy in front: let a local Prometheus scrape /metrics without a token
+METRICS_ALLOWED_IPS = [ip for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip]
@@ -25,3 +25,14 @@ DATABASES = {
         },
     }
 }
+
+# Local replica stand-in (another MySQL instance or schema fed by replication).
+# Tests mirror it onto the default test DB.
+if os.getenv("DB_REPLICA_NAME") or os.getenv("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.getenv("DB_REPLICA_NAME", DATABASES["default"]["NAME"]),
+        "HOST": os.getenv("DB_REPLICA_HOST", DATABASES["default"]["HOST"]),
+        "PORT": int(os.getenv("DB_REPLICA_PORT", DATABASES["default"]["PORT"])),
+        "TEST": {"MIRROR": "default"},
+    }
@@ -27,6 +27,26 @@ DATABASES = {
   }
 }
 
+# Optional read replica for @read_replica views (core/dbrouting.py); same schema,
+# credentials default to the primary's. Tests mirror it onto the default test DB.
+if os.getenv('DB_REPLICA_HOST'):
+  DATABASES['replica'] = {
+    **DATABASES['default'],
+    'HOST': os.getenv('DB_REPLICA_HOST'),
+    'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+    'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+    'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+    'TEST': {'MIRROR': 'default'},
+  }
+
+# Static files: hashed names + staticfiles.json manifest, with .gz/.br siblings
+# written by collectstatic (see core/storage.py). Serve STATIC_ROOT with
+# `Cache-Control: public, max-age=31536000, immutable` — names change with content.
+STORAGES = {
+  "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+  "staticfiles": {"BACKEND": "core.storage.CompressedManifestStaticFilesStorage"},
+}
+
 # Real email in prod
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 
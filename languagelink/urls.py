@@ -15,6 +15,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import ckeditor_upload
+
 urlpatterns = [
   # Django Admin Panel
   path('admin/', admin.site.urls),
@@ -28,8 +30,8 @@ urlpatterns = [
   # Booking App URLs (Teacher Availability & Student Bookings)
   path('booking/', include('booking.urls')),  
     
-  # ckeditor5 
-  path('ckeditor5/', include('django_ckeditor_5.urls')),
+  # ckeditor5 image uploads (same route and name as django_ckeditor_5.urls, view imported on first upload)
+  path('ckeditor5/image_upload/', ckeditor_upload, name='ck_editor_5_upload_file'),
 ]
 
 # Serve media files during development only
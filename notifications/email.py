@@ -1,9 +1,24 @@
 # notifications/email.py
 # Minimal email helper used by notifications.
 # Keeps sending logic in one place so we can extend later (HTML, templates, etc.)
-from django.core.mail import EmailMultiAlternatives
+# Sends are timed and counted in core.metrics (email_send_seconds, emails_sent_total, email_failures_total).
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
 
+from core import metrics
+
+
+def _send(function, send, count):
+  """Run send() (returns the number sent), recording latency and failures under `function`."""
+  try:
+    with metrics.timed("email_send_seconds", function=function):
+      sent = send()
+  except Exception:
+    metrics.inc("email_failures_total", count, function=function)
+    raise
+  metrics.inc("emails_sent_total", sent or 0, function=function)
+  return sent
+
 def send_plain_email(subject, to, body_text, bcc=None, reply_to=None):
   """
   Send a simple plain-text email.
@@ -21,4 +36,23 @@ def send_plain_email(subject, to, body_text, bcc=None, reply_to=None):
     bcc=bcc or [],
     reply_to=reply_to or [],
   )
-  msg.send()
+  _send("send_plain_email", msg.send, 1)
+
+
+def send_plain_emails(messages):
+  """
+  Send many plain-text emails over one connection (bulk invites).
+  - messages: iterable of (subject, to, body_text)
+  Returns the number sent.
+  """
+  from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None)
+  emails = [
+    EmailMultiAlternatives(subject=subject, body=body_text, from_email=from_email, to=to)
+    for subject, to, body_text in messages
+  ]
+  if not emails:
+    return 0
+  def send():
+    with get_connection() as connection:
+      return connection.send_messages(emails)
+  return _send("send_plain_emails", send, len(emails))
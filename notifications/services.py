@@ -22,7 +22,7 @@ from django.utils.text import Truncator  # (kept; used elsewhere)
 # -----------------------------------------------------------------------------
 # Local app imports
 # -----------------------------------------------------------------------------
-from .email import send_plain_email
+from .email import send_plain_email, send_plain_emails
 
 # Only for type checking (no runtime import = no circular deps)
 if TYPE_CHECKING:
@@ -166,10 +166,10 @@ def build_set_password_url(user) -> str:
     return abs_url(path)
 
 
-def notify_user_invited(user):
+def _invite_email(user):
     """
-    Send a role-specific invite email with a secure, time-limited link
-    so the user can set their password.
+    (subject, body) of the role-specific invite with a secure, time-limited
+    link so the user can set their password.
     """
     link = build_set_password_url(user)
     # For info text: show timeout in hours if configured (Django default ~72h)
@@ -221,6 +221,15 @@ def notify_user_invited(user):
         )
         subject = "Welcome to LanguageLink – Set your password"
 
+    return subject, body
+
+
+def notify_user_invited(user):
+    """
+    Send a role-specific invite email with a secure, time-limited link
+    so the user can set their password.
+    """
+    subject, body = _invite_email(user)
     transaction.on_commit(lambda: send_plain_email(
         subject=subject,
         to=[user.email],
@@ -228,6 +237,19 @@ def notify_user_invited(user):
     ))
 
 
+def notify_users_invited(users):
+    """
+    Bulk version of notify_user_invited (CSV import): every invite is
+    built up front and sent over a single SMTP connection after commit.
+    """
+    messages = []
+    for user in users:
+        subject, body = _invite_email(user)
+        messages.append((subject, [user.email], body))
+
+    transaction.on_commit(lambda: send_plain_emails(messages))
+
+
 def _admin_profile_link_for(user) -> str:
     """
     Best link for admins to jump straight to the user's profile.
@@ -274,6 +296,67 @@ def notify_admins_user_invited(user):
     ))
 
 
+def notify_admins_users_imported(users, errors=(), imported_by=None):
+    """
+    One summary email to admins for a CSV import, instead of one
+    notify_admins_user_invited per user.
+    """
+    admins = admin_emails()
+    if not admins:
+        return
+
+    counts = {}
+    for user in users:
+        counts[user.role] = counts.get(user.role, 0) + 1
+    summary = ", ".join(f"{n} {role}{'s' if n != 1 else ''}" for role, n in sorted(counts.items())) or "no users"
+
+    lines = [f"A CSV import created {summary} and sent their invites."]
+    if imported_by is not None:
+        lines.append(f"Imported by: {display_name(imported_by)}")
+    if errors:
+        lines.append(f"\n{len(errors)} row(s) were skipped:")
+        lines += [f"- line {line}: {message}" for line, message in list(errors)[:50]]
+        if len(errors) > 50:
+            lines.append(f"- … and {len(errors) - 50} more")
+    if users:
+        lines.append("\nNew accounts:")
+        lines += [f"- {user.email} ({user.role})" for user in users]
+    body = "\n".join(lines) + "\n"
+
+    transaction.on_commit(lambda: send_plain_email(
+        subject=f"CSV import: {summary} invited",
+        to=admins,
+        body_text=body,
+    ))
+
+
+def notify_waitlist_assigned(entry):
+    """
+    Tell a waitlisted student that an opened slot was booked for them.
+    (The usual booking confirmation emails still go out via the Booking signal.)
+    """
+    student = entry.student
+    slot = entry.booking.teacher_availability
+    when = f"{slot.date} {slot.start_time.strftime('%H:%M')}–{slot.end_time.strftime('%H:%M')}"
+
+    subject = "A slot from your waitlist was booked for you"
+    body = (
+        f"Hi {getattr(student, 'first_name', '') or 'there'},\n\n"
+        f"{display_name(slot.teacher)} opened a slot you were waiting for, "
+        "and we have booked it for you.\n"
+        f"When: {when}\n\n"
+        "Bookings can’t be canceled online. If you can’t attend, "
+        "please contact the advising team in advance.\n"
+        f"Manage your bookings: {abs_url('/booking/student/bookings/')}\n"
+    )
+
+    transaction.on_commit(lambda: send_plain_email(
+        subject=subject,
+        to=[student.email],
+        body_text=body,
+    ))
+
+
 # ---- Teacher note notifications ----
 def notify_resource_note_created(note):
     """
@@ -5,7 +5,6 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from booking.models import Booking
-from .services import notify_booking_created
 
 
 @receiver(post_save, sender=Booking)
@@ -21,4 +20,6 @@ def _notify_on_booking_created(sender, instance: Booking, created: bool, raw: bo
   if raw:
     return
   if created:
+    # Imported on first booking, not when the app registry loads (worker boot time)
+    from .services import notify_booking_created
     notify_booking_created(instance)
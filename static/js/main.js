@@ -2,6 +2,12 @@
   document.addEventListener("DOMContentLoaded", function () {
     console.log('==== DOM loaded - JS called ====');
 
+    // Default avatar resolved through the static manifest (hashed name in prod);
+    // see core/partials/scripts.html
+    const DEFAULT_AVATAR_URL =
+      (window.LANGUAGELINK_STATIC && window.LANGUAGELINK_STATIC.defaultAvatar) ||
+      "/static/core/img/default-profile.png";
+
     // === HTMX: automatically include CSRF token on every request ===
     if (window.htmx) {
       document.body.addEventListener('htmx:configRequest', (evt) => {
@@ -287,32 +293,16 @@
             body: JSON.stringify({ 
               date: date, 
               start_time: startTime, 
-              end_time: endTime 
+              end_time: endTime,
+              version: availabilityVersion(),
             }),
           });
 
           const data = await response.json();
 
           if (data.success) {
-            // ✅ Instantly update button UI
-            if (data.is_available) {
-              this.classList.remove('bg-pink-400', 'hover:bg-pink-500');
-              this.classList.add('bg-green-500', 'hover:bg-green-600');
-              this.innerHTML = `
-                <svg class="w-4 h-4" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round">
-                  <path d="M5 12l5 5L20 7"/>
-                </svg>`;
-            } else {
-              this.classList.remove('bg-green-500', 'hover:bg-green-600');
-              this.classList.add('bg-pink-400', 'hover:bg-pink-500');
-              this.innerHTML = `
-                <svg class="w-4 h-4" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round">
-                  <path d="M6 6l12 12M18 6l-12 12"/>
-                </svg>`;
-            }
-
-            // Refresh availability_dict **in the template**
-            updateAvailabilityUI(data.availability_dict);
+            // ✅ Apply just the changed cells (this one, plus any made elsewhere since our version)
+            applyAvailabilityChanges(data.version, data.changes);
           } else {
             console.error('Failed to toggle availability:', data.error);
           }
@@ -325,6 +315,38 @@
       });
     });
 
+    // ————————————————————————————————————————————————
+    // Student bookings: the page holds the whole week (one <tbody data-day> per day),
+    // so day tabs just swap which one is visible — no reload
+    // ————————————————————————————————————————————————
+    const DAY_TAB_CLASSES = {
+      selected: ['bg-deep-teal', 'text-white', 'font-bold'],
+      today: ['ring-2', 'ring-deep-teal', 'text-deep-teal', 'font-semibold'],
+      other: ['bg-gray-200', 'text-gray-700', 'hover:bg-gray-300'],
+    };
+    const ALL_DAY_TAB_CLASSES = Object.values(DAY_TAB_CLASSES).flat();
+
+    document.querySelectorAll('#student-booking-page [data-day-tab]').forEach(tab => {
+      tab.addEventListener('click', function (e) {
+        const day = this.dataset.dayTab;
+        const panel = document.querySelector(`#availability-table tbody[data-day="${day}"]`);
+        if (!panel) return;  // not in this week's payload: fall back to the link
+        e.preventDefault();
+
+        document.querySelectorAll('#availability-table tbody[data-day]').forEach(tbody => {
+          tbody.classList.toggle('hidden', tbody !== panel);
+        });
+        document.querySelectorAll('#student-booking-page [data-day-tab]').forEach(other => {
+          other.classList.remove(...ALL_DAY_TAB_CLASSES);
+          const state = other === this ? 'selected' : (other.dataset.today ? 'today' : 'other');
+          other.classList.add(...DAY_TAB_CLASSES[state]);
+        });
+
+        // Keep the URL shareable/reload-safe
+        history.replaceState(null, '', this.href);
+      });
+    });
+
     // ————————————————————————————————————————————————
     // Student bookings: grey out & block past/too-soon slots
     // ————————————————————————————————————————————————
@@ -338,6 +360,8 @@
       const nowDate = table.getAttribute('data-now-date'); // "YYYY-MM-DD"
       const cutoff  = table.getAttribute('data-cutoff');   // "HH:MM:SS"
       if (!nowDate || !cutoff) return;
+      // The cutoff can fall on the next day (late-evening lead time)
+      const cutoffDate = table.getAttribute('data-cutoff-date') || nowDate;
 
       // Only clickable student buttons
       const buttons = table.querySelectorAll('.booking-slot');
@@ -361,8 +385,8 @@
           return;
         }
 
-        // Today and starts <= cutoff → disable
-        if (d === nowDate && s <= cutoff) {
+        // Starts at or before the cutoff → disable
+        if (d < cutoffDate || (d === cutoffDate && s <= cutoff)) {
           btn.classList.add('opacity-50', 'cursor-not-allowed', 'select-none');
           btn.setAttribute('aria-disabled', 'true');
           btn.classList.remove('hover:bg-green-600', 'cursor-pointer'); // kill hover
@@ -380,7 +404,7 @@
         const s = dot.getAttribute('data-start'); // "HH:MM:SS"
         if (!d || !s) return;
 
-        if (d < nowDate || (d === nowDate && s <= cutoff)) {
+        if (d < cutoffDate || (d === cutoffDate && s <= cutoff)) {
           dot.classList.add('opacity-50', 'select-none');
           if (!dot.title) dot.title = 'Past or within lead time';
         }
@@ -401,6 +425,8 @@
       const nowDate = table.getAttribute('data-now-date'); // "YYYY-MM-DD"
       const cutoff  = table.getAttribute('data-cutoff');   // "HH:MM:SS"
       if (!nowDate || !cutoff) return;
+      // The cutoff can fall on the next day (late-evening lead time)
+      const cutoffDate = table.getAttribute('data-cutoff-date') || nowDate;
 
       // Only target toggleable buttons (available/unavailable), not booked (clock) buttons
       const buttons = table.querySelectorAll('.availability-slot.toggle-slot');
@@ -424,8 +450,8 @@
           return;
         }
 
-        // Today and starts <= cutoff → disable
-        if (d === nowDate && s <= cutoff) {
+        // Starts at or before the cutoff → disable
+        if (d < cutoffDate || (d === cutoffDate && s <= cutoff)) {
           btn.classList.add('opacity-50', 'cursor-not-allowed', 'select-none');
           btn.setAttribute('aria-disabled', 'true');
           btn.classList.remove('hover:bg-green-600', 'hover:bg-pink-500');
@@ -447,16 +473,33 @@
     }, true); // capture phase so we catch it early
 
 
-    // Function to update the availability UI based on new data from the backend
-    function updateAvailabilityUI(availabilityDict) {
-      document.querySelectorAll('.toggle-slot').forEach(button => {
-        const date = button.getAttribute('data-date');
-        const startTime = button.getAttribute('data-start-time');
+    // Current month version of the teacher grid (null off the availability page)
+    function availabilityVersion() {
+      const table = document.getElementById('availability-table');
+      return table && table.dataset.version !== undefined ? Number(table.dataset.version) : null;
+    }
+
+    // Apply cell changes from toggle_availability / availability_changes to the teacher grid
+    function applyAvailabilityChanges(version, changes) {
+      const table = document.getElementById('availability-table');
+      if (!table) return;
+
+      // Stale response (a newer one was already applied)
+      if (version !== undefined && availabilityVersion() !== null && version < availabilityVersion()) return;
 
-        const key = `${date},${startTime}`;  // Match Django's new string key format
-        const isAvailable = availabilityDict[key];
+      for (const change of changes || []) {
+        const button = table.querySelector(
+          `.toggle-slot[data-date="${change.date}"][data-start-time="${change.start_time}"]`
+        );
+        if (!button) continue;
+
+        // Booked elsewhere (waitlist or a student): the cell needs the student's details
+        if (change.has_booking) {
+          window.location.reload();
+          return;
+        }
 
-        if (isAvailable) {
+        if (change.is_available) {
           button.classList.remove('bg-pink-400', 'hover:bg-pink-500');
           button.classList.add('bg-green-500', 'hover:bg-green-600');
           button.innerHTML = `
@@ -471,12 +514,33 @@
               <path d="M6 6l12 12M18 6l-12 12"/>
             </svg>`;
         }
-      });
+      }
+
+      if (version !== undefined) table.dataset.version = version;
 
       // Re-apply disabled rule after any visual update
       reapplyDisabledTeacherSlots();
     }
 
+    // Catch up when the tab comes back (changes made from another tab/device meanwhile)
+    document.addEventListener('visibilitychange', async function () {
+      const table = document.getElementById('availability-table');
+      if (!table || document.visibilityState !== 'visible') return;
+
+      const params = new URLSearchParams({
+        year: table.dataset.year,
+        month: table.dataset.month,
+        since: table.dataset.version,
+      });
+      try {
+        const response = await fetch(`/booking/availability/changes/?${params}`);
+        const data = await response.json();
+        if (data.success) applyAvailabilityChanges(data.version, data.changes);
+      } catch (error) {
+        console.error('Error:', error);
+      }
+    });
+
     
     // ————————————————————————————————————————————————
     // Function to read CSRF token from the browser’s cookies
@@ -541,7 +605,7 @@
 
       if (modalAvatar) {
         if (!avatar || avatar === "undefined") {
-          modalAvatar.src = "/static/core/img/default-profile.png";
+          modalAvatar.src = DEFAULT_AVATAR_URL;
         } else {
           modalAvatar.src = avatar;
         }
@@ -588,7 +652,7 @@
     function createBookedSlotHTML({ teacherName, teacherEmail, avatar, date, start, end, message }) {
       let safeAvatar = avatar;
       if (!avatar || avatar === "undefined" || avatar.trim() === "") {
-        safeAvatar = "/static/core/img/default-profile.png";
+        safeAvatar = DEFAULT_AVATAR_URL;
       }
 
       // Fully escape the avatar URL for HTML injection
@@ -618,6 +682,19 @@
     }
 
 
+    // === Scheduled releases: the server queued the attempt, poll until it resolves (about 2 minutes at most) ===
+    const MAX_QUEUE_POLLS = 30;
+    function waitForQueuedBooking(statusUrl, delay = 1000, polls = 0) {
+      if (polls >= MAX_QUEUE_POLLS) {
+        return Promise.resolve({ error: "Your booking is still being processed. Check Your Upcoming Bookings in a few minutes." });
+      }
+      return new Promise(resolve => setTimeout(resolve, delay))
+        .then(() => fetch(statusUrl, { headers: { "Accept": "application/json" } }))
+        .then(response => response.json())
+        .then(data => data.queued ? waitForQueuedBooking(statusUrl, Math.min(delay * 2, 5000), polls + 1) : data);
+    }
+
+
     // === Handles submission of a booking request ===
     function submitBooking() {
       const modal = document.getElementById("bookingModal");
@@ -645,6 +722,11 @@
         body: JSON.stringify({ teacher, date, start, end, message })
       })
       .then(response => response.json())
+      .then(data => {
+        if (!data.queued) return data;
+        showBookingToast("You're in the queue for this slot…", "green");
+        return waitForQueuedBooking(data.status_url);
+      })
       .then(data => {
         if (data.success) {
           if (messageEl) messageEl.value = "";
@@ -756,7 +838,7 @@
 
       if (avatarEl) {
         avatarEl.src = (!avatar || avatar === "undefined" || avatar.trim() === "")
-          ? "/static/core/img/default-profile.png"
+          ? DEFAULT_AVATAR_URL
           : avatar;
       }
 
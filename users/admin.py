@@ -1,6 +1,11 @@
 # users/admin.py
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .forms import UserImportForm
 
 # Import your models
 from .models import (
@@ -55,6 +60,67 @@ class CustomUserAdmin(UserAdmin):
   search_fields = ('email', 'first_name', 'last_name')
   ordering = ('email',)
 
+  change_list_template = 'admin/users/customuser/change_list.html'
+
+  def get_urls(self):
+    urls = super().get_urls()
+    custom = [
+      path(
+        'import-csv/',
+        self.admin_site.admin_view(self.import_csv_view),
+        name='users_customuser_import_csv',
+      ),
+    ]
+    return custom + urls
+
+  def import_csv_view(self, request):
+    """
+    Bulk-create students/teachers from an uploaded CSV (users/bulk_import.py).
+    Invalid rows are listed and skipped; valid ones are created in chunks.
+    """
+    if not self.has_add_permission(request):
+      return redirect('admin:users_customuser_changelist')
+
+    # csv + the notifications/mail stack: loaded on first import, not at worker boot
+    from .bulk_import import import_users, parse_user_csv
+
+    errors = []
+    if request.method == 'POST':
+      form = UserImportForm(request.POST, request.FILES)
+      if form.is_valid():
+        try:
+          rows, errors = parse_user_csv(
+            form.cleaned_data['csv_file'], default_role=form.cleaned_data['default_role']
+          )
+        except UnicodeDecodeError:
+          form.add_error('csv_file', 'The file must be UTF-8 encoded CSV.')
+          rows = None
+
+        if rows is not None and form.cleaned_data['dry_run']:
+          messages.info(request, f"{len(rows)} row(s) valid, {len(errors)} would be skipped. Nothing created.")
+        elif rows is not None:
+          result = import_users(
+            rows,
+            send_invites=form.cleaned_data['send_invites'],
+            imported_by=request.user,
+            errors=errors,
+          )
+          errors = result.errors
+          messages.success(request, f"Created {len(result.created)} user(s); {len(errors)} row(s) skipped.")
+          if not errors:
+            return redirect('admin:users_customuser_changelist')
+    else:
+      form = UserImportForm()
+
+    context = {
+      **self.admin_site.each_context(request),
+      'opts': self.model._meta,
+      'title': 'Import users from CSV',
+      'form': form,
+      'import_errors': errors,
+    }
+    return TemplateResponse(request, 'admin/users/customuser/import_csv.html', context)
+
   def get_form(self, request, obj=None, **kwargs):
     """
     Remove 'usable_password' from the form if present.
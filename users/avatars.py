@@ -0,0 +1,108 @@
+# users/avatars.py
+"""
+Avatar URLs for lists of users.
+
+CustomUser.avatar_url picks the profile from the user's role (no probing of
+relations the user doesn't have), but resolving it per row still costs a
+profile query unless select_related, plus a storage exists() per picture.
+resolve_avatars() does a whole page at once:
+
+  - profiles not already loaded: one query per role
+  - picture existence: one cache.get_many, storage.exists() only for names
+    not checked in the last AVATAR_EXISTS_CACHE_SECONDS (or since a profile
+    change bumped the "avatars" version, core/cacheversions.py)
+
+and stores the result on each user, where avatar_url picks it up.
+"""
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.templatetags.static import static
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from core import cacheversions, metrics
+from .models import CustomUser, StudentProfile, TeacherProfile
+
+DEFAULT_AVATAR = "core/img/default-profile.png"
+
+# role -> (profile model, CustomUser reverse accessor)
+ROLE_PROFILES = {
+  "student": (StudentProfile, "student_profile"),
+  "teacher": (TeacherProfile, "teacher_profile"),
+}
+
+_EXISTS_KEY = "avatar-exists:{}"
+
+
+def default_avatar_url():
+  return static(DEFAULT_AVATAR)
+
+
+def _existing_names(names):
+  """The subset of storage `names` that exist, cached per name."""
+  names = set(names)
+  if not names:
+    return set()
+
+  version = cacheversions.version("avatars")
+  keys = {_EXISTS_KEY.format(name): name for name in names}
+  cached = cache.get_many(keys, version=version)
+  known = {keys[key]: exists for key, exists in cached.items()}
+  metrics.cache_lookup("avatar_exists", hits=len(known), misses=len(names) - len(known))
+
+  checked = {}
+  for name in names - known.keys():
+    try:
+      checked[name] = default_storage.exists(name)
+    except Exception:
+      checked[name] = False
+  if checked:
+    cache.set_many(
+      {_EXISTS_KEY.format(name): exists for name, exists in checked.items()},
+      timeout=settings.AVATAR_EXISTS_CACHE_SECONDS,
+      version=version,
+    )
+
+  known.update(checked)
+  return {name for name, exists in known.items() if exists}
+
+
+def resolve_avatars(users):
+  """
+  Set avatar_url for every user in `users` with a constant number of queries.
+  Returns the users as a list (pass a page's object_list and assign it back).
+  """
+  users = list(users)
+
+  # Profiles that weren't select_related: one query per role
+  for role, (model, accessor) in ROLE_PROFILES.items():
+    descriptor = getattr(CustomUser, accessor)
+    missing = [u for u in users if u.role == role and not descriptor.is_cached(u)]
+    if missing:
+      profiles = {p.user_id: p for p in model.objects.filter(user__in=missing)}
+      for user in missing:
+        profile = profiles.get(user.pk)
+        # Cache both directions (None too) so neither side queries again
+        descriptor.related.set_cached_value(user, profile)
+        if profile is not None:
+          descriptor.related.field.set_cached_value(profile, user)
+
+  pictures = {}
+  for user in users:
+    profile = user.profile
+    picture = getattr(profile, "profile_picture", None)
+    if picture and picture.name:
+      pictures[user.pk] = picture
+
+  existing = _existing_names(picture.name for picture in pictures.values())
+  default = default_avatar_url()
+  for user in users:
+    picture = pictures.get(user.pk)
+    user._avatar_url = picture.url if picture and picture.name in existing else default
+  return users
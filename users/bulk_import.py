@@ -0,0 +1,168 @@
+# users/bulk_import.py
+"""
+Bulk user import from CSV (cohort enrolment at term start).
+
+Used by `manage.py import_users` and the "Import CSV" admin page.
+
+CSV columns (header row required, order free):
+  email, first_name, last_name[, role]
+`role` is "student" or "teacher"; blank/missing uses the caller's default.
+
+Rows are validated first (format, duplicates within the file, emails that
+already exist). Valid rows are then created in chunks: one bulk_create for
+the users and one per profile type, instead of a save() + post_save profile
+insert per user. Invites go out as one batch afterwards, and admins get a
+single summary email.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import csv
+import io
+from dataclasses import dataclass, field
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+from django.db.models.functions import Lower
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from core import cacheversions
+from .models import CustomUser, StudentProfile, TeacherProfile
+from notifications.services import notify_admins_users_imported, notify_users_invited
+
+IMPORTABLE_ROLES = ("student", "teacher")
+REQUIRED_COLUMNS = ("email", "first_name", "last_name")
+NAME_MAX_LENGTH = CustomUser._meta.get_field("first_name").max_length
+
+DEFAULT_CHUNK_SIZE = 200
+
+
+@dataclass
+class ImportRow:
+  line: int
+  email: str
+  first_name: str
+  last_name: str
+  role: str
+
+
+@dataclass
+class ImportResult:
+  created: list = field(default_factory=list)   # CustomUser instances (with pk)
+  errors: list = field(default_factory=list)    # (line, message)
+
+
+def parse_user_csv(data, default_role="student"):
+  """
+  Validate CSV text/bytes/file. Returns (rows, errors) where errors are
+  (line number, message) pairs; rows only contains rows without errors.
+  """
+  if hasattr(data, "read"):
+    data = data.read()
+  if isinstance(data, bytes):
+    data = data.decode("utf-8-sig")
+
+  reader = csv.DictReader(io.StringIO(data))
+  header = [(name or "").strip().lower() for name in (reader.fieldnames or [])]
+  missing = [col for col in REQUIRED_COLUMNS if col not in header]
+  if missing:
+    return [], [(1, f"Missing column(s): {', '.join(missing)}")]
+  reader.fieldnames = header
+
+  rows, errors, seen = [], [], set()
+  for line, record in enumerate(reader, start=2):
+    values = {key: (value or "").strip() for key, value in record.items() if key}
+    if not any(values.values()):
+      continue  # blank line
+
+    email = CustomUser.objects.normalize_email(values.get("email", ""))
+    first_name, last_name = values.get("first_name", ""), values.get("last_name", "")
+    role = (values.get("role") or default_role).lower()
+
+    try:
+      validate_email(email)
+    except ValidationError:
+      errors.append((line, f"Invalid email '{email}'"))
+      continue
+    if not first_name or not last_name:
+      errors.append((line, "First and last name are required"))
+      continue
+    if len(first_name) > NAME_MAX_LENGTH or len(last_name) > NAME_MAX_LENGTH:
+      errors.append((line, f"Names must be at most {NAME_MAX_LENGTH} characters"))
+      continue
+    if role not in IMPORTABLE_ROLES:
+      errors.append((line, f"Role must be one of {', '.join(IMPORTABLE_ROLES)}"))
+      continue
+    if email.lower() in seen:
+      errors.append((line, f"Duplicate email '{email}' in file"))
+      continue
+
+    seen.add(email.lower())
+    rows.append(ImportRow(line, email, first_name, last_name, role))
+
+  # Existing accounts (case-insensitive, like CustomUserCreationForm)
+  existing = set(
+    CustomUser.objects.annotate(email_lower=Lower("email"))
+    .filter(email_lower__in=seen)
+    .values_list("email_lower", flat=True)
+  )
+  if existing:
+    errors += [(row.line, f"'{row.email}' already has an account") for row in rows if row.email.lower() in existing]
+    rows = [row for row in rows if row.email.lower() not in existing]
+
+  errors.sort()
+  return rows, errors
+
+
+def _create_chunk(rows):
+  unusable = make_password(None)  # invitees set their own password via the invite link
+  users = [
+    CustomUser(
+      email=row.email,
+      first_name=row.first_name,
+      last_name=row.last_name,
+      role=row.role,
+      password=unusable,
+    )
+    for row in rows
+  ]
+  with transaction.atomic():
+    CustomUser.objects.bulk_create(users)
+    # Re-read ids: not every backend (MySQL) returns them from bulk_create
+    created = list(CustomUser.objects.filter(email__in=[u.email for u in users]))
+    # bulk_create skips post_save, so create the profiles users/signals.py would have
+    StudentProfile.objects.bulk_create([StudentProfile(user=u) for u in created if u.role == "student"])
+    TeacherProfile.objects.bulk_create([TeacherProfile(user=u) for u in created if u.role == "teacher"])
+    # ...and the cache invalidation they would have triggered
+    cacheversions.bump("directory", "avatars", "availability")
+  return created
+
+
+def import_users(rows, chunk_size=DEFAULT_CHUNK_SIZE, send_invites=True, imported_by=None, errors=()):
+  """
+  Create users + profiles for validated `rows`, `chunk_size` per transaction.
+  Returns an ImportResult. A chunk that fails (e.g. an email registered
+  since validation) is reported and skipped; earlier chunks stay committed.
+  `errors` (from parse_user_csv) are carried into the result and the admin summary.
+  """
+  result = ImportResult(errors=list(errors))
+  for start in range(0, len(rows), chunk_size):
+    chunk = rows[start:start + chunk_size]
+    try:
+      result.created += _create_chunk(chunk)
+    except DatabaseError as e:
+      result.errors.append((chunk[0].line, f"Lines {chunk[0].line}-{chunk[-1].line} not imported: {e}"))
+
+  if send_invites and result.created:
+    notify_users_invited(result.created)
+  if result.created or result.errors:
+    notify_admins_users_imported(result.created, errors=result.errors, imported_by=imported_by)
+  return result
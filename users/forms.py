@@ -76,6 +76,33 @@ class CustomUserCreationForm(UserCreationForm):
         return user
 
 
+# ────────────────────────────────────────────────────────────────────────────────
+# Bulk import (admin "Import CSV" page; see users/bulk_import.py)
+# ────────────────────────────────────────────────────────────────────────────────
+
+class UserImportForm(forms.Form):
+    """Upload a cohort CSV: email,first_name,last_name[,role]."""
+    MAX_UPLOAD_BYTES = 2 * 1024 * 1024
+
+    csv_file = forms.FileField(
+        label=_("CSV file"),
+        help_text=_("Header row: email, first_name, last_name and optionally role."),
+    )
+    default_role = forms.ChoiceField(
+        choices=[("student", "Student"), ("teacher", "Teacher")],
+        initial="student",
+        label=_("Role for rows without one"),
+    )
+    send_invites = forms.BooleanField(required=False, initial=True, label=_("Send invite emails"))
+    dry_run = forms.BooleanField(required=False, label=_("Validate only (create nothing)"))
+
+    def clean_csv_file(self):
+        upload = self.cleaned_data["csv_file"]
+        if upload.size > self.MAX_UPLOAD_BYTES:
+            raise forms.ValidationError(_("File is too large (max 2 MB)."))
+        return upload
+
+
 # ────────────────────────────────────────────────────────────────────────────────
 # Language Competency
 # ────────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,54 @@
+# users/management/commands/import_users.py
+"""
+Create student/teacher accounts from a CSV and send their invites in one batch.
+
+Examples:
+  python manage.py import_users cohort.csv                  # students by default
+  python manage.py import_users advisors.csv --role teacher
+  python manage.py import_users cohort.csv --dry-run        # validate only
+  python manage.py import_users cohort.csv --no-invites
+
+CSV header: email,first_name,last_name[,role]  (see users/bulk_import.py)
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.bulk_import import DEFAULT_CHUNK_SIZE, IMPORTABLE_ROLES, import_users, parse_user_csv
+
+
+class Command(BaseCommand):
+  help = "Bulk-create users (and profiles) from a CSV file, then send invites."
+
+  def add_arguments(self, parser):
+    parser.add_argument("csv_path", help="Path to the CSV file")
+    parser.add_argument("--role", choices=IMPORTABLE_ROLES, default="student",
+                        help="Role for rows without a role column/value")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report, create nothing")
+    parser.add_argument("--no-invites", action="store_true", help="Create accounts without sending invites")
+
+  def handle(self, *args, csv_path, role="student", chunk_size=DEFAULT_CHUNK_SIZE,
+             dry_run=False, no_invites=False, **options):
+    if chunk_size < 1:
+      raise CommandError("--chunk-size must be positive")
+    try:
+      with open(csv_path, "rb") as fh:
+        rows, errors = parse_user_csv(fh, default_role=role)
+    except OSError as e:
+      raise CommandError(f"Can't read {csv_path}: {e}")
+    except UnicodeDecodeError:
+      raise CommandError(f"{csv_path} is not UTF-8 encoded")
+
+    for line, message in errors:
+      self.stderr.write(f"line {line}: {message}")
+
+    if dry_run:
+      self.stdout.write(f"{len(rows)} row(s) valid, {len(errors)} skipped. Nothing created (--dry-run).")
+      return
+
+    result = import_users(rows, chunk_size=chunk_size, send_invites=not no_invites, errors=errors)
+    for line, message in result.errors[len(errors):]:
+      self.stderr.write(f"line {line}: {message}")
+    self.stdout.write(self.style.SUCCESS(
+      f"Created {len(result.created)} user(s); {len(result.errors)} row(s) skipped."
+    ))
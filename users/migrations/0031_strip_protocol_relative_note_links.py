@@ -0,0 +1,30 @@
+import re
+
+from django.db import migrations
+
+# href values rendered before the sanitiser treated "\" like "/": /\host, \\host
+# (tabs/newlines in between are ignored by browsers too)
+OFF_SITE_HREF = re.compile(r'\shref="[\t\r\n]*[/\\][\t\r\n]*[/\\][^"]*"')
+
+
+def strip_off_site_hrefs(apps, schema_editor):
+    ResourceNote = apps.get_model('users', 'ResourceNote')
+    notes = ResourceNote.objects.filter(content_html__contains='\\').only('id', 'content_html')
+    batch = []
+    for note in notes.iterator(chunk_size=500):
+        cleaned = OFF_SITE_HREF.sub('', note.content_html)
+        if cleaned != note.content_html:
+            note.content_html = cleaned
+            batch.append(note)
+    ResourceNote.objects.bulk_update(batch, ['content_html'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0030_resourcenote_rendered_content'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_off_site_hrefs, migrations.RunPython.noop),
+    ]
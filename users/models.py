@@ -1,5 +1,8 @@
 """Users app models: custom user + Student/Teacher profiles and related objects."""
 
+# ── Standard library ───────────────────────────────────────────────────────────
+import os
+
 # ── Django imports ─────────────────────────────────────────────────────────────
 from django.conf import settings
 from django.contrib.auth.models import (
@@ -14,6 +17,9 @@ from django.utils.timezone import now
 # ── Project imports ────────────────────────────────────────────────────────────
 # (none)
 
+# ── Local imports ──────────────────────────────────────────────────────────────
+from .richtext import render_note
+
 
 '''
 The following code creates a custom user model that inherits from 
@@ -75,21 +81,33 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
   def get_short_name(self):
       return self.first_name
   
+  @property
+  def profile(self):
+    """
+    The profile for this user's role (StudentProfile/TeacherProfile), or None.
+    Only the role's relation is touched: no failed lookups on the other one.
+    """
+    accessor = {"student": "student_profile", "teacher": "teacher_profile"}.get(self.role)
+    if accessor is None:
+      return None
+    try:
+      return getattr(self, accessor)
+    except models.ObjectDoesNotExist:
+      return None
+
   @property
   def avatar_url(self) -> str:
     """
-    Return a safe avatar URL by delegating to the related profile,
-    falling back to a static default.
-    Works whether you set related_name or not.
+    Return a safe avatar URL from the role's profile, falling back to a
+    static default. Lists should call users.avatars.resolve_avatars() first,
+    which fills this in for a whole page at once.
     """
-    for rel_name in ("teacher_profile", "teacherprofile", "student_profile", "studentprofile"):
-        profile = getattr(self, rel_name, None)
-        if profile:
-            try:
-                return profile.avatar_url  # uses the safe property you added
-            except Exception:
-                pass
-    return static("core/img/default-profile.png")
+    cached = getattr(self, "_avatar_url", None)
+    if cached is None:
+      profile = self.profile
+      cached = profile.avatar_url if profile is not None else static("core/img/default-profile.png")
+      self._avatar_url = cached
+    return cached
 
   def __str__(self):
     return self.email
@@ -336,7 +354,10 @@ class ResourceNote(models.Model):
     author:       who left it (teacher or admin)
     booking:      optional link to the specific meeting (future use)
     title:        short summary or category (future use)
-    content:      HTML from CKEditor
+    content:      HTML from CKEditor (as submitted; the edit form uses it)
+    content_html: sanitised copy of content, rendered on the page
+    excerpt:      plain-text preview for the notes list
+    links:        external link targets found in content
     created_at:   when first saved
     updated_at:   when last edited
   """
@@ -368,6 +389,19 @@ class ResourceNote(models.Model):
   content = models.TextField (
     help_text="Rich-text HTML (from CKEditor)."
   )
+  # Derived from content in save() (users/richtext.py)
+  content_html = models.TextField (
+    blank=True, editable=False,
+    help_text="Sanitised HTML rendered to students."
+  )
+  excerpt = models.CharField (
+    max_length=255, blank=True, editable=False,
+    help_text="Plain-text preview shown in the notes list."
+  )
+  links = models.JSONField (
+    default=list, blank=True, editable=False,
+    help_text="Link targets found in the note."
+  )
   created_at = models.DateTimeField (
     auto_now_add=True,
     help_text="When this note was first created."
@@ -390,6 +424,14 @@ class ResourceNote(models.Model):
     """
     return f"Note for {self.student_profile.user.get_full_name()} on {self.created_at:%Y-%m-%d %H:%M}"
 
+  def save(self, *args, **kwargs):
+    """Re-derive the sanitised body, excerpt and links whenever the note is saved."""
+    self.content_html, self.excerpt, self.links = render_note(self.content)
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and "content" in update_fields:
+      kwargs["update_fields"] = {*update_fields, "content_html", "excerpt", "links"}
+    super().save(*args, **kwargs)
+
 
 class ResourceAttachment(models.Model):
   """
@@ -420,3 +462,8 @@ class ResourceAttachment(models.Model):
     Display the filename in the admin list.
     """
     return self.file.name
+
+  @property
+  def filename(self):
+    """Bare file name for links (without the resource_notes/ prefix)."""
+    return os.path.basename(self.file.name)
@@ -0,0 +1,248 @@
+# users/pagination.py
+"""
+Pagination shared by the user directories (students list, advisors list)
+and the student resources page (keyset-only infinite scroll).
+
+- `parse_items_per_page` caps the page size taken from the query string.
+- `DirectoryPaginator` caches the total count per filter signature, and can
+  count from a lighter queryset (no annotations / select_related). Counts
+  are versioned by the "directory" namespace (core/cacheversions.py), so a
+  user or profile change invalidates them in every worker.
+- `DirectoryPaginator.page_after(cursor)` / `page_before(cursor)` serve
+  keyset pages (WHERE (sort, pk) > last seen) so deep pages don't pay for
+  OFFSET. Numbered pages switch their "Next" link to a cursor from page
+  KEYSET_AFTER_PAGE on; cursor pages link back and forth by cursor.
+  NULL sort values come last in either direction, on every backend.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import hashlib
+import json
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+# -----------------------------------------------------------------------------
+# Local application imports
+# -----------------------------------------------------------------------------
+from core import cacheversions, metrics
+
+
+DEFAULT_ITEMS_PER_PAGE = 25
+
+# Largest option offered by the "Show N users" dropdown
+MAX_ITEMS_PER_PAGE = getattr(settings, "DIRECTORY_MAX_ITEMS_PER_PAGE", 500)
+
+# User/profile writes bump the "directory" version, so the TTL only bounds paths that skip signals
+COUNT_CACHE_TTL = getattr(settings, "DIRECTORY_COUNT_CACHE_TTL", 300)
+
+# Numbered pages from here on link "Next" by cursor instead of ?page=N+1
+KEYSET_AFTER_PAGE = getattr(settings, "DIRECTORY_KEYSET_AFTER_PAGE", 5)
+
+_CURSOR_SALT = "users.pagination.cursor"
+
+
+def parse_items_per_page(value, default=DEFAULT_ITEMS_PER_PAGE, maximum=None):
+  """
+  Turn ?items_per_page=... into a safe int in [1, maximum].
+  Garbage falls back to `default`; huge values are clamped.
+  """
+  maximum = MAX_ITEMS_PER_PAGE if maximum is None else maximum
+  try:
+    n = int(value)
+  except (TypeError, ValueError):
+    return default
+  return max(1, min(n, maximum))
+
+
+def count_cache_key(namespace, **filters) -> str:
+  """
+  Cache key for a directory count: namespace + a hash of the filter values.
+  Sorting/paging params must NOT be passed — they don't change the count.
+  """
+  signature = json.dumps(filters, sort_keys=True, default=str)
+  digest = hashlib.sha1(signature.encode("utf-8")).hexdigest()[:16]
+  return f"directory-count:{namespace}:{digest}"
+
+
+class DirectoryPage(Page):
+  """A numbered page that can hand over to cursor paging (`next_cursor`)."""
+
+  @property
+  def next_cursor(self):
+    if self.number < KEYSET_AFTER_PAGE or not self.has_next() or not self.paginator.order_field:
+      return None
+    return self.paginator.cursor_for(self[-1])  # Page.__getitem__ lists the slice once
+
+  @property
+  def previous_cursor(self):
+    return None
+
+
+class KeysetPage(Page):
+  """
+  A page fetched by cursor rather than by number.
+  `number` is unknown (None); templates should use `next_cursor` /
+  `previous_cursor` (for ?before=).
+  """
+
+  def __init__(self, object_list, paginator, has_next, has_previous):
+    super().__init__(object_list, None, paginator)
+    self._has_next = has_next
+    self._has_previous = has_previous
+
+  def has_next(self):
+    return self._has_next
+
+  def has_previous(self):
+    return self._has_previous
+
+  def has_other_pages(self):
+    return self._has_next or self._has_previous
+
+  @property
+  def next_cursor(self):
+    if not self._has_next or not self.object_list:
+      return None
+    return self.paginator.cursor_for(self.object_list[-1])
+
+  @property
+  def previous_cursor(self):
+    if not self._has_previous or not self.object_list:
+      return None
+    return self.paginator.cursor_for(self.object_list[0])
+
+
+class DirectoryPaginator(Paginator):
+  """
+  Paginator for the user directories.
+
+  Args (beyond Paginator's):
+    count_queryset: queryset to COUNT instead of object_list (same filters,
+                    without annotations/joins that don't affect the total)
+    cache_key:      where to cache the total (see `count_cache_key`);
+                    None disables caching
+    order_field:    the single sort field ("-date_joined", …); required for
+                    keyset pages. object_list is re-ordered by (order_field,
+                    pk), NULLs last, so numbered and cursor pages agree.
+  """
+
+  def __init__(self, object_list, per_page, *, count_queryset=None, cache_key=None,
+               order_field=None, **kwargs):
+    self.order_field = order_field
+    if order_field:
+      object_list = object_list.order_by(*self._ordering())
+    super().__init__(object_list, per_page, **kwargs)
+    self.count_queryset = count_queryset
+    self.cache_key = cache_key
+
+  def _get_page(self, *args, **kwargs):
+    return DirectoryPage(*args, **kwargs)
+
+  def page_from_query(self, query):
+    """The page a directory link asked for: ?before=, ?cursor= or ?page= (in that order)."""
+    if query.get("before"):
+      return self.page_before(query["before"])
+    if query.get("cursor"):
+      return self.page_after(query["cursor"])
+    return self.get_page(query.get("page", 1))
+
+  @cached_property
+  def count(self):
+    if self.cache_key:
+      version = cacheversions.version("directory")
+      cached = cache.get(self.cache_key, version=version)
+      metrics.cache_lookup("directory_count", hits=int(cached is not None), misses=int(cached is None))
+      if cached is not None:
+        return cached
+
+    source = self.count_queryset if self.count_queryset is not None else self.object_list
+    total = source.count()
+
+    if self.cache_key:
+      cache.set(self.cache_key, total, COUNT_CACHE_TTL, version=version)
+    return total
+
+  # -- keyset ---------------------------------------------------------------
+
+  @property
+  def _order(self):
+    field = self.order_field or "pk"
+    return field.lstrip("-"), field.startswith("-")
+
+  def _ordering(self, reverse=False):
+    field, desc = self._order
+    desc ^= reverse
+    if field == "pk":
+      return ["-pk" if desc else "pk"]
+    # NULLs after every value in the forward direction, so before them in reverse
+    nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+    key = F(field).desc(**nulls) if desc else F(field).asc(**nulls)
+    return [key, "-pk" if desc else "pk"]
+
+  def cursor_for(self, obj) -> str:
+    """Opaque, signed cursor pointing at `obj` (page_after: rows after it; page_before: rows before it)."""
+    field, _ = self._order
+    value = obj
+    for part in field.split("__"):
+      value = getattr(value, part, None)
+    if not isinstance(value, (str, int, float, type(None))):
+      value = str(value)  # dates/datetimes: the ORM parses them back
+    return signing.dumps([value, obj.pk], salt=_CURSOR_SALT)
+
+  def _load_cursor(self, cursor):
+    """(value, pk) from a cursor, or None if missing/tampered."""
+    if not cursor:
+      return None
+    try:
+      value, pk = signing.loads(cursor, salt=_CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+      return None
+    return None if pk is None else (value, pk)
+
+  def page_after(self, cursor):
+    """
+    Return the KeysetPage that follows `cursor` (or the first page if the
+    cursor is missing/tampered). Never counts, never uses OFFSET.
+    """
+    qs = self.object_list
+    position = self._load_cursor(cursor)
+    if position:
+      qs = qs.filter(self._after_q(*position))
+
+    rows = list(qs[: self.per_page + 1])
+    has_next = len(rows) > self.per_page
+    return KeysetPage(rows[: self.per_page], self, has_next, has_previous=position is not None)
+
+  def page_before(self, cursor):
+    """The KeysetPage that ends just before `cursor` (the first page if it is missing/tampered)."""
+    position = self._load_cursor(cursor)
+    if position is None:
+      return self.page_after(None)
+
+    qs = self.object_list.order_by(*self._ordering(reverse=True)).filter(self._after_q(*position, reverse=True))
+    rows = list(qs[: self.per_page + 1])
+    has_previous = len(rows) > self.per_page
+    return KeysetPage(rows[: self.per_page][::-1], self, has_next=True, has_previous=has_previous)
+
+  def _after_q(self, value, pk, reverse=False):
+    """Rows after (value, pk) in the forward order, or before it with `reverse`."""
+    field, desc = self._order
+    op = "lt" if desc ^ reverse else "gt"
+    if field == "pk":
+      return Q(**{f"pk__{op}": pk})
+    if value is None:
+      # Inside the trailing NULL block: only the pk decides; going back, every value comes first
+      same = Q(**{f"{field}__isnull": True, f"pk__{op}": pk})
+      return same | Q(**{f"{field}__isnull": False}) if reverse else same
+    after = Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"pk__{op}": pk})
+    return after if reverse else after | Q(**{f"{field}__isnull": True})
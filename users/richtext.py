@@ -0,0 +1,152 @@
+# users/richtext.py
+"""
+Save-time processing for ResourceNote HTML (see ResourceNote.save).
+
+CKEditor posts arbitrary HTML; render_note() reduces it to the tags the
+editor toolbar can produce, and returns:
+
+  html     sanitised markup, safe to output with |safe
+  excerpt  short plain-text preview for the notes list
+  links    http(s)/mailto targets found in the note, in order, de-duplicated
+
+Tags outside the allowlist are unwrapped (their text is kept), except
+script/style-like elements, which are dropped along with their content.
+"""
+
+# -----------------------------------------------------------------------------
+# Standard library
+# -----------------------------------------------------------------------------
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+# -----------------------------------------------------------------------------
+# Django imports
+# -----------------------------------------------------------------------------
+from django.utils.text import Truncator
+
+ALLOWED_TAGS = {
+  "p", "br", "strong", "b", "em", "i", "u", "s",
+  "a", "ul", "ol", "li", "blockquote",
+}
+ALLOWED_ATTRS = {"a": {"href", "title"}}
+ALLOWED_SCHEMES = {"http", "https", "mailto"}
+VOID_TAGS = {"br"}
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "template", "noscript", "svg", "math"}
+# Word breaks for the excerpt (allowed or not)
+BLOCK_TAGS = {
+  "p", "br", "li", "blockquote", "ul", "ol",
+  "div", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "td", "th",
+}
+# Opening these ends an open element the way browsers do (<li>a<li>b)
+IMPLIED_END = {
+  "li": {"li"},
+  "p": {"p"},
+  "ul": {"p"},
+  "ol": {"p"},
+  "blockquote": {"p"},
+}
+
+EXCERPT_LENGTH = 200
+
+
+def _safe_href(value):
+  value = (value or "").strip()
+  if not value:
+    return None
+  scheme = urlsplit(value).scheme.lower()
+  if scheme:
+    return value if scheme in ALLOWED_SCHEMES else None
+  # Relative links and fragments stay; protocol-relative ones (//host, and /\host or \\host,
+  # which browsers read the same; tabs/newlines are dropped first) don't
+  start = re.sub(r"[\t\r\n]", "", value)[:2].replace("\\", "/")
+  return None if start == "//" else value
+
+
+class _NoteSanitiser(HTMLParser):
+
+  def __init__(self):
+    super().__init__(convert_charrefs=True)
+    self.out = []
+    self.text = []
+    self.links = []
+    self.open_tags = []
+    self.dropping = 0
+
+  def handle_starttag(self, tag, attrs):
+    if tag in DROP_CONTENT_TAGS:
+      self.dropping += 1
+      return
+    if self.dropping:
+      return
+    if tag in BLOCK_TAGS:
+      self.text.append(" ")
+    if tag not in ALLOWED_TAGS:
+      return
+    if self.open_tags and self.open_tags[-1] in IMPLIED_END.get(tag, ()):
+      self.handle_endtag(self.open_tags[-1])
+
+    allowed = ALLOWED_ATTRS.get(tag, set())
+    kept = []
+    for name, value in attrs:
+      if name not in allowed:
+        continue
+      if name == "href":
+        value = _safe_href(value)
+        if value is None:
+          continue
+        if urlsplit(value).scheme and value not in self.links:
+          self.links.append(value)
+      kept.append((name, value or ""))
+    if tag == "a":
+      kept += [("target", "_blank"), ("rel", "noopener noreferrer nofollow")]
+
+    attr_str = "".join(f' {name}="{escape(value, quote=True)}"' for name, value in kept)
+    self.out.append(f"<{tag}{attr_str}>")
+    if tag not in VOID_TAGS:
+      self.open_tags.append(tag)
+
+  def handle_startendtag(self, tag, attrs):
+    self.handle_starttag(tag, attrs)
+    if tag in self.open_tags and tag == self.open_tags[-1] and tag not in VOID_TAGS:
+      self.handle_endtag(tag)
+
+  def handle_endtag(self, tag):
+    if tag in DROP_CONTENT_TAGS:
+      self.dropping = max(0, self.dropping - 1)
+      return
+    if self.dropping:
+      return
+    if tag in BLOCK_TAGS:
+      self.text.append(" ")
+    if tag not in self.open_tags:
+      return
+    # Close anything left open inside it so the output stays well-formed
+    while self.open_tags:
+      open_tag = self.open_tags.pop()
+      self.out.append(f"</{open_tag}>")
+      if open_tag == tag:
+        break
+
+  def handle_data(self, data):
+    if self.dropping:
+      return
+    self.out.append(escape(data, quote=False))
+    self.text.append(data)
+
+  def close(self):
+    super().close()
+    while self.open_tags:
+      self.out.append(f"</{self.open_tags.pop()}>")
+
+
+def render_note(raw_html):
+  """Sanitise CKEditor HTML. Returns (html, excerpt, links)."""
+  parser = _NoteSanitiser()
+  parser.feed(raw_html or "")
+  parser.close()
+
+  plain = re.sub(r"\s+", " ", "".join(parser.text)).strip()
+  excerpt = Truncator(plain).chars(EXCERPT_LENGTH)
+  return "".join(parser.out), excerpt, parser.links
@@ -1,5 +1,7 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+
+from core import cacheversions
 from .models import CustomUser, StudentProfile, TeacherProfile
 
 @receiver(post_save, sender=CustomUser)
@@ -9,3 +11,26 @@ def create_user_profile(sender, instance, created, **kwargs):
             StudentProfile.objects.create(user=instance)
         elif instance.role == 'teacher':
             TeacherProfile.objects.create(user=instance)
+
+
+# Cached directory counts, avatars and week grids show users and profiles:
+# invalidate them in every worker once the change commits (core/cacheversions.py)
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_caches(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login', 'password'}:
+        return  # logins and password changes don't show anywhere cached
+    cacheversions.bump('directory', 'availability')
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def invalidate_student_profile_caches(sender, instance, **kwargs):
+    cacheversions.bump('directory', 'avatars')
+
+
+@receiver(post_save, sender=TeacherProfile)
+@receiver(post_delete, sender=TeacherProfile)
+def invalidate_teacher_profile_caches(sender, instance, **kwargs):
+    # Advisor status and meeting modes decide who appears in the week grid
+    cacheversions.bump('directory', 'avatars', 'availability')
@@ -1,3 +1,191 @@
-from django.test import TestCase
+import html
+import re
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import CustomUser, ResourceNote, TeacherProfile
+from .pagination import KEYSET_AFTER_PAGE, DirectoryPaginator
+from .richtext import render_note
+
+
+class AdminDashboardTests(TestCase):
+  def setUp(self):
+    admin = CustomUser.objects.create_user(
+      "admin@example.com", "pw", first_name="Ad", last_name="Min", role="admin", is_staff=True,
+    )
+    self.client.force_login(admin)
+
+  def test_out_of_range_years_are_clamped(self):
+    for year, expected in (("0", 2), ("-5", 2), ("99999", 9998), ("1", 2), ("9999", 9998)):
+      with self.subTest(year=year):
+        response = self.client.get(reverse("admin_dashboard"), {"year": year})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["utilisation_year"], expected)
+
+
+class RenderNoteTests(SimpleTestCase):
+  XSS_VECTORS = [
+    '<script>alert(1)</script>',
+    '<img src=x onerror=alert(1)>',
+    '<p onclick="alert(1)">hi</p>',
+    '<a href="javascript:alert(1)">x</a>',
+    '<a href="JaVaScRiPt:alert(1)">x</a>',
+    '<a href=" java\tscript:alert(1)">x</a>',
+    '<a href="&#106;avascript:alert(1)">x</a>',
+    '<a href="data:text/html;base64,PHNjcmlwdD5hbGVydCgxKTwvc2NyaXB0Pg==">x</a>',
+    '<svg><script>alert(1)</script></svg>',
+    '<iframe src="https://evil.example"></iframe>',
+    '<a href="//evil.example">x</a>',
+    '<a href="/\\evil.example">x</a>',
+    '<a href="\\\\evil.example">x</a>',
+    '<a href=" \\/evil.example">x</a>',
+    '<a href="/\t/evil.example">x</a>',
+    '<style>body{background:url(javascript:alert(1))}</style>',
+    '<a href="https://ok.example" onmouseover="alert(1)">x</a>',
+    '<p>"><script>alert(1)</script></p>',
+    '<scr<script>ipt>alert(1)</script>',
+  ]
+
+  def test_xss_vectors_are_neutralised(self):
+    for vector in self.XSS_VECTORS:
+      with self.subTest(vector=vector):
+        html, _, _ = render_note(vector)
+        lowered = html.lower()
+        for needle in ("<script", "<img", "<svg", "<iframe", "<style", "javascript:", "data:", " on", "evil.example\""):
+          self.assertNotIn(needle, lowered)
+
+  def test_allowed_markup_and_links_are_kept(self):
+    html, excerpt, links = render_note('<p>Read <a href="https://example.com" title="t">this</a><br></p>')
+    self.assertEqual(
+      html,
+      '<p>Read <a href="https://example.com" title="t" target="_blank" rel="noopener noreferrer nofollow">this</a><br></p>',
+    )
+    self.assertEqual(excerpt, "Read this")
+    self.assertEqual(links, ["https://example.com"])
+
+  def test_relative_links_are_kept(self):
+    for href in ("/users/profile/", "#notes", "notes/1/"):
+      with self.subTest(href=href):
+        html, _, _ = render_note(f'<a href="{href}">x</a>')
+        self.assertIn(f'href="{href}"', html)
+
+  def test_text_is_escaped(self):
+    html, _, _ = render_note("<p>1 &lt; 2 &amp; <b>bold</b></p>")
+    self.assertEqual(html, "<p>1 &lt; 2 &amp; <b>bold</b></p>")
+
+
+class DirectoryPaginatorTests(TestCase):
+  def setUp(self):
+    # Repeated sort values, so the pk tiebreak matters; last_login is NULL for a third of them
+    now = timezone.now()
+    for i in range(11):
+      CustomUser.objects.create_user(
+        f"student{i}@example.com", "pw", first_name="S", last_name=f"Name{i // 3}", role="student",
+        last_login=None if i % 3 == 0 else now - timedelta(days=i // 2),
+      )
+    self.students = CustomUser.objects.filter(role="student")
+
+  def walk(self, order_field, per_page=3):
+    paginator = DirectoryPaginator(self.students, per_page, order_field=order_field)
+    pages, cursor = [], None
+    while True:
+      page = paginator.page_after(cursor)
+      pages.append([user.pk for user in page.object_list])
+      cursor = page.next_cursor
+      if not cursor:
+        break
+
+    # ...and back again from the last page
+    back = [pages[-1]]
+    while page.previous_cursor:
+      page = paginator.page_before(page.previous_cursor)
+      back.insert(0, [user.pk for user in page.object_list])
+    return pages, back, list(paginator.object_list.values_list("pk", flat=True))
+
+  def test_keyset_pages_cover_every_row_once(self):
+    for order_field in ("last_name", "-last_name", "-date_joined", "pk", "last_login", "-last_login"):
+      with self.subTest(order_field=order_field):
+        pages, back, expected = self.walk(order_field)
+        seen = sum(pages, [])
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(seen, expected)
+        self.assertEqual(sum(back, []), expected)
+
+  def test_nulls_sort_last_in_both_directions(self):
+    nulls = set(self.students.filter(last_login__isnull=True).values_list("pk", flat=True))
+    for order_field in ("last_login", "-last_login"):
+      with self.subTest(order_field=order_field):
+        seen = sum(self.walk(order_field)[0], [])
+        self.assertEqual(set(seen[-len(nulls):]), nulls)
+
+  def test_numbered_pages_hand_over_to_the_cursor(self):
+    paginator = DirectoryPaginator(self.students, 2, order_field="last_name")
+    self.assertIsNone(paginator.page(KEYSET_AFTER_PAGE - 1).next_cursor)
+    page = paginator.page(KEYSET_AFTER_PAGE)
+    following = paginator.page_from_query({"cursor": page.next_cursor})
+    self.assertEqual(list(following.object_list), list(paginator.page(KEYSET_AFTER_PAGE + 1).object_list))
+    self.assertEqual(
+      list(paginator.page_from_query({"before": following.previous_cursor}).object_list), list(page.object_list),
+    )
+
+  def test_tampered_cursor_starts_over(self):
+    paginator = DirectoryPaginator(self.students, 3, order_field="last_name")
+    page = paginator.page_after("not-a-cursor")
+    self.assertEqual(list(page.object_list), list(paginator.page(1).object_list))
+    self.assertFalse(page.has_previous())
+
+  def test_student_list_links_reach_every_student(self):
+    teacher = CustomUser.objects.create_user("teacher@example.com", "pw", first_name="T", last_name="T", role="teacher")
+    self.client.force_login(teacher)
+    url, seen = f"{reverse('teacher_student_list')}?sort=last_name&order=asc&items_per_page=1", []
+    for _ in range(20):
+      response = self.client.get(url)
+      seen += [student.pk for student in response.context["page_obj"].object_list]
+      match = re.search(r'href="(\?(?:page|cursor)=[^"]+)"[^>]*>\s*Next →', response.content.decode())
+      if not match:
+        break
+      url = reverse("teacher_student_list") + html.unescape(match.group(1))
+    students = self.students.filter(is_active=True)
+    self.assertIn("cursor=", url)
+    self.assertEqual(sorted(seen), sorted(students.values_list("pk", flat=True)))
+    self.assertEqual(len(seen), len(set(seen)))
+
+
+class ResourceNoteListTests(TestCase):
+  def setUp(self):
+    cache.clear()
+    self.teacher = CustomUser.objects.create_user("teacher@example.com", "pw", first_name="T", last_name="T", role="teacher")
+    TeacherProfile.objects.filter(user=self.teacher).update(profile_picture="profile_pictures/teachers/t.png")
+    self.student = CustomUser.objects.create_user("student@example.com", "pw", first_name="S", last_name="S", role="student")
+    self.client.force_login(self.teacher)
+
+  def add_notes(self, count):
+    for i in range(count):
+      ResourceNote.objects.create(
+        student_profile=self.student.student_profile, author=self.teacher, title=f"Note {i}", content="<p>hi</p>",
+      )
+
+  def render(self):
+    with mock.patch("users.avatars.default_storage.exists", return_value=True) as exists:
+      with CaptureQueriesContext(connection) as queries:
+        response = self.client.get(reverse("student_resource"), {"student_id": self.student.pk})
+    return response, exists.call_count, len(queries)
+
+  def test_author_avatars_are_resolved_once_per_page(self):
+    self.add_notes(2)
+    response, checks, few = self.render()
+    self.assertContains(response, "/profile_pictures/teachers/t.png", count=2)
+    self.assertEqual(checks, 1)
+
+    cache.clear()
+    self.add_notes(4)
+    _, checks, many = self.render()
+    self.assertEqual(checks, 1)
+    self.assertEqual(many, few)
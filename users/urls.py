@@ -12,6 +12,7 @@ from .views import (
     toggle_student_active, delete_student,
     toggle_can_host_online, toggle_advising_status,
     delete_resource_note, edit_resource_note, view_resource_note,
+    resource_note_body, download_resource_attachment,
     NotifyingPasswordChangeView,
 )
 
@@ -83,4 +84,6 @@ urlpatterns = [
     path("notes/<int:pk>/delete/", delete_resource_note, name="delete_resource_note"),
     path("notes/<int:pk>/edit/", edit_resource_note, name="edit_resource_note"),
     path("notes/<int:pk>/view/", view_resource_note, name="view_resource_note"),
+    path("notes/<int:pk>/body/", resource_note_body, name="resource_note_body"),
+    path("notes/attachments/<int:pk>/", download_resource_attachment, name="download_resource_attachment"),
 ]
@@ -15,16 +15,10 @@ def has_completed_questionnaire(user) -> bool:
 
 def absolute_avatar_url(request, user):
     """
-    Return an absolute URL for the user's avatar, preferring profile.avatar_url,
-    falling back to any user-level avatar_url, and then to a static default.
+    Return an absolute URL for the user's avatar (CustomUser.avatar_url:
+    the role's profile picture, or the static default).
     """
-    prof = getattr(user, "teacher_profile", None) or getattr(user, "student_profile", None)
-    if prof and hasattr(prof, "avatar_url"):
-        url = prof.avatar_url
-    elif hasattr(user, "avatar_url"):
-        url = user.avatar_url
-    else:
-        url = static("core/img/default-profile.png")
+    url = user.avatar_url if hasattr(user, "avatar_url") else static("core/img/default-profile.png")
 
     if url.startswith("/"):
         url = request.build_absolute_uri(url)
@@ -2,7 +2,8 @@
 # Standard library
 # -----------------------------------------------------------------------------
 import re
-from datetime import datetime
+from datetime import MAXYEAR, MINYEAR, date, datetime
+from urllib.parse import urlencode
 
 # -----------------------------------------------------------------------------
 # Django imports
@@ -11,17 +12,23 @@ from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.views import PasswordChangeView  # subclassed below
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.paginator import Paginator
 from django.db.models import Exists, OuterRef, Q
 from django.http import Http404, HttpResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
+from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 
 # -----------------------------------------------------------------------------
 # Local application imports
 # -----------------------------------------------------------------------------
+from booking.models import WaitlistEntry
+from booking.rollups import utilisation_report
+from core.dbrouting import read_replica
+from core.downloads import serve_protected_file
 from users.utils import has_completed_questionnaire
+from .avatars import resolve_avatars
+from .pagination import DirectoryPaginator, count_cache_key, parse_items_per_page
 from .forms import (
   CustomUserCreationForm,
   QuestionnaireForm,
@@ -32,6 +39,7 @@ from .forms import (
 from .models import (
   CustomUser,
   Questionnaire,
+  ResourceAttachment,
   ResourceNote,
   TeacherProfile,
 )
@@ -39,13 +47,8 @@ from .models import (
 # -----------------------------------------------------------------------------
 # Notifications (local app)
 # -----------------------------------------------------------------------------
-# Notifications (local app)
-from notifications.services import (
-  notify_password_changed,
-  notify_user_invited,
-  notify_admins_user_invited,
-  notify_resource_note_created,
-)
+# notifications.services (and the mail stack behind it) is imported inside the
+# views that send, so worker boot doesn't load it; see `manage.py benchmark_startup`.
 
 
 
@@ -67,6 +70,7 @@ def register(request):
       user.save(update_fields=['password'])
 
       # Notify: invite the user + inform admins
+      from notifications.services import notify_admins_user_invited, notify_user_invited
       notify_user_invited(user)
       notify_admins_user_invited(user)
 
@@ -245,6 +249,13 @@ def teacher_profile_view(request, teacher_id=None):
   # Student booking gate
   can_student_book = has_completed_questionnaire(request.user) if is_student else True
 
+  # Student's current waitlist entry for this advisor (if any)
+  waitlist_entry = None
+  if is_student and can_student_book:
+    waitlist_entry = WaitlistEntry.objects.filter(
+      student=request.user, teacher=teacher_user, status=WaitlistEntry.STATUS_WAITING
+    ).first()
+
   return render(request, 'users/teacher_profile.html', {
       'teacher_profile': teacher_profile,
       'teacher_user': teacher_user,
@@ -253,6 +264,8 @@ def teacher_profile_view(request, teacher_id=None):
       'form': form,
       'can_student_book': can_student_book,
       'is_student': is_student,
+      'waitlist_entry': waitlist_entry,
+      'today': timezone.localdate(),
   })
 
   
@@ -367,8 +380,32 @@ def questionnaire_view(request, student_id=None):
 def admin_dashboard_view(request):
   """
   Displays the admin dashboard.
-  """
-  return render(request, 'users/admin_dashboard.html')
+  Admins also get utilisation statistics for ?year=YYYY (default: this year),
+  read from the precomputed rollups only (see booking/rollups.py).
+  """
+  context = {}
+
+  if request.user.role == 'admin':
+    today = timezone.localdate()
+    try:
+      year = int(request.GET.get('year', today.year))
+    except ValueError:
+      year = today.year
+    # Keep the year and its prev/next links inside what date() accepts
+    year = min(max(year, MINYEAR + 1), MAXYEAR - 1)
+
+    context.update({
+      'utilisation': utilisation_report(date(year, 1, 1), date(year, 12, 31)),
+      'utilisation_year': year,
+      'prev_year': year - 1,
+      'next_year': year + 1,
+    })
+
+  return render(request, 'users/admin_dashboard.html', context)
+
+
+# Notes per infinite-scroll batch on the resources page
+RESOURCE_NOTES_PER_PAGE = 20
 
 
 # Student Resources View
@@ -395,8 +432,28 @@ def student_resource_view(request):
 
   student_profile = student_user.student_profile
 
-  # 2) Grab all notes (Model.Meta.ordering handles newest-first)
-  notes = student_profile.resource_notes.select_related('author').all()
+  # 2) One keyset page of notes, newest first; the rest load as the reader scrolls.
+  #    Bodies load on demand (resource_note_body), so skip them here.
+  notes = (
+    student_profile.resource_notes
+    .select_related('author__teacher_profile')
+    .prefetch_related('attachments')
+    .defer('content', 'content_html')
+  )
+  paginator = DirectoryPaginator(notes, RESOURCE_NOTES_PER_PAGE, order_field='-updated_at')
+  cursor = request.GET.get('cursor')
+  page_obj = paginator.page_after(cursor)
+  # Author avatars for the whole page at once (no per-note storage checks)
+  resolve_avatars(note.author for note in page_obj.object_list)
+
+  next_url = None
+  if page_obj.next_cursor:
+    next_url = f"{reverse('student_resource')}?{urlencode({'student_id': student_user.id, 'cursor': page_obj.next_cursor})}"
+
+  page_context = {'page_obj': page_obj, 'next_url': next_url}
+  if cursor and request.headers.get('HX-Request'):
+    # Infinite scroll: just the next batch of note items (+ the next loader)
+    return render(request, 'users/partials/note_page.html', page_context)
 
   # 3) Only teachers get to POST a new note
   note_form = None
@@ -408,6 +465,7 @@ def student_resource_view(request):
         note.student_profile = student_profile
         note.author = user
         note.save()
+        from notifications.services import notify_resource_note_created
         notify_resource_note_created(note)   # ← send emails for this new note
         # avoid double-POST: build URL + query and redirect
         base_url = reverse('student_resource')
@@ -418,8 +476,8 @@ def student_resource_view(request):
 
   return render(request, 'users/student_resources.html', {
     'student_profile': student_profile,
-    'notes':           notes,
     'note_form':       note_form,
+    **page_context,
   })
 
 
@@ -474,6 +532,7 @@ def edit_resource_note(request, pk):
     # return the normal read‐only note fragment so HTMX replaces it
     return render(request, "users/partials/note_item.html", {
       "note": note,
+      "expanded": True,
     })
   # on validation failure you could re-render the form (with errors)
   return HttpResponse(status=400)
@@ -488,9 +547,53 @@ def view_resource_note(request, pk):
   note = get_object_or_404(ResourceNote, pk = pk)
   return render(request, "users/partials/note_item.html", {
     "note": note,
+    "expanded": True,
   })
 
 
+def _can_view_student_resources(user, student_profile):
+  """The student themselves, or any teacher/admin (as in student_resource_view)."""
+  return user.role in ('teacher', 'admin') or student_profile.user_id == user.id
+
+
+@login_required
+def resource_note_body(request, pk):
+  """
+  HTMX endpoint: the full (sanitised) body of a note, swapped in
+  over its excerpt when the reader expands it.
+  """
+  note = get_object_or_404(
+    ResourceNote.objects.select_related('student_profile').only(
+      'id', 'content_html', 'student_profile__user_id'
+    ),
+    pk = pk,
+  )
+  if not _can_view_student_resources(request.user, note.student_profile):
+    raise Http404
+
+  return render(request, "users/partials/note_body.html", {
+    "note": note,
+  })
+
+
+@login_required
+def download_resource_attachment(request, pk):
+  """
+  Serve a note attachment to the student it belongs to, or to any
+  teacher/admin (same rule as student_resource_view). The transfer itself
+  is handed to nginx/Apache when PROTECTED_MEDIA_SERVER is set.
+  """
+  attachment = get_object_or_404(
+    ResourceAttachment.objects.select_related('note__student_profile'), pk = pk
+  )
+  if not _can_view_student_resources(request.user, attachment.note.student_profile):
+    raise Http404
+
+  # PDFs/audio/images inline (seekable); anything else downloads
+  return serve_protected_file(request, attachment.file, as_attachment=False)
+
+
+@read_replica
 @login_required
 def student_advisors_view(request):
   """
@@ -501,15 +604,14 @@ def student_advisors_view(request):
   sort         = request.GET.get('sort', 'user__date_joined')
   order        = request.GET.get('order', 'desc')
   search_query = request.GET.get('search', '').strip()
-  items_per_page = int(request.GET.get('items_per_page', 25))
-  page_number  = request.GET.get('page', 1)
+  items_per_page = parse_items_per_page(request.GET.get('items_per_page'))
 
   # 2) Sort direction
   if order == 'desc':
     sort = f"-{sort}"
 
   # 3) Base queryset
-  advisors = TeacherProfile.objects.select_related('user')
+  advisors = TeacherProfile.objects.all()
 
   # 4) “Smart” search
   if search_query:
@@ -552,13 +654,19 @@ def student_advisors_view(request):
 
     advisors = advisors.filter(q)
 
-  # 5) Apply sorting safely
+  # 5) Apply sorting safely (the paginator orders by it, pk breaking ties)
   valid = ['user__first_name','user__last_name','user__email','user__date_joined']
-  advisors = advisors.order_by(sort if sort.lstrip('-') in valid else 'user__date_joined')
-
-  # 6) Paginate
-  paginator = Paginator(advisors, items_per_page)
-  page_obj  = paginator.get_page(page_number)
+  sort = sort if sort.lstrip('-') in valid else 'user__date_joined'
+
+  # 6) Paginate: count the bare filtered queryset, cached per search
+  paginator = DirectoryPaginator(
+    advisors.select_related('user'),
+    items_per_page,
+    count_queryset=advisors,
+    cache_key=count_cache_key('advisors', search=search_query),
+    order_field=sort,
+  )
+  page_obj = paginator.page_from_query(request.GET)
 
   # 7) Render
   return render(request, 'users/advisor_list.html', {
@@ -572,6 +680,7 @@ def student_advisors_view(request):
 
 
 # View for Listing All Students
+@read_replica
 @login_required
 def teacher_student_list_view(request):
   """
@@ -584,26 +693,14 @@ def teacher_student_list_view(request):
   sort = request.GET.get('sort', 'date_joined')
   order = request.GET.get('order', 'desc')
   search_query = request.GET.get('search', '').strip()
-  items_per_page = int(request.GET.get('items_per_page', 25))
-  page_number   = request.GET.get('page', 1)
+  items_per_page = parse_items_per_page(request.GET.get('items_per_page'))
 
   # 2) Sort direction
   if order == 'desc':
     sort = f"-{sort}"
 
-  # 3) Base queryset: only active students, annotate questionnaire status
-  students = (
-    CustomUser.objects.filter(role='student', is_active=True)
-    .select_related('student_profile')
-    .annotate(
-      questionnaire_completed=Exists(
-        Questionnaire.objects.filter(
-          student_profile__user=OuterRef('pk'),
-          completed=True
-        )
-      )
-    )
-  )
+  # 3) Base queryset: only active students (annotation is added for the page only)
+  students = CustomUser.objects.filter(role='student', is_active=True)
 
   # 4) “Smart” search
   if search_query:
@@ -651,12 +748,34 @@ def teacher_student_list_view(request):
 
     students = students.filter(q)
 
-  # 5) Apply sorting
-  students = students.order_by(sort)
+  # 5) Apply sorting safely (the paginator orders by it, pk breaking ties)
+  valid = ['first_name', 'last_name', 'email', 'date_joined', 'questionnaire_completed']
+  sort = sort if sort.lstrip('-') in valid else '-date_joined'
 
-  # 6) Paginate
-  paginator = Paginator(students, items_per_page)
-  page_obj  = paginator.get_page(page_number)
+  page_qs = (
+    students
+    .select_related('student_profile')
+    .annotate(
+      questionnaire_completed=Exists(
+        Questionnaire.objects.filter(
+          student_profile__user=OuterRef('pk'),
+          completed=True
+        )
+      )
+    )
+  )
+
+  # 6) Paginate: count without the Exists() annotation, cached per search
+  paginator = DirectoryPaginator(
+    page_qs,
+    items_per_page,
+    count_queryset=students,
+    cache_key=count_cache_key('students', search=search_query),
+    order_field=sort,
+  )
+  page_obj = paginator.page_from_query(request.GET)
+  # Avatars for the whole page at once (no per-row profile/storage lookups)
+  page_obj.object_list = resolve_avatars(page_obj.object_list)
 
   # 7) Render
   return render(request, 'users/student_list.html', {
@@ -715,5 +834,6 @@ class NotifyingPasswordChangeView(PasswordChangeView):
 
   def form_valid(self, form):
     response = super().form_valid(form)
+    from notifications.services import notify_password_changed
     notify_password_changed(self.request.user)
     return response
\ No newline at end of file